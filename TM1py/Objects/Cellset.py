@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+
+
+class Cellset(str):
+    """ Handle of a cellset on the TM1 Server, returned by CellService.create_cellset and
+    CellService.create_cellset_from_view.
+
+    The MDX is executed once. Composition, cell count, axes, values and csv are fetched lazily and memoized,
+    so several formats can be extracted without running the query again.
+    The cellset is deleted on the server when the handle is closed (close or the end of a with block).
+    Like a plain cellset id, it stays valid until it is deleted: garbage collection doesn't delete it.
+
+    A Cellset is a str (the cellset id), so it can be passed to all methods that take a cellset_id.
+    Note that these methods delete the cellset by default. Copies and pickles of a Cellset are plain str.
+
+    >>> with tm1.cubes.cells.create_cellset(mdx) as cellset:
+    >>>     cellset.cellcount
+    >>>     cellset.to_dataframe()
+    >>>     for page in cellset.pages(page_size=10000):
+    >>>         ...
+    """
+
+    # properties of the members and elements on the axes, as in CellService.extract_cellset
+    MEMBER_PROPERTIES = ("Name", "UniqueName")
+    ELEMENT_PROPERTIES = ("UniqueName",)
+
+    def __new__(cls, cellset_id, cell_service):
+        """
+
+        :param cellset_id: id of the cellset on the TM1 Server
+        :param cell_service: instance of TM1py.Services.CellService
+        """
+        cellset = super().__new__(cls, cellset_id)
+        cellset._cell_service = cell_service
+        cellset._closed = False
+        cellset._composition = None
+        cellset._cellcount = None
+        cellset._axes_response = None
+        cellset._values = None
+        cellset._csv = None
+        return cellset
+
+    @property
+    def id(self):
+        return str(self)
+
+    @property
+    def closed(self):
+        return self._closed
+
+    @property
+    def composition(self):
+        """ Cube name and unique names of the hierarchies on the axes
+
+        :return: cube, titles, rows, columns
+        """
+        if self._composition is None:
+            if self._axes_response is not None:
+                self._composition = self._composition_from_axes()
+            else:
+                self._check_open()
+                self._composition = self._cell_service.extract_cellset_composition(self, delete_cellset=False)
+        return self._composition
+
+    @property
+    def cellcount(self):
+        if self._cellcount is None:
+            if self._values is not None:
+                self._cellcount = len(self._values)
+            else:
+                self._check_open()
+                self._cellcount = self._cell_service.extract_cellset_cellcount(self, delete_cellset=False)
+        return self._cellcount
+
+    @property
+    def axes(self):
+        """ Raw axes (columns, rows and titles) with their tuples and hierarchies
+
+        :return: list of dict, as returned by TM1
+        """
+        return self._get_axes_response()["Axes"]
+
+    def values(self):
+        """ Values of all cells
+
+        :return: list
+        """
+        if self._values is None:
+            self._check_open()
+            self._values = list(self._cell_service.extract_cellset_values(self, delete_cellset=False))
+        return self._values
+
+    def pages(self, page_size=10000, cell_properties=None, **kwargs):
+        """ Iterate through the cells in pages, without holding all cells in memory
+
+        :param page_size: number of cells per request
+        :param cell_properties: list of properties to be queried from the cells. If None, values only
+        :return: generator of lists. Lists of values, or lists of dicts if cell_properties are specified
+        """
+        skip = 0
+        while True:
+            self._check_open()
+            cells = self._cell_service.extract_cellset_cells_page(
+                self, top=page_size, skip=skip, cell_properties=cell_properties, delete_cellset=False, **kwargs)
+            if cells:
+                yield [cell["Value"] for cell in cells] if cell_properties is None else cells
+            if len(cells) < page_size:
+                break
+            skip += page_size
+
+    def csv(self):
+        """ Coordinates and values as csv. Context dimensions and empty cells are omitted
+
+        :return: String
+        """
+        if self._csv is None:
+            self._check_open()
+            self._csv = self._cell_service.extract_cellset_csv(self, delete_cellset=False)
+        return self._csv
+
+    def to_dict(self):
+        """ Cells by coordinates, like CellService.extract_cellset
+
+        :return: CaseAndSpaceInsensitiveTuplesDict {(elem_unique_name, ...): {'Value': ...}, ...}
+        """
+        from TM1py.Utils.Utils import build_content_from_cellset
+        raw_cellset = dict(self._get_axes_response())
+        raw_cellset["Cells"] = [{"Value": value} for value in self.values()]
+        return build_content_from_cellset(raw_cellset_as_dict=raw_cellset)
+
+    def to_dataframe(self, **kwargs):
+        """ pandas DataFrame, like CellService.extract_cellset_dataframe.
+        Takes all arguments from the pandas.read_csv method
+
+        :return: pandas DataFrame
+        """
+        return self._cell_service.build_dataframe_from_csv(self.csv(), **kwargs)
+
+    def close(self):
+        """ Delete the cellset on the TM1 Server. Memoized results remain available
+        """
+        if not self._closed:
+            self._cell_service.delete_cellset(self)
+            self._closed = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __reduce__(self):
+        # the handle (with its connection) is not copied, copies are the plain cellset id
+        return str, (str(self),)
+
+    def _check_open(self):
+        if self._closed:
+            raise ValueError("Cellset '{}' is closed".format(self))
+
+    def _get_axes_response(self):
+        if self._axes_response is None:
+            self._check_open()
+            self._axes_response = self._cell_service.extract_cellset_axes(
+                self,
+                member_properties=self.MEMBER_PROPERTIES,
+                elem_properties=self.ELEMENT_PROPERTIES,
+                delete_cellset=False)
+        return self._axes_response
+
+    def _composition_from_axes(self):
+        axes = self._axes_response["Axes"]
+        hierarchies = [[hierarchy["UniqueName"] for hierarchy in axis.get("Hierarchies") or []] for axis in axes]
+        hierarchies += [[]] * (3 - len(hierarchies))
+        return self._axes_response["Cube"]["Name"], hierarchies[2], hierarchies[1], hierarchies[0]
@@ -0,0 +1,477 @@
+# -*- coding: utf-8 -*-
+
+import collections
+import collections.abc
+import math
+import sys
+from array import array
+
+from TM1py.Objects.Element import Element
+from TM1py.Objects.ElementAttribute import ElementAttribute
+from TM1py.Objects.Hierarchy import Hierarchy
+from TM1py.Objects.HierarchyIndex import HierarchyIndex
+from TM1py.Utils.Utils import lower_and_drop_spaces
+
+# element type code for elements that have been removed from a CompactHierarchy
+_REMOVED = 0
+
+
+class CompactHierarchy(Hierarchy):
+    """ Memory efficient, array backed variant of TM1py.Hierarchy for very large dimensions
+
+        Element names are interned and addressed through integer ids.
+        Element types are kept in a bytearray, attribute values in one column per attribute
+        and edges in three parallel arrays (parent id, child id, weight).
+
+        The public Hierarchy API is preserved: `elements` and `edges` are mapping views over the arrays,
+        that create TM1py.Element instances only on access. Thus CompactHierarchy instances can be
+        passed to DimensionService and HierarchyService like any other Hierarchy.
+    """
+
+    def __init__(self, name, dimension_name, elements=None, element_attributes=None,
+                 edges=None, subsets=None, structure=None, default_member=None):
+        super().__init__(
+            name=name,
+            dimension_name=dimension_name,
+            element_attributes=element_attributes,
+            subsets=subsets,
+            structure=structure,
+            default_member=default_member)
+        # the views take the place of the dicts of Hierarchy, so that inherited methods work on the arrays
+        self._elements = CompactElementsView(self)
+        self._edges = CompactEdgesView(self)
+
+        # element columns
+        self._names = []
+        self._ids = {}
+        self._types = bytearray()
+        self._indices = array('l')
+        self._attribute_columns = collections.OrderedDict()
+        self._has_attributes = False
+        self._number_of_removed_elements = 0
+
+        # edge columns
+        self._edge_parents = array('l')
+        self._edge_children = array('l')
+        self._edge_weights = array('d')
+        # (parent id, child id) -> position in edge columns. Only built when edges are addressed by key
+        self._edge_positions = None
+        # element id -> positions of its edges as parent or child. Only built when elements lose their edges
+        self._element_edge_positions = None
+        self._number_of_removed_edges = 0
+
+        # cache for repeated attribute values, e.g. 'Yes', 'No', currency codes
+        self._values = {}
+
+        if elements:
+            for element in elements:
+                self._append_element(
+                    name=element.name,
+                    element_type=element.element_type.value,
+                    index=element.index,
+                    attributes=element.element_attributes)
+        if edges:
+            for (parent, component), weight in edges.items():
+                self._append_edge(self._id(parent), self._id(component), weight)
+
+    @classmethod
+    def from_dict(cls, hierarchy_as_dict):
+        hierarchy = cls(
+            name=hierarchy_as_dict['Name'],
+            dimension_name=hierarchy_as_dict['UniqueName'][1:hierarchy_as_dict['UniqueName'].find("].[")],
+            element_attributes=[ElementAttribute(ea['Name'], ea['Type'])
+                                for ea in hierarchy_as_dict['ElementAttributes']],
+            subsets=[subset['Name'] for subset in hierarchy_as_dict['Subsets']],
+            structure=hierarchy_as_dict['Structure'] if 'Structure' in hierarchy_as_dict else None,
+            default_member=hierarchy_as_dict['DefaultMember']['Name']
+            if hierarchy_as_dict['DefaultMember'] else None)
+
+        for element in hierarchy_as_dict['Elements']:
+            hierarchy._append_element(
+                name=element['Name'],
+                element_type=Element.Types(element['Type']).value,
+                index=element.get('Index'),
+                attributes=element.get('Attributes'))
+        ids = hierarchy._ids
+        for edge in hierarchy_as_dict['Edges']:
+            hierarchy._append_edge(
+                ids[lower_and_drop_spaces(edge['ParentName'])],
+                ids[lower_and_drop_spaces(edge['ComponentName'])],
+                edge['Weight'])
+        return hierarchy
+
+    @classmethod
+    def from_hierarchy(cls, hierarchy):
+        """ Convert an existing TM1py.Hierarchy into a CompactHierarchy
+
+        :param hierarchy: instance of TM1py.Hierarchy
+        :return: instance of CompactHierarchy
+        """
+        return cls(
+            name=hierarchy.name,
+            dimension_name=hierarchy.dimension_name,
+            elements=hierarchy,
+            element_attributes=list(hierarchy.element_attributes),
+            edges=hierarchy.edges,
+            subsets=list(hierarchy.subsets),
+            default_member=hierarchy.default_member)
+
+    def _id(self, element_name):
+        try:
+            return self._ids[lower_and_drop_spaces(element_name)]
+        except KeyError:
+            raise ValueError("Element: {} not found in Hierarchy: {}".format(element_name, self.name))
+
+    def _numeric_attributes(self):
+        return {lower_and_drop_spaces(ea.name)
+                for ea
+                in self._element_attributes
+                if ea.attribute_type.upper() == 'NUMERIC'}
+
+    def _new_column(self, attribute, numeric):
+        size = len(self._names)
+        if numeric:
+            column = array('d', [math.nan]) * size
+        else:
+            column = [None] * size
+        self._attribute_columns[attribute] = column
+        return column
+
+    def _append_element(self, name, element_type, index=None, attributes=None):
+        name = sys.intern(name)
+        element_id = len(self._names)
+        self._names.append(name)
+        self._ids[sys.intern(lower_and_drop_spaces(name))] = element_id
+        self._types.append(element_type)
+        self._indices.append(index if index is not None else -1)
+
+        numeric_attributes = None
+        for column in self._attribute_columns.values():
+            column.append(math.nan if isinstance(column, array) else None)
+        if attributes:
+            self._has_attributes = True
+            for attribute, value in attributes.items():
+                column = self._attribute_columns.get(attribute)
+                if column is None:
+                    if numeric_attributes is None:
+                        numeric_attributes = self._numeric_attributes()
+                    column = self._new_column(
+                        attribute,
+                        lower_and_drop_spaces(attribute) in numeric_attributes or isinstance(value, (int, float)))
+                self._set_attribute_value(column, element_id, value)
+        return element_id
+
+    def _set_attribute_value(self, column, element_id, value):
+        if isinstance(column, array):
+            column[element_id] = math.nan if value is None or value == '' else float(value)
+        elif isinstance(value, str):
+            column[element_id] = self._values.setdefault(value, value)
+        else:
+            column[element_id] = value
+
+    def _append_edge(self, parent_id, child_id, weight):
+        if self._edge_positions is not None:
+            self._edge_positions[(parent_id, child_id)] = len(self._edge_parents)
+        if self._element_edge_positions is not None:
+            self._element_edge_positions[parent_id].append(len(self._edge_parents))
+            self._element_edge_positions[child_id].append(len(self._edge_parents))
+        self._edge_parents.append(parent_id)
+        self._edge_children.append(child_id)
+        self._edge_weights.append(weight)
+
+    def _get_edge_positions(self):
+        if self._edge_positions is None:
+            self._edge_positions = {(parent_id, child_id): position
+                                    for position, (parent_id, child_id)
+                                    in enumerate(zip(self._edge_parents, self._edge_children))
+                                    if parent_id != -1}
+        return self._edge_positions
+
+    def _get_element_edge_positions(self):
+        if self._element_edge_positions is None:
+            self._element_edge_positions = collections.defaultdict(list)
+            for position in self._live_edge_positions():
+                self._element_edge_positions[self._edge_parents[position]].append(position)
+                self._element_edge_positions[self._edge_children[position]].append(position)
+        return self._element_edge_positions
+
+    def _remove_edges_of(self, element_id):
+        # positions of edges removed since the index was built are skipped
+        for position in self._get_element_edge_positions().pop(element_id, ()):
+            if self._edge_parents[position] != -1:
+                self._remove_edge_at(position)
+
+    def _remove_edge_at(self, position):
+        if self._edge_positions is not None:
+            del self._edge_positions[(self._edge_parents[position], self._edge_children[position])]
+        self._edge_parents[position] = -1
+        self._edge_children[position] = -1
+        self._number_of_removed_edges += 1
+
+    def _live_element_ids(self):
+        return (element_id for element_id, element_type in enumerate(self._types) if element_type != _REMOVED)
+
+    def _live_edge_positions(self):
+        return (position for position, parent_id in enumerate(self._edge_parents) if parent_id != -1)
+
+    def _build_element(self, element_id):
+        name = self._names[element_id]
+        attributes = None
+        if self._has_attributes:
+            attributes = collections.OrderedDict()
+            for attribute, column in self._attribute_columns.items():
+                value = column[element_id]
+                if isinstance(column, array) and math.isnan(value):
+                    value = None
+                attributes[attribute] = value
+        index = self._indices[element_id]
+        return Element(
+            name=name,
+            element_type=self._types[element_id],
+            attributes=attributes,
+            unique_name="[{}].[{}].[{}]".format(self._dimension_name, self._name, name),
+            index=index if index != -1 else None)
+
+    def contains_element(self, element_name):
+        return lower_and_drop_spaces(element_name) in self._ids
+
+    def get_element(self, element_name):
+        if element_name in self:
+            return self._build_element(self._ids[lower_and_drop_spaces(element_name)])
+        else:
+            raise ValueError("Element: {} not found in Hierarchy: {}".format(element_name, self.name))
+
+    def get_element_type(self, element_name):
+        """ Get element type without materializing an Element instance
+
+        :param element_name:
+        :return: instance of TM1py.Element.Types
+        """
+        return Element.Types(self._types[self._id(element_name)])
+
+    def get_attribute_value(self, element_name, attribute_name):
+        """ Get attribute value without materializing an Element instance
+
+        :param element_name:
+        :param attribute_name:
+        :return: value or None
+        """
+        column = self._attribute_column(attribute_name)
+        value = column[self._id(element_name)]
+        if isinstance(column, array) and math.isnan(value):
+            return None
+        return value
+
+    def get_attribute_column(self, attribute_name):
+        """ Get all values of one attribute as list, aligned with the element names
+
+        :param attribute_name:
+        :return: list of values
+        """
+        column = self._attribute_column(attribute_name)
+        return [None if isinstance(column, array) and math.isnan(column[element_id]) else column[element_id]
+                for element_id
+                in self._live_element_ids()]
+
+    def _attribute_column(self, attribute_name):
+        attribute_name_adjusted = lower_and_drop_spaces(attribute_name)
+        for attribute, column in self._attribute_columns.items():
+            if lower_and_drop_spaces(attribute) == attribute_name_adjusted:
+                return column
+        raise ValueError("Attribute: {} not found in Hierarchy: {}".format(attribute_name, self.name))
+
+    @property
+    def element_names(self):
+        return [self._names[element_id] for element_id in self._live_element_ids()]
+
+    def add_element(self, element_name, element_type):
+        if element_name in self:
+            raise Exception("Elementname must be unique")
+        self._append_element(element_name, Element.Types(element_type).value)
+
+    def update_element(self, element_name, element_type=None):
+        element_id = self._id(element_name)
+        if element_type is not None:
+            self._types[element_id] = Element.Types(element_type).value
+
+    def remove_element(self, element_name):
+        if element_name not in self:
+            return
+        element_id = self._ids.pop(lower_and_drop_spaces(element_name))
+        self._types[element_id] = _REMOVED
+        self._number_of_removed_elements += 1
+        self._remove_edges_of(element_id)
+
+    def add_edge(self, parent, component, weight):
+        parent_id, child_id = self._id(parent), self._id(component)
+        position = self._get_edge_positions().get((parent_id, child_id))
+        if position is None:
+            self._append_edge(parent_id, child_id, weight)
+        else:
+            self._edge_weights[position] = weight
+
+    def update_edge(self, parent, component, weight):
+        self.add_edge(parent, component, weight)
+
+    def remove_edge(self, parent, component):
+        if parent not in self or component not in self:
+            return
+        position = self._get_edge_positions().get((self._id(parent), self._id(component)))
+        if position is not None:
+            self._remove_edge_at(position)
+
+    def remove_edges_related_to_element(self, element_name):
+        if element_name not in self:
+            return
+        self._remove_edges_of(self._id(element_name))
+
+    def to_index(self, version=None):
+        """ Build a HierarchyIndex straight from the arrays
+
+        :param version: version of the hierarchy on the TM1 Server
+        :return: instance of TM1py.HierarchyIndex
+        """
+        live_ids = list(self._live_element_ids())
+        new_ids = {element_id: new_id for new_id, element_id in enumerate(live_ids)}
+        return HierarchyIndex(
+            dimension_name=self._dimension_name,
+            hierarchy_name=self._name,
+            element_names=[self._names[element_id] for element_id in live_ids],
+            element_types=[self._types[element_id] for element_id in live_ids],
+            edges=((new_ids[self._edge_parents[position]],
+                    new_ids[self._edge_children[position]],
+                    self._edge_weights[position])
+                   for position
+                   in self._live_edge_positions()),
+            version=version)
+
+    def _construct_body(self, element_attributes=False):
+        body_as_dict = collections.OrderedDict()
+        body_as_dict['Name'] = self._name
+        names, types = self._names, self._types
+        type_names = {element_type.value: str(element_type) for element_type in Element.Types}
+        body_as_dict['Elements'] = [{'Name': names[element_id], 'Type': type_names[types[element_id]]}
+                                    for element_id
+                                    in self._live_element_ids()]
+        body_as_dict['Edges'] = [{'ParentName': names[self._edge_parents[position]],
+                                  'ComponentName': names[self._edge_children[position]],
+                                  'Weight': self._edge_weights[position]}
+                                 for position
+                                 in self._live_edge_positions()]
+        if element_attributes:
+            body_as_dict['ElementAttributes'] = [element_attribute.body_as_dict
+                                                 for element_attribute
+                                                 in self._element_attributes]
+        return body_as_dict
+
+    def __iter__(self):
+        return (self._build_element(element_id) for element_id in self._live_element_ids())
+
+    def __len__(self):
+        return len(self._names) - self._number_of_removed_elements
+
+
+class CompactElementsView(collections.abc.MutableMapping):
+    """ Case-and-space-insensitive mapping view: element name -> TM1py.Element, over a CompactHierarchy
+    """
+
+    def __init__(self, hierarchy):
+        self._hierarchy = hierarchy
+
+    def __getitem__(self, key):
+        hierarchy = self._hierarchy
+        try:
+            element_id = hierarchy._ids[lower_and_drop_spaces(key)]
+        except KeyError:
+            raise KeyError(key)
+        return hierarchy._build_element(element_id)
+
+    def __setitem__(self, key, element):
+        hierarchy = self._hierarchy
+        if key in hierarchy:
+            hierarchy._types[hierarchy._id(key)] = element.element_type.value
+        else:
+            hierarchy._append_element(
+                name=element.name,
+                element_type=element.element_type.value,
+                index=element.index,
+                attributes=element.element_attributes)
+
+    def __delitem__(self, key):
+        if key not in self._hierarchy:
+            raise KeyError(key)
+        self._hierarchy.remove_element(key)
+
+    def __contains__(self, key):
+        return self._hierarchy.contains_element(key)
+
+    def __iter__(self):
+        names = self._hierarchy._names
+        return (names[element_id] for element_id in self._hierarchy._live_element_ids())
+
+    def __len__(self):
+        return len(self._hierarchy)
+
+    def adjusted_keys(self):
+        return (lower_and_drop_spaces(name) for name in self)
+
+    def adjusted_items(self):
+        return ((lower_and_drop_spaces(name), self[name]) for name in self)
+
+
+class CompactEdgesView(collections.abc.MutableMapping):
+    """ Case-and-space-insensitive mapping view: (parent, component) -> weight, over a CompactHierarchy
+    """
+
+    def __init__(self, hierarchy):
+        self._hierarchy = hierarchy
+
+    def _position(self, key):
+        hierarchy = self._hierarchy
+        parent, component = key
+        parent_id = hierarchy._ids.get(lower_and_drop_spaces(parent))
+        child_id = hierarchy._ids.get(lower_and_drop_spaces(component))
+        position = hierarchy._get_edge_positions().get((parent_id, child_id))
+        if position is None:
+            raise KeyError(key)
+        return position
+
+    def __getitem__(self, key):
+        return self._hierarchy._edge_weights[self._position(key)]
+
+    def __setitem__(self, key, weight):
+        self._hierarchy.add_edge(key[0], key[1], weight)
+
+    def __delitem__(self, key):
+        self._hierarchy._remove_edge_at(self._position(key))
+
+    def __contains__(self, key):
+        try:
+            self._position(key)
+            return True
+        except KeyError:
+            return False
+
+    def __iter__(self):
+        hierarchy = self._hierarchy
+        names, parents, children = hierarchy._names, hierarchy._edge_parents, hierarchy._edge_children
+        return ((names[parents[position]], names[children[position]])
+                for position
+                in hierarchy._live_edge_positions())
+
+    def __len__(self):
+        return len(self._hierarchy._edge_parents) - self._hierarchy._number_of_removed_edges
+
+    def items(self):
+        hierarchy = self._hierarchy
+        names, parents, children = hierarchy._names, hierarchy._edge_parents, hierarchy._edge_children
+        weights = hierarchy._edge_weights
+        return [((names[parents[position]], names[children[position]]), weights[position])
+                for position
+                in hierarchy._live_edge_positions()]
+
+    def adjusted_keys(self):
+        return (tuple(lower_and_drop_spaces(name) for name in edge) for edge in self)
+
+    def adjusted_items(self):
+        return ((tuple(lower_and_drop_spaces(name) for name in edge), weight) for edge, weight in self.items())
@@ -3,6 +3,7 @@
 import collections
 import json
 
+from TM1py.Objects.CompactHierarchy import CompactHierarchy
 from TM1py.Objects.Hierarchy import Hierarchy
 from TM1py.Objects.TM1Object import TM1Object
 from TM1py.Utils.Utils import case_and_space_insensitive_equals
@@ -25,14 +26,21 @@ class Dimension(TM1Object):
         self._attributes = {'Caption': name}
 
     @classmethod
-    def from_json(cls, dimension_as_json):
+    def from_json(cls, dimension_as_json, compact=False):
         dimension_as_dict = json.loads(dimension_as_json)
-        return cls.from_dict(dimension_as_dict)
+        return cls.from_dict(dimension_as_dict, compact=compact)
 
     @classmethod
-    def from_dict(cls, dimension_as_dict):
+    def from_dict(cls, dimension_as_dict, compact=False):
+        """ Alternative constructor
+
+        :param dimension_as_dict: dimension as dict
+        :param compact: build hierarchies as TM1py.CompactHierarchy. Recommended for very large dimensions
+        :return: instance of TM1py.Dimension
+        """
+        hierarchy_class = CompactHierarchy if compact else Hierarchy
         return cls(name=dimension_as_dict['Name'],
-                   hierarchies=[Hierarchy.from_dict(hierarchy)
+                   hierarchies=[hierarchy_class.from_dict(hierarchy)
                                 for hierarchy
                                 in dimension_as_dict['Hierarchies']])
 
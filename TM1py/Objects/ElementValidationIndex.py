@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+
+import hashlib
+from collections import OrderedDict
+from collections.abc import Mapping
+
+from TM1py.Utils.Utils import CaseAndSpaceInsensitiveDict, lower_and_drop_spaces
+
+
+class ElementValidationIndex:
+    """ Client side index of the element names and aliases of a list of dimensions (e.g. the dimensions of a cube),
+    to validate cell coordinates before they are written.
+
+    A single invalid element fails a whole write request. With the index, invalid cells can be split off
+    in bulk, without a request per element:
+
+    >>> index = tm1.dimensions.hierarchies.elements.get_validation_index(['Year', 'Region', 'Measure'])
+    >>> valid, invalid = index.validate(cells)
+    >>> tm1.cubes.cells.write_values('Sales', valid)
+    """
+
+    def __init__(self, dimension_names, identifiers, versions=None):
+        """
+
+        :param dimension_names: dimension names in the order of the element tuples
+        :param identifiers: iterable of CaseAndSpaceInsensitiveSet (element names and aliases) aligned to dimensions
+        :param versions: versions of the identifiers (see fingerprint)
+        """
+        self._dimension_names = list(dimension_names)
+        self._identifiers = list(identifiers)
+        self._versions = list(versions) if versions else [None] * len(self._dimension_names)
+        self._positions = CaseAndSpaceInsensitiveDict(
+            (dimension_name, position)
+            for position, dimension_name
+            in enumerate(self._dimension_names))
+
+    @property
+    def dimension_names(self):
+        return list(self._dimension_names)
+
+    @property
+    def versions(self):
+        return list(self._versions)
+
+    def get_identifiers(self, dimension_name):
+        """ Element names and aliases of a dimension
+
+        :param dimension_name:
+        :return: CaseAndSpaceInsensitiveSet
+        """
+        return self._identifiers[self._positions[dimension_name]]
+
+    def get_version(self, dimension_name):
+        """ Version of the element names and aliases of a dimension
+
+        :param dimension_name:
+        :return: String, hex digest (see fingerprint) or None
+        """
+        return self._versions[self._positions[dimension_name]]
+
+    def set_identifiers(self, dimension_name, identifiers, version=None):
+        """ Replace the element names and aliases of a dimension
+
+        :param dimension_name:
+        :param identifiers: CaseAndSpaceInsensitiveSet
+        :param version: version of the identifiers (see fingerprint)
+        :return:
+        """
+        position = self._positions[dimension_name]
+        self._identifiers[position] = identifiers
+        self._versions[position] = version
+
+    @staticmethod
+    def fingerprint(identifiers):
+        """ Version of a set of element names and aliases. Changes with added, removed and renamed elements
+        and with changed alias values
+
+        :param identifiers: CaseAndSpaceInsensitiveSet
+        :return: String, hex digest
+        """
+        return hashlib.sha256("\n".join(sorted(
+            lower_and_drop_spaces(identifier)
+            for identifier
+            in identifiers)).encode('utf-8')).hexdigest()
+
+    def contains(self, dimension_name, element_name):
+        return str(element_name) in self.get_identifiers(dimension_name)
+
+    def validate(self, cells):
+        """ Split cells into valid and invalid ones.
+        Every distinct element is looked up once per dimension.
+
+        :param cells: dict {(elem_a, elem_b, elem_c): value, ...} or iterable of element tuples
+        :return: valid cells (dict or list, like the input), dict of invalid element tuples -> reason
+        """
+        is_dict = isinstance(cells, Mapping)
+        valid = OrderedDict() if is_dict else []
+        invalid = OrderedDict()
+        known = [{} for _ in self._dimension_names]
+        for element_tuple in cells:
+            reason = self._check_tuple(element_tuple, known)
+            if reason:
+                invalid[tuple(element_tuple)] = reason
+            elif is_dict:
+                valid[element_tuple] = cells[element_tuple]
+            else:
+                valid.append(element_tuple)
+        return valid, invalid
+
+    def _check_tuple(self, element_tuple, known):
+        if len(element_tuple) != len(self._dimension_names):
+            return "Expected {} elements, got {}".format(len(self._dimension_names), len(element_tuple))
+        reasons = []
+        for position, element_name in enumerate(element_tuple):
+            exists = known[position].get(element_name)
+            if exists is None:
+                exists = known[position][element_name] = str(element_name) in self._identifiers[position]
+            if not exists:
+                reasons.append("Element '{}' doesn't exist in dimension '{}'".format(
+                    element_name, self._dimension_names[position]))
+        return "; ".join(reasons)
+
+    def __repr__(self):
+        return "ElementValidationIndex({})".format(", ".join(
+            "{}: {}".format(dimension_name, len(identifiers))
+            for dimension_name, identifiers
+            in zip(self._dimension_names, self._identifiers)))
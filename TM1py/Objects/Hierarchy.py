@@ -128,7 +128,9 @@ class Hierarchy(TM1Object):
         self._elements[element_name] = e
 
     def update_element(self, element_name, element_type=None):
-        self._elements[element_name].element_type = element_type
+        element = self._elements[element_name]
+        if element_type is not None:
+            element.element_type = element_type
 
     def remove_element(self, element_name):
         if element_name not in self._elements:
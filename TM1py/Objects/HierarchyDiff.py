@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+
+import collections
+
+from TM1py.Objects.Element import Element
+from TM1py.Utils.Utils import lower_and_drop_spaces
+
+
+class HierarchyDiff:
+    """ Difference between two states of a TM1 Hierarchy: a base (e.g. the state on the TM1 Server
+        or a cached snapshot) and a target (the local Hierarchy that shall be written)
+
+        All comparisons are case and space insensitive and done through set operations on the
+        normalized element names and (parent, component) tuples.
+
+        Edges that hang on elements that are removed are not listed in `edges_to_remove`,
+        since TM1 drops them together with the element.
+    """
+
+    def __init__(self, dimension_name, hierarchy_name, elements_to_add=None, elements_to_remove=None,
+                 elements_to_update=None, edges_to_add=None, edges_to_remove=None, edges_to_update=None,
+                 element_attributes_to_add=None, element_attributes_to_remove=None):
+        """
+
+        :param dimension_name: name of the dimension
+        :param hierarchy_name: name of the hierarchy
+        :param elements_to_add: dict, element name -> element type
+        :param elements_to_remove: list of element names
+        :param elements_to_update: dict, element name -> new element type
+        :param edges_to_add: dict, (parent, component) -> weight
+        :param edges_to_remove: list of (parent, component) tuples
+        :param edges_to_update: dict, (parent, component) -> new weight
+        :param element_attributes_to_add: list of TM1py.ElementAttribute
+        :param element_attributes_to_remove: list of element attribute names
+        """
+        self._dimension_name = dimension_name
+        self._hierarchy_name = hierarchy_name
+        self.elements_to_add = elements_to_add if elements_to_add else collections.OrderedDict()
+        self.elements_to_remove = elements_to_remove if elements_to_remove else []
+        self.elements_to_update = elements_to_update if elements_to_update else collections.OrderedDict()
+        self.edges_to_add = edges_to_add if edges_to_add else collections.OrderedDict()
+        self.edges_to_remove = edges_to_remove if edges_to_remove else []
+        self.edges_to_update = edges_to_update if edges_to_update else collections.OrderedDict()
+        self.element_attributes_to_add = element_attributes_to_add if element_attributes_to_add else []
+        self.element_attributes_to_remove = element_attributes_to_remove if element_attributes_to_remove else []
+
+    @classmethod
+    def from_hierarchies(cls, base, target):
+        """ Compute the operations required to turn `base` into `target`
+
+        :param base: instance of TM1py.Hierarchy (or TM1py.CompactHierarchy). State on the TM1 Server
+        :param target: instance of TM1py.Hierarchy (or TM1py.CompactHierarchy). Desired state
+        :return: instance of HierarchyDiff
+        """
+        base_elements = cls._element_types(base)
+        target_elements = cls._element_types(target)
+        base_edges = cls._edges(base)
+        target_edges = cls._edges(target)
+
+        removed_keys = base_elements.keys() - target_elements.keys()
+        elements_to_add = collections.OrderedDict(
+            (name, element_type)
+            for key, (name, element_type)
+            in target_elements.items()
+            if key not in base_elements)
+        elements_to_remove = [base_elements[key][0] for key in base_elements if key in removed_keys]
+        elements_to_update = collections.OrderedDict(
+            (name, element_type)
+            for key, (name, element_type)
+            in target_elements.items()
+            if key in base_elements and base_elements[key][1] != element_type)
+
+        edges_to_add = collections.OrderedDict(
+            (edge, weight)
+            for key, (edge, weight)
+            in target_edges.items()
+            if key not in base_edges)
+        edges_to_remove = [edge
+                           for key, (edge, _)
+                           in base_edges.items()
+                           if key not in target_edges
+                           and key[0] not in removed_keys
+                           and key[1] not in removed_keys]
+        edges_to_update = collections.OrderedDict(
+            (edge, weight)
+            for key, (edge, weight)
+            in target_edges.items()
+            if key in base_edges and base_edges[key][1] != weight)
+
+        base_attributes = {lower_and_drop_spaces(attribute.name): attribute
+                           for attribute
+                           in base.element_attributes}
+        target_attributes = {lower_and_drop_spaces(attribute.name): attribute
+                             for attribute
+                             in target.element_attributes}
+        element_attributes_to_add = [attribute
+                                     for key, attribute
+                                     in target_attributes.items()
+                                     if key not in base_attributes]
+        element_attributes_to_remove = [attribute.name
+                                        for key, attribute
+                                        in base_attributes.items()
+                                        if key not in target_attributes]
+
+        return cls(
+            dimension_name=target.dimension_name,
+            hierarchy_name=target.name,
+            elements_to_add=elements_to_add,
+            elements_to_remove=elements_to_remove,
+            elements_to_update=elements_to_update,
+            edges_to_add=edges_to_add,
+            edges_to_remove=edges_to_remove,
+            edges_to_update=edges_to_update,
+            element_attributes_to_add=element_attributes_to_add,
+            element_attributes_to_remove=element_attributes_to_remove)
+
+    @staticmethod
+    def _element_types(hierarchy):
+        """ normalized element name -> (element name, element type as int)
+        """
+        if hasattr(hierarchy, 'element_names'):
+            # CompactHierarchy: read types straight from the arrays, without building Element instances
+            return collections.OrderedDict(
+                (lower_and_drop_spaces(name), (name, hierarchy.get_element_type(name).value))
+                for name
+                in hierarchy.element_names)
+        return collections.OrderedDict(
+            (lower_and_drop_spaces(element.name), (element.name, element.element_type.value))
+            for element
+            in hierarchy)
+
+    @staticmethod
+    def _edges(hierarchy):
+        """ normalized (parent, component) -> ((parent, component), weight)
+        """
+        return collections.OrderedDict(
+            ((lower_and_drop_spaces(parent), lower_and_drop_spaces(component)), ((parent, component), weight))
+            for (parent, component), weight
+            in hierarchy.edges.items())
+
+    @property
+    def dimension_name(self):
+        return self._dimension_name
+
+    @property
+    def hierarchy_name(self):
+        return self._hierarchy_name
+
+    @property
+    def number_of_operations(self):
+        return sum(len(operations) for operations in (
+            self.elements_to_add, self.elements_to_remove, self.elements_to_update,
+            self.edges_to_add, self.edges_to_remove, self.edges_to_update,
+            self.element_attributes_to_add, self.element_attributes_to_remove))
+
+    def is_empty(self):
+        return self.number_of_operations == 0
+
+    @staticmethod
+    def element_type_name(element_type):
+        return str(Element.Types(element_type))
+
+    def __len__(self):
+        return self.number_of_operations
+
+    def __repr__(self):
+        return "HierarchyDiff({}:{}, +{}/-{}/~{} elements, +{}/-{}/~{} edges, +{}/-{} attributes)".format(
+            self._dimension_name, self._hierarchy_name,
+            len(self.elements_to_add), len(self.elements_to_remove), len(self.elements_to_update),
+            len(self.edges_to_add), len(self.edges_to_remove), len(self.edges_to_update),
+            len(self.element_attributes_to_add), len(self.element_attributes_to_remove))
@@ -0,0 +1,363 @@
+# -*- coding: utf-8 -*-
+
+import hashlib
+import json
+from array import array
+from collections import deque
+
+from TM1py.Utils.Utils import lower_and_drop_spaces
+
+
+class HierarchyIndex:
+    """ Read-only, in-memory index over the structure of a TM1 Hierarchy
+
+        Elements are addressed through integer ids (their position in the Elements collection).
+        Parent -> children and child -> parents relations are stored in CSR style adjacency arrays:
+
+            children of element i: child_ids[child_offsets[i]:child_offsets[i + 1]]
+            parents of element i: parent_ids[parent_offsets[i]:parent_offsets[i + 1]]
+
+        Built once from Elements and Edges, it answers descendants, leaves, ancestors,
+        levels and weighted rollup factors without further requests to the TM1 Server.
+    """
+
+    NUMERIC = 1
+    STRING = 2
+    CONSOLIDATED = 3
+
+    def __init__(self, dimension_name, hierarchy_name, element_names, element_types, edges, version=None):
+        """
+
+        :param dimension_name: name of the dimension
+        :param hierarchy_name: name of the hierarchy
+        :param element_names: list of element names. Position in list is the element id
+        :param element_types: iterable of element types (1: Numeric, 2: String, 3: Consolidated) aligned to names
+        :param edges: iterable of (parent_id, child_id, weight) tuples
+        :param version: version of the structure the index is built from (see fingerprint)
+        """
+        self._dimension_name = dimension_name
+        self._hierarchy_name = hierarchy_name
+        self._names = list(element_names)
+        self._types = array('b', element_types)
+        self._ids = {lower_and_drop_spaces(name): element_id for element_id, name in enumerate(self._names)}
+        self._version = version
+        self._levels = None
+        self._build_adjacency(edges)
+
+    def _build_adjacency(self, edges):
+        size = len(self._names)
+        edge_parents, edge_children, edge_weights = array('l'), array('l'), array('d')
+        for parent_id, child_id, weight in edges:
+            edge_parents.append(parent_id)
+            edge_children.append(child_id)
+            edge_weights.append(weight)
+
+        self._child_offsets, self._child_ids, self._child_weights = self._csr(
+            size, edge_parents, edge_children, edge_weights)
+        self._parent_offsets, self._parent_ids, _ = self._csr(
+            size, edge_children, edge_parents, edge_weights)
+
+    @staticmethod
+    def _csr(size, sources, targets, weights):
+        """ counting sort of the edges by source id. Original edge order is kept per source
+        """
+        offsets = array('l', [0]) * (size + 1)
+        for source in sources:
+            offsets[source + 1] += 1
+        for position in range(size):
+            offsets[position + 1] += offsets[position]
+
+        cursor = array('l', offsets)
+        sorted_targets = array('l', [0]) * len(targets)
+        sorted_weights = array('d', [0.0]) * len(weights)
+        for source, target, weight in zip(sources, targets, weights):
+            position = cursor[source]
+            sorted_targets[position] = target
+            sorted_weights[position] = weight
+            cursor[source] = position + 1
+        return offsets, sorted_targets, sorted_weights
+
+    @classmethod
+    def from_dict(cls, hierarchy_as_dict, dimension_name=None, version=None):
+        """ Alternative constructor
+
+        :param hierarchy_as_dict: dict with 'Name', 'Elements' (Name, Type) and 'Edges' (ParentName, ComponentName, Weight)
+        :param dimension_name: name of the dimension. Derived from 'UniqueName' if not passed
+        :param version: version of the structure (see fingerprint)
+        :return: instance of HierarchyIndex
+        """
+        if not dimension_name:
+            unique_name = hierarchy_as_dict['UniqueName']
+            dimension_name = unique_name[1:unique_name.find("].[")]
+
+        names = [element['Name'] for element in hierarchy_as_dict['Elements']]
+        types = [cls._type_to_int(element['Type']) for element in hierarchy_as_dict['Elements']]
+        ids = {lower_and_drop_spaces(name): element_id for element_id, name in enumerate(names)}
+        edges = ((ids[lower_and_drop_spaces(edge['ParentName'])],
+                  ids[lower_and_drop_spaces(edge['ComponentName'])],
+                  edge['Weight'])
+                 for edge
+                 in hierarchy_as_dict['Edges'])
+        return cls(
+            dimension_name=dimension_name,
+            hierarchy_name=hierarchy_as_dict['Name'],
+            element_names=names,
+            element_types=types,
+            edges=edges,
+            version=version)
+
+    @staticmethod
+    def fingerprint(hierarchy_as_dict):
+        """ Version of a hierarchy structure: a hash of the element names and types and of the edges with
+        their weights, in the order of the TM1 Server. Changes with renames, reparenting and weight changes
+
+        :param hierarchy_as_dict: dict with 'Elements' (Name, Type) and 'Edges' (ParentName, ComponentName, Weight)
+        :return: String, hex digest
+        """
+        structure = (
+            [(element['Name'], element['Type']) for element in hierarchy_as_dict['Elements']],
+            [(edge['ParentName'], edge['ComponentName'], edge['Weight']) for edge in hierarchy_as_dict['Edges']])
+        return hashlib.sha256(json.dumps(structure, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+    @classmethod
+    def from_hierarchy(cls, hierarchy, version=None):
+        """ Alternative constructor
+
+        :param hierarchy: instance of TM1py.Hierarchy
+        :param version: version of the structure (see fingerprint)
+        :return: instance of HierarchyIndex
+        """
+        names = [element.name for element in hierarchy]
+        types = [element.element_type.value for element in hierarchy]
+        ids = {lower_and_drop_spaces(name): element_id for element_id, name in enumerate(names)}
+        edges = ((ids[parent], ids[component], weight)
+                 for (parent, component), weight
+                 in hierarchy.edges.adjusted_items())
+        return cls(
+            dimension_name=hierarchy.dimension_name,
+            hierarchy_name=hierarchy.name,
+            element_names=names,
+            element_types=types,
+            edges=edges,
+            version=version)
+
+    @staticmethod
+    def _type_to_int(element_type):
+        if isinstance(element_type, int):
+            return element_type
+        return {'numeric': 1, 'string': 2, 'consolidated': 3}[element_type.lower()]
+
+    @property
+    def dimension_name(self):
+        return self._dimension_name
+
+    @property
+    def hierarchy_name(self):
+        return self._hierarchy_name
+
+    @property
+    def version(self):
+        return self._version
+
+    @property
+    def element_names(self):
+        return list(self._names)
+
+    def element_id(self, element_name):
+        """ Get integer id of an element. Case and space insensitive
+
+        :param element_name:
+        :return: int
+        """
+        try:
+            return self._ids[lower_and_drop_spaces(element_name)]
+        except KeyError:
+            raise ValueError("Element: {} not found in Hierarchy: {}".format(element_name, self._hierarchy_name))
+
+    def element_name(self, element_id):
+        return self._names[element_id]
+
+    def element_type(self, element_name):
+        return self._types[self.element_id(element_name)]
+
+    def contains_element(self, element_name):
+        return lower_and_drop_spaces(element_name) in self._ids
+
+    def is_leaf(self, element_name):
+        return self._types[self.element_id(element_name)] != self.CONSOLIDATED
+
+    def _child_range(self, element_id):
+        return range(self._child_offsets[element_id], self._child_offsets[element_id + 1])
+
+    def _parent_range(self, element_id):
+        return range(self._parent_offsets[element_id], self._parent_offsets[element_id + 1])
+
+    def children(self, element_name):
+        """ Get direct children of an element in edge order
+
+        :param element_name:
+        :return: list of element names
+        """
+        element_id = self.element_id(element_name)
+        return [self._names[self._child_ids[position]] for position in self._child_range(element_id)]
+
+    def parents(self, element_name):
+        """ Get direct parents of an element
+
+        :param element_name:
+        :return: list of element names
+        """
+        element_id = self.element_id(element_name)
+        return [self._names[self._parent_ids[position]] for position in self._parent_range(element_id)]
+
+    def _descendant_ids(self, element_id, max_depth=None):
+        """ breadth first traversal. Each descendant is returned once, even when reachable through multiple paths
+        """
+        visited = {element_id}
+        result = []
+        queue = deque([(element_id, 0)])
+        while queue:
+            current, depth = queue.popleft()
+            if max_depth is not None and depth >= max_depth:
+                continue
+            for position in self._child_range(current):
+                child = self._child_ids[position]
+                if child not in visited:
+                    visited.add(child)
+                    result.append(child)
+                    queue.append((child, depth + 1))
+        return result
+
+    def descendants(self, element_name, leaves_only=False, max_depth=None):
+        """ Get all members under a consolidated element
+
+        :param element_name: name of consolidated element
+        :param leaves_only: Only Leaf Elements or all Elements
+        :param max_depth: limit traversal depth. None for unlimited
+        :return: list of element names
+        """
+        ids = self._descendant_ids(self.element_id(element_name), max_depth)
+        if leaves_only:
+            return [self._names[i] for i in ids if self._types[i] != self.CONSOLIDATED]
+        return [self._names[i] for i in ids]
+
+    def leaves(self, element_name):
+        """ Get all leaves under an element. A leaf element returns itself
+
+        :param element_name:
+        :return: list of element names
+        """
+        element_id = self.element_id(element_name)
+        if self._types[element_id] != self.CONSOLIDATED:
+            return [self._names[element_id]]
+        return self.descendants(element_name, leaves_only=True)
+
+    def ancestors(self, element_name):
+        """ Get all consolidations that an element rolls up into, across all paths
+
+        :param element_name:
+        :return: list of element names
+        """
+        element_id = self.element_id(element_name)
+        visited = {element_id}
+        result = []
+        queue = deque([element_id])
+        while queue:
+            current = queue.popleft()
+            for position in self._parent_range(current):
+                parent = self._parent_ids[position]
+                if parent not in visited:
+                    visited.add(parent)
+                    result.append(parent)
+                    queue.append(parent)
+        return [self._names[i] for i in result]
+
+    def roots(self):
+        """ Get all elements without parents
+
+        :return: list of element names
+        """
+        return [name
+                for element_id, name
+                in enumerate(self._names)
+                if self._parent_offsets[element_id] == self._parent_offsets[element_id + 1]]
+
+    def _compute_levels(self):
+        """ TM1 levels: leaves are level 0, consolidations are 1 + max level of their children.
+        Iterative post-order traversal to avoid recursion limits on deep hierarchies
+        """
+        size = len(self._names)
+        levels = array('l', [-1]) * size
+        for start in range(size):
+            if levels[start] != -1:
+                continue
+            stack = [(start, False)]
+            while stack:
+                current, children_done = stack.pop()
+                if levels[current] != -1:
+                    continue
+                if children_done:
+                    level = 0
+                    for position in self._child_range(current):
+                        level = max(level, levels[self._child_ids[position]] + 1)
+                    levels[current] = level
+                else:
+                    stack.append((current, True))
+                    for position in self._child_range(current):
+                        child = self._child_ids[position]
+                        if levels[child] == -1:
+                            stack.append((child, False))
+        self._levels = levels
+
+    def level(self, element_name):
+        """ Get the level of an element. Leaves are level 0
+
+        :param element_name:
+        :return: int
+        """
+        if self._levels is None:
+            self._compute_levels()
+        return self._levels[self.element_id(element_name)]
+
+    def elements_by_level(self, level):
+        """ Get all elements with a certain level (like TM1FilterByLevel)
+
+        :param level: int
+        :return: list of element names
+        """
+        if self._levels is None:
+            self._compute_levels()
+        return [name for name, element_level in zip(self._names, self._levels) if element_level == level]
+
+    def rollup_factors(self, element_name):
+        """ Get weighted rollup factors from all leaves into an element.
+        Weights are multiplied along a path and summed up across multiple paths.
+
+        :param element_name: name of consolidated element
+        :return: dict, leaf name -> factor
+        """
+        element_id = self.element_id(element_name)
+        if self._types[element_id] != self.CONSOLIDATED:
+            return {self._names[element_id]: 1.0}
+
+        factors = {}
+        stack = [(element_id, 1.0)]
+        while stack:
+            current, factor = stack.pop()
+            for position in self._child_range(current):
+                child = self._child_ids[position]
+                child_factor = factor * self._child_weights[position]
+                if self._types[child] == self.CONSOLIDATED:
+                    stack.append((child, child_factor))
+                else:
+                    factors[child] = factors.get(child, 0.0) + child_factor
+        return {self._names[i]: factor for i, factor in factors.items()}
+
+    def __len__(self):
+        return len(self._names)
+
+    def __contains__(self, item):
+        return self.contains_element(item)
+
+    def __iter__(self):
+        return iter(self._names)
@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+
+import gzip
+import json
+
+from TM1py.Objects.Chore import Chore
+from TM1py.Objects.Cube import Cube
+from TM1py.Objects.Dimension import Dimension
+from TM1py.Objects.MDXView import MDXView
+from TM1py.Objects.NativeView import NativeView
+from TM1py.Objects.Process import Process
+from TM1py.Objects.Subset import Subset
+from TM1py.Utils.Utils import CaseAndSpaceInsensitiveDict
+
+
+class ModelSnapshot:
+    """ Metadata of a whole TM1 model at a point in time:
+        cubes (incl. rules), views, dimensions (incl. hierarchies, elements, edges), subsets, processes and chores
+
+        Objects are kept as the raw dicts returned from the TM1 Server REST API and are only turned into
+        TM1py objects on access (e.g. get_cube, get_dimension). Thus, a snapshot can be written to disk
+        as compressed JSON and restored without loss.
+
+        Fingerprints (LastSchemaUpdate of cubes, content hashes of hierarchies incl. their subsets)
+        allow the ModelSnapshotService to refresh only objects that changed since the snapshot was taken.
+    """
+
+    def __init__(self, version=None, created=None, cubes=None, views=None, dimensions=None, subsets=None,
+                 processes=None, chores=None, fingerprints=None):
+        """
+
+        :param version: version of the TM1 Server
+        :param created: timestamp (ISO format) when the snapshot was taken
+        :param cubes: dict, cube name -> cube as dict
+        :param views: dict, cube name -> {'Views': list of views as dict, 'PrivateViews': list of views as dict}
+        :param dimensions: dict, dimension name -> dimension as dict
+        :param subsets: dict, dimension name -> hierarchy name ->
+        {'Subsets': list of subsets as dict, 'PrivateSubsets': list of subsets as dict}
+        :param processes: dict, process name -> process as dict
+        :param chores: dict, chore name -> chore as dict
+        :param fingerprints: dict, {'Cubes': cube name -> fingerprint, 'Dimensions': dimension name -> fingerprint}
+        """
+        self.version = version
+        self.created = created
+        self._cubes = CaseAndSpaceInsensitiveDict(cubes)
+        self._views = CaseAndSpaceInsensitiveDict(views)
+        self._dimensions = CaseAndSpaceInsensitiveDict(dimensions)
+        self._subsets = CaseAndSpaceInsensitiveDict(
+            (dimension_name, CaseAndSpaceInsensitiveDict(hierarchies))
+            for dimension_name, hierarchies
+            in (subsets or {}).items())
+        self._processes = CaseAndSpaceInsensitiveDict(processes)
+        self._chores = CaseAndSpaceInsensitiveDict(chores)
+        fingerprints = fingerprints or {}
+        self._fingerprints = {
+            'Cubes': CaseAndSpaceInsensitiveDict(fingerprints.get('Cubes')),
+            'Dimensions': CaseAndSpaceInsensitiveDict(fingerprints.get('Dimensions'))}
+
+    @classmethod
+    def from_dict(cls, snapshot_as_dict):
+        return cls(
+            version=snapshot_as_dict['Version'],
+            created=snapshot_as_dict['Created'],
+            cubes=snapshot_as_dict['Cubes'],
+            views=snapshot_as_dict['Views'],
+            dimensions=snapshot_as_dict['Dimensions'],
+            subsets=snapshot_as_dict['Subsets'],
+            processes=snapshot_as_dict['Processes'],
+            chores=snapshot_as_dict['Chores'],
+            fingerprints=snapshot_as_dict['Fingerprints'])
+
+    @classmethod
+    def from_json(cls, snapshot_as_json):
+        return cls.from_dict(json.loads(snapshot_as_json))
+
+    @property
+    def body_as_dict(self):
+        return {
+            'Version': self.version,
+            'Created': self.created,
+            'Cubes': dict(self._cubes.items()),
+            'Views': dict(self._views.items()),
+            'Dimensions': dict(self._dimensions.items()),
+            'Subsets': {dimension_name: dict(hierarchies.items())
+                        for dimension_name, hierarchies
+                        in self._subsets.items()},
+            'Processes': dict(self._processes.items()),
+            'Chores': dict(self._chores.items()),
+            'Fingerprints': {section: dict(fingerprints.items())
+                             for section, fingerprints
+                             in self._fingerprints.items()}}
+
+    @property
+    def body(self):
+        return json.dumps(self.body_as_dict, ensure_ascii=False, separators=(',', ':'))
+
+    def save_to_file(self, file_name):
+        """ Write snapshot to disk as gzip compressed JSON
+
+        :param file_name:
+        :return:
+        """
+        with gzip.open(file_name, 'wt', encoding='utf-8') as file:
+            file.write(self.body)
+
+    @classmethod
+    def restore_from_file(cls, file_name):
+        """ Read snapshot from gzip compressed JSON file
+
+        :param file_name:
+        :return: instance of ModelSnapshot
+        """
+        with gzip.open(file_name, 'rt', encoding='utf-8') as file:
+            return cls.from_json(file.read())
+
+    @property
+    def cube_names(self):
+        return list(self._cubes)
+
+    @property
+    def dimension_names(self):
+        return list(self._dimensions)
+
+    @property
+    def process_names(self):
+        return list(self._processes)
+
+    @property
+    def chore_names(self):
+        return list(self._chores)
+
+    def get_cube(self, cube_name):
+        return Cube.from_dict(self._cubes[cube_name])
+
+    def get_views(self, cube_name):
+        """ Get all public and private views of a cube
+
+        :param cube_name:
+        :return: 2 Lists of TM1py.View instances: private views, public views
+        """
+        views = self._views.get(cube_name, {})
+        return tuple([MDXView.from_dict(view_as_dict, cube_name)
+                      if view_as_dict['@odata.type'] == '#ibm.tm1.api.v1.MDXView'
+                      else NativeView.from_dict(view_as_dict, cube_name)
+                      for view_as_dict
+                      in views.get(view_type, [])]
+                     for view_type
+                     in ('PrivateViews', 'Views'))
+
+    def get_dimension(self, dimension_name, compact=False):
+        return Dimension.from_dict(self._dimensions[dimension_name], compact=compact)
+
+    def get_subsets(self, dimension_name, hierarchy_name=None, private=False):
+        """ Get all public or private subsets of a hierarchy
+
+        :param dimension_name:
+        :param hierarchy_name: defaults to dimension name
+        :param private: Boolean
+        :return: List of TM1py.Subset instances
+        """
+        hierarchies = self._subsets.get(dimension_name, {})
+        subsets = hierarchies.get(hierarchy_name or dimension_name, {})
+        return [Subset.from_dict(subset_as_dict)
+                for subset_as_dict
+                in subsets.get('PrivateSubsets' if private else 'Subsets', [])]
+
+    def get_process(self, process_name):
+        return Process.from_dict(self._processes[process_name])
+
+    def get_chore(self, chore_name):
+        return Chore.from_dict(self._chores[chore_name])
+
+    def __len__(self):
+        return sum(len(section) for section in (self._cubes, self._dimensions, self._processes, self._chores))
+
+    def __repr__(self):
+        return "ModelSnapshot(version={}, created={}, cubes={}, dimensions={}, processes={}, chores={})".format(
+            self.version, self.created, len(self._cubes), len(self._dimensions), len(self._processes),
+            len(self._chores))
@@ -43,6 +43,10 @@ class NativeView(View):
     def columns(self):
         return self._columns
 
+    @property
+    def titles(self):
+        return self._titles
+
     @property
     def MDX(self):
         return self.as_MDX
@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+
+
+class QueryCostEstimate:
+    """ Pre-flight estimate of the size of a query, computed from set sizes instead of creating a cellset.
+    Created through CellService.estimate_mdx_cost and CellService.estimate_view_cost
+
+    Strategies:
+        SINGLE: one request
+        PAGED: one cellset, cells retrieved in pages (no member list on the first row set to partition by
+            or the cells of one member exceed the max cells per request)
+        PARTITIONED: the query is split along the members of the first set on rows into queries
+            that are executed in parallel
+    """
+
+    SINGLE = "Single"
+    PAGED = "Paged"
+    PARTITIONED = "Partitioned"
+
+    def __init__(self, cells, row_count, column_count, payload_bytes, strategy, exact=True, requests=1,
+                 partition_dimension=None, partition_size=None):
+        """
+
+        :param cells: estimated number of cells (upper bound when exact is False)
+        :param row_count: estimated number of tuples on rows
+        :param column_count: estimated number of tuples on columns
+        :param payload_bytes: estimated size of the response(s)
+        :param strategy: SINGLE, PAGED or PARTITIONED
+        :param exact: False if sizes of set expressions or NON EMPTY made the estimate an upper bound
+        :param requests: number of requests (pages or partitions) the strategy needs
+        :param partition_dimension: dimension of the first set on rows, if the strategy is PARTITIONED
+        :param partition_size: number of members of the partition dimension per request, if PARTITIONED
+        """
+        self.cells = cells
+        self.row_count = row_count
+        self.column_count = column_count
+        self.payload_bytes = payload_bytes
+        self.strategy = strategy
+        self.exact = exact
+        self.requests = requests
+        self.partition_dimension = partition_dimension
+        self.partition_size = partition_size
+
+    def __repr__(self):
+        return "QueryCostEstimate({} cells{}, {} bytes, {} x {})".format(
+            self.cells, "" if self.exact else " (upper bound)", self.payload_bytes, self.strategy, self.requests)
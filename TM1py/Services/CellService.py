@@ -1,17 +1,31 @@
 # -*- coding: utf-8 -*-
 
+import csv
 import functools
+import itertools
 import json
+import os
+import shutil
+import time
 import warnings
-from collections import OrderedDict
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from io import StringIO
 
+import numpy as np
 import pandas as pd
 
+from TM1py.Objects.Cellset import Cellset
+from TM1py.Objects.QueryCostEstimate import QueryCostEstimate
 from TM1py.Services import ObjectService
 from TM1py.Utils import Utils, CaseAndSpaceInsensitiveSet
-from TM1py.Utils.Utils import build_pandas_dataframe_from_cellset, dimension_name_from_element_unique_name, \
-    CaseAndSpaceInsensitiveTuplesDict, case_and_space_insensitive_equals, odata_escape_single_quotes_in_object_names
+from TM1py.Utils.MDXUtils import parse_mdx, read_members_from_mdx_set, read_hierarchy_from_mdx_subset, \
+    REGEX_MDX_TUPLE_SET, REGEX_MDX_TUPLE
+from TM1py.Utils.Utils import build_pandas_dataframe_from_cellset, build_power_bi_dataframe_from_cellset, \
+    dimension_name_from_element_unique_name, \
+    CaseAndSpaceInsensitiveTuplesDict, case_and_space_insensitive_equals, odata_escape_single_quotes_in_object_names, \
+    build_element_unique_names, build_slices_from_tuples, read_checkpoint, write_checkpoint
 
 
 def tidy_cellset(func):
@@ -55,9 +69,8 @@ class CellService(ObjectService):
         """
         mdx_template = "SELECT {} ON ROWS, {} ON COLUMNS FROM [{}]"
         mdx_rows_list = []
-        from TM1py.Services.CubeService import CubeService
         if not dimensions:
-            dimensions = CubeService(self._rest).get(cube_name).dimensions
+            dimensions = self._metadata_cache.get_dimension_names(cube_name)
         element_selections = element_string.split(',')
         # Build the ON ROWS statement:
         # Loop through the comma seperated element selection, except for the last one
@@ -85,6 +98,38 @@ class CellService(ObjectService):
         cellset = dict(self.execute_mdx(mdx, **kwargs))
         return next(iter(cellset.values()))["Value"]
 
+    def get_values(self, cube_name, element_tuples, dimensions=None, chunk_size=10000, as_numpy=False, **kwargs):
+        """ Get the values of many cells at once.
+        Cells are read through a few MDX queries with explicit sets of tuples (chunk_size tuples per query),
+        instead of one query per cell like get_value. Duplicate tuples are read only once.
+
+        :param cube_name: Name of the cube
+        :param element_tuples: iterable of element tuples, e.g. [('2020', 'Jan', 'Revenue'), ('2020', 'Feb', 'Revenue')]
+        :param dimensions: optional. Dimension names in their natural order. Will speed up the execution!
+        :param chunk_size: max number of tuples per MDX query
+        :param as_numpy: Boolean. Return a numpy array: float (empty cells as NaN) if all values are numeric,
+        object otherwise
+        :return: list of values (or numpy array) in the order of the element tuples
+        """
+        if not dimensions:
+            dimensions = self.get_dimension_names_for_writing(cube_name=cube_name)
+        positions = CaseAndSpaceInsensitiveTuplesDict()
+        indices = []
+        for element_tuple in element_tuples:
+            element_tuple = tuple(element_tuple)
+            if element_tuple not in positions:
+                positions[element_tuple] = len(positions)
+            indices.append(positions[element_tuple])
+
+        unique_values = self._execute_tuples_values(cube_name, list(positions.keys()), dimensions, chunk_size,
+                                                    **kwargs)
+        values = [unique_values[index] for index in indices]
+        if not as_numpy:
+            return values
+        if all(value is None or isinstance(value, (int, float)) for value in values):
+            return np.array(values, dtype=float)
+        return np.array(values, dtype=object)
+
     def relative_proportional_spread(
             self,
             value,
@@ -155,9 +200,7 @@ class CellService(ObjectService):
         return self._rest.POST(request=request, data=json.dumps(payload), **kwargs)
 
     def get_dimension_names_for_writing(self, cube_name):
-        from TM1py.Services import CubeService
-        cube_service = CubeService(self._rest)
-        dimensions = cube_service.get_dimension_names(cube_name)
+        dimensions = self._metadata_cache.get_dimension_names(cube_name)
         # do not return sandbox dimension as first dimension, as it can't be used in address tuple for writing
         if case_and_space_insensitive_equals(dimensions[0], self.SANDBOX_DIMENSION):
             return dimensions[1:]
@@ -186,20 +229,37 @@ class CellService(ObjectService):
         data = json.dumps(body_as_dict, ensure_ascii=False)
         return self._rest.POST(request=request, data=data, **kwargs)
 
-    def write_values(self, cube_name, cellset_as_dict, dimensions=None, **kwargs):
+    def write_values(self, cube_name, cellset_as_dict, dimensions=None, only_changed=False, tolerance=1e-9,
+                     **kwargs):
         """ Write values in cube.  
         For cellsets with > 1000 cells look into "write_values_through_cellset"
 
         :param cube_name: name of the cube
         :param cellset_as_dict: {(elem_a, elem_b, elem_c): 243, (elem_d, elem_e, elem_f) : 109}
         :param dimensions: optional. Dimension names in their natural order. Will speed up the execution!
-        :return: Response
+        :param only_changed: read the current values first and only write cells whose value differs.
+        Avoids recalculations, feeder processing and transaction log entries for unchanged cells
+        :param tolerance: absolute tolerance for the comparison of numeric values
+        :return: Response. None if only_changed and no value changed
         """
         if not dimensions:
             dimensions = self.get_dimension_names_for_writing(cube_name=cube_name)
+        if only_changed:
+            cellset_as_dict = self._drop_unchanged_values(cube_name, cellset_as_dict, dimensions, tolerance)
+            if not cellset_as_dict:
+                return None
         request = "/api/v1/Cubes('{}')/tm1.Update".format(cube_name)
+        updates = self._build_updates(cellset_as_dict.items(), dimensions)
+        return self._rest.POST(request=request, data=updates, **kwargs)
+
+    @staticmethod
+    def _build_updates(cells, dimensions):
+        """ Encode (element tuple, value) pairs as body for tm1.Update
+
+        :return: JSON string
+        """
         updates = []
-        for element_tuple, value in cellset_as_dict.items():
+        for element_tuple, value in cells:
             body_as_dict = OrderedDict()
             body_as_dict["Cells"] = [{}]
             body_as_dict["Cells"][0]["Tuple@odata.bind"] = [
@@ -209,8 +269,131 @@ class CellService(ObjectService):
                 in zip(dimensions, element_tuple)]
             body_as_dict["Value"] = str(value) if value else ""
             updates.append(json.dumps(body_as_dict, ensure_ascii=False))
-        updates = '[' + ','.join(updates) + ']'
-        return self._rest.POST(request=request, data=updates, **kwargs)
+        return '[' + ','.join(updates) + ']'
+
+    def write_stream(self, cube_name, rows, dimensions=None, chunk_size=10000, max_in_flight=4,
+                     checkpoint_file=None, progress=None, delimiter=',', skip_header=False, **kwargs):
+        """ Write a stream of cells of arbitrary size with constant memory.
+
+        Rows are read lazily, encoded in chunks of chunk_size cells and sent to TM1 (tm1.Update)
+        with up to max_in_flight requests running concurrently. Only these chunks are held in memory.
+
+        With a checkpoint_file, the number of acknowledged rows is stored after every chunk
+        (chunks are acknowledged in order). If the job is interrupted, the next call with the same rows
+        and checkpoint file skips the acknowledged rows. Chunks that were in flight are written again,
+        which is harmless since writes overwrite the cell values. The checkpoint file is removed
+        when the stream was written completely.
+
+        :param cube_name: name of the cube
+        :param rows: iterable of rows (elem_a, elem_b, elem_c, value) or path to a CSV file with such rows
+        :param dimensions: optional. Dimension names in their natural order. Will speed up the execution!
+        :param chunk_size: number of cells per request
+        :param max_in_flight: max number of concurrent requests
+        :param checkpoint_file: optional. File to store the number of acknowledged rows
+        :param progress: optional. Function that is called with the statistics after every acknowledged chunk
+        :param delimiter: delimiter of the CSV file
+        :param skip_header: Boolean. Skip the first line of the CSV file
+        :return: dict with number of rows and chunks written, seconds and rows per second
+        """
+        if not dimensions:
+            dimensions = self.get_dimension_names_for_writing(cube_name=cube_name)
+        if isinstance(rows, str):
+            with open(rows, 'r', newline='', encoding='utf-8') as file:
+                reader = csv.reader(file, delimiter=delimiter)
+                if skip_header:
+                    next(reader, None)
+                return self.write_stream(cube_name, reader, dimensions, chunk_size, max_in_flight,
+                                         checkpoint_file, progress, **kwargs)
+
+        acknowledged_rows = int(read_checkpoint(checkpoint_file) or 0)
+        rows = itertools.islice(iter(rows), acknowledged_rows, None)
+        request = "/api/v1/Cubes('{}')/tm1.Update".format(cube_name)
+        statistics = {'rows': 0, 'chunks': 0, 'seconds': 0.0, 'rows_per_second': 0.0}
+        start_time = time.perf_counter()
+
+        def acknowledge(future, rows_in_chunk):
+            nonlocal acknowledged_rows
+            future.result()
+            acknowledged_rows += rows_in_chunk
+            write_checkpoint(checkpoint_file, str(acknowledged_rows))
+            statistics['rows'] += rows_in_chunk
+            statistics['chunks'] += 1
+            statistics['seconds'] = time.perf_counter() - start_time
+            statistics['rows_per_second'] = statistics['rows'] / statistics['seconds'] if statistics['seconds'] else 0
+            if progress:
+                progress(dict(statistics))
+
+        in_flight = deque()
+        with ThreadPoolExecutor(max_workers=max_in_flight) as executor:
+            while True:
+                chunk = list(itertools.islice(rows, chunk_size))
+                if not chunk:
+                    break
+                updates = self._build_updates(((row[:-1], row[-1]) for row in chunk), dimensions)
+                if len(in_flight) == max_in_flight:
+                    acknowledge(*in_flight.popleft())
+                in_flight.append((executor.submit(self._rest.POST, request=request, data=updates, **kwargs),
+                                  len(chunk)))
+            while in_flight:
+                acknowledge(*in_flight.popleft())
+
+        if checkpoint_file and os.path.isfile(checkpoint_file):
+            os.remove(checkpoint_file)
+        return statistics
+
+    def _drop_unchanged_values(self, cube_name, cellset_as_dict, dimensions, tolerance):
+        """ Compare values with the current values in the cube, vectorized
+
+        Empty values (None, '') are equal to 0 and ''.
+        Pairs of numbers (int, float) are compared with an absolute tolerance, all other values exactly as strings
+
+        :return: dict with the cells that changed
+        """
+        element_tuples = list(cellset_as_dict.keys())
+        new_values = pd.Series(list(cellset_as_dict.values()), dtype=object)
+        current_values = pd.Series(
+            self._execute_tuples_values(cube_name, element_tuples, dimensions), dtype=object)
+
+        new_empty = new_values.isna() | (new_values == '')
+        current_empty = current_values.isna() | (current_values == '')
+        new_numbers = new_values.map(self._is_number).astype(bool) & ~new_empty
+        current_numbers = current_values.map(self._is_number).astype(bool) & ~current_empty
+        # an empty value is 0 next to a number, '0' or '00123' next to '' or '123' are string changes
+        numeric = ((new_numbers | new_empty) & (current_numbers | current_empty) & (new_numbers | current_numbers)) \
+            .to_numpy()
+        changed = np.where(
+            numeric,
+            ~np.isclose(new_values.where(new_numbers, 0).to_numpy(float),
+                        current_values.where(current_numbers, 0).to_numpy(float),
+                        rtol=0, atol=tolerance),
+            (new_values.where(~new_empty, '').astype(str) != current_values.where(~current_empty, '').astype(str))
+            .to_numpy())
+
+        return OrderedDict(
+            (element_tuples[position], new_values.iat[position])
+            for position
+            in np.flatnonzero(changed))
+
+    @staticmethod
+    def _is_number(value):
+        return isinstance(value, (int, float, np.number)) and not isinstance(value, bool)
+
+    def _execute_tuples_values(self, cube_name, element_tuples, dimensions, chunk_size=10000, **kwargs):
+        """ Read the values of explicit tuples (in the default hierarchies) through a set of tuples on columns.
+        Values are returned in the order of the tuples
+
+        :return: list of values
+        """
+        values = []
+        for start in range(0, len(element_tuples), chunk_size):
+            mdx = "SELECT {{{}}} ON 0 FROM [{}]".format(
+                ",".join(
+                    "(" + ",".join(build_element_unique_names(dimensions, element_tuple)) + ")"
+                    for element_tuple
+                    in element_tuples[start:start + chunk_size]),
+                cube_name)
+            values.extend(self.execute_mdx_values(mdx=mdx, **kwargs))
+        return values
 
     def write_values_through_cellset(self, mdx, values, **kwargs):
         """ Significantly faster than write_values function
@@ -366,16 +549,52 @@ class CellService(ObjectService):
             delete_cellset=True,
             **kwargs)
 
-    def execute_mdx_values(self, mdx, **kwargs):
+    def execute_mdx_values(self, mdx, smart=False, max_cells_per_request=500000, max_workers=4, **kwargs):
         """ Optimized for performance. Query only raw cell values. 
         Coordinates are omitted !
 
         :param mdx: a valid MDX Query
+        :param smart: Boolean. Estimate the size of the query first (see estimate_mdx_cost) and execute it
+        in one request, in pages of one cellset or in partitions in parallel.
+        Smart mode is available for values only. Other execute_mdx_* methods always use one request
+        :param max_cells_per_request: smart mode only. Max number of cells per request
+        :param max_workers: smart mode only. Number of partitions that are executed in parallel
         :return: Generator of cell values
         """
+        if smart:
+            estimate = self.estimate_mdx_cost(mdx, max_cells_per_request=max_cells_per_request)
+            if estimate.strategy == QueryCostEstimate.PAGED:
+                return self._execute_mdx_values_paged(mdx, max_cells_per_request, **kwargs)
+            if estimate.strategy == QueryCostEstimate.PARTITIONED:
+                return self._execute_mdx_values_partitioned(mdx, estimate.partition_size, max_workers, **kwargs)
         cellset_id = self.create_cellset(mdx=mdx)
         return self.extract_cellset_values(cellset_id, delete_cellset=True, **kwargs)
 
+    def _execute_mdx_values_paged(self, mdx, page_size, **kwargs):
+        with self.create_cellset(mdx=mdx) as cellset:
+            for page in cellset.pages(page_size=page_size, **kwargs):
+                yield from page
+
+    def _execute_mdx_values_partitioned(self, mdx, partition_size, max_workers, **kwargs):
+        # partitions of the first set on rows. Concatenated, their cells are in the order of the original query
+        (start, end), _ = parse_mdx(mdx).rows_sets[0]
+        members = read_members_from_mdx_set(mdx[start:end])
+        partitions = [mdx[:start] + "{" + ",".join(members[position:position + partition_size]) + "}" + mdx[end:]
+                      for position
+                      in range(0, len(members), partition_size)]
+
+        def execute(partition):
+            return list(self.execute_mdx_values(mdx=partition, **kwargs))
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            in_flight = deque()
+            for partition in partitions:
+                in_flight.append(executor.submit(execute, partition))
+                if len(in_flight) >= max_workers:
+                    yield from in_flight.popleft().result()
+            while in_flight:
+                yield from in_flight.popleft().result()
+
     def execute_view_values(self, cube_name, view_name, private=False, **kwargs):
         cellset_id = self.create_cellset_from_view(cube_name=cube_name, view_name=view_name, private=private)
         return self.extract_cellset_values(cellset_id, delete_cellset=True, **kwargs)
@@ -464,6 +683,55 @@ class CellService(ObjectService):
         cellset_id = self.create_cellset_from_view(cube_name=cube_name, view_name=view_name, private=private)
         return self.extract_cellset_dataframe(cellset_id, **kwargs)
 
+    def execute_delta(self, cube_name, checkpoint_file, dimensions=None):
+        """ Incremental extraction: read only the cells that changed since the last call.
+
+        The changed tuples are taken from the transaction log (logging must be active for the cube),
+        grouped into slices (cross joins of element sets that cover exactly the changed tuples)
+        and read through one MDX query per slice.
+
+        The first call (no checkpoint file yet) only establishes the checkpoint and yields nothing.
+        The checkpoint is advanced once the generator is exhausted. If the extraction is interrupted,
+        the next call delivers the changes again.
+
+        :param cube_name: name of the cube
+        :param checkpoint_file: file to store the position in the transaction log
+        :param dimensions: optional. Dimension names in their natural order. Will speed up the execution!
+        :return: Generator of (element tuple, current value). The value is None (or 0 / '') if the cell is empty now
+        """
+        from TM1py.Services.ServerService import ServerService
+        if not dimensions:
+            dimensions = self.get_dimension_names_for_writing(cube_name=cube_name)
+
+        # tail into a pending checkpoint, which only replaces the checkpoint when all changes were delivered
+        pending_checkpoint_file = checkpoint_file + ".pending"
+        if os.path.isfile(checkpoint_file):
+            shutil.copyfile(checkpoint_file, pending_checkpoint_file)
+        elif os.path.isfile(pending_checkpoint_file):
+            os.remove(pending_checkpoint_file)
+
+        changed_tuples = CaseAndSpaceInsensitiveTuplesDict()
+        for entry in ServerService(self._rest).tail_transaction_log(
+                filter="Cube eq '{}'".format(cube_name),
+                checkpoint_file=pending_checkpoint_file,
+                poll_interval=0,
+                idle_timeout=0):
+            element_tuple = tuple(entry['Tuple'])
+            if element_tuple not in changed_tuples:
+                changed_tuples[element_tuple] = None
+
+        for cube_slice in build_slices_from_tuples(changed_tuples.keys()):
+            mdx = "SELECT {} ON 0 FROM [{}]".format(
+                " * ".join(
+                    "{" + ",".join(build_element_unique_names([dimension] * len(elements), elements)) + "}"
+                    for dimension, elements
+                    in zip(dimensions, cube_slice)),
+                cube_name)
+            # ordinals of a single-axis cross join follow the order of itertools.product
+            yield from zip(itertools.product(*cube_slice), self.execute_mdx_values(mdx=mdx))
+
+        os.replace(pending_checkpoint_file, checkpoint_file)
+
     def execute_mdx_cellcount(self, mdx):
         """ Execute MDX in order to understand how many cells are in a cellset.
         Only return number of cells in the cellset. FAST!
@@ -486,6 +754,98 @@ class CellService(ObjectService):
         cellset_id = self.create_cellset_from_view(cube_name=cube_name, view_name=view_name, private=private)
         return self.extract_cellset_cellcount(cellset_id, delete_cellset=True)
 
+    def estimate_mdx_cost(self, mdx, max_cells_per_request=500000, bytes_per_cell=40, bytes_per_member=50):
+        """ Estimate the size of a query without executing it, as an alternative to execute_mdx_cellcount.
+
+        The number of tuples on rows and columns is computed from the sets: members of explicit sets are counted,
+        TM1SubsetAll and TM1SubsetToSet are looked up as (cached) number of elements in hierarchy or subset,
+        other set expressions are estimated with the number of elements in their hierarchies (upper bound).
+
+        :param mdx: a valid MDX Query
+        :param max_cells_per_request: number of cells above which the query is paged or partitioned.
+        A query is only partitioned if the cells of one member of the first set on rows fit in one request
+        :param bytes_per_cell: approximate size of a cell in the response
+        :param bytes_per_member: approximate size of a member (of a tuple on rows or columns) in the response
+        :return: instance of TM1py.Objects.QueryCostEstimate
+        """
+        composition = parse_mdx(mdx)
+        exact = not (composition.non_empty_rows or composition.non_empty_columns)
+        counts = []
+        for mdx_sets in (composition.rows_sets, composition.columns_sets):
+            count = 1
+            for (start, end), hierarchies in mdx_sets:
+                size, size_is_exact = self._estimate_set_size(mdx[start:end], hierarchies)
+                count *= size
+                exact = exact and size_is_exact
+            counts.append(count)
+        row_count, column_count = counts
+        cells = row_count * column_count
+        payload_bytes = cells * bytes_per_cell + bytes_per_member * (
+                row_count * len(composition.rows) + column_count * len(composition.columns))
+
+        requests = max(1, -(-cells // max_cells_per_request))
+        if requests == 1:
+            return QueryCostEstimate(cells, row_count, column_count, payload_bytes, QueryCostEstimate.SINGLE, exact)
+
+        # partitions along the first set on rows keep the order of the cells. NON EMPTY on columns doesn't,
+        # as it would remove different columns from each partition
+        members = None
+        if composition.rows_sets and not composition.non_empty_columns:
+            (start, end), _ = composition.rows_sets[0]
+            members = read_members_from_mdx_set(mdx[start:end])
+        if not members or len(members) < 2:
+            return QueryCostEstimate(cells, row_count, column_count, payload_bytes, QueryCostEstimate.PAGED, exact,
+                                     requests)
+        cells_per_member = -(-cells // len(members))
+        if cells_per_member > max_cells_per_request:
+            return QueryCostEstimate(cells, row_count, column_count, payload_bytes, QueryCostEstimate.PAGED, exact,
+                                     requests)
+        partition_size = max_cells_per_request // cells_per_member
+        return QueryCostEstimate(
+            cells, row_count, column_count, payload_bytes, QueryCostEstimate.PARTITIONED, exact,
+            requests=-(-len(members) // partition_size),
+            partition_dimension=composition.rows_sets[0][1][0][0],
+            partition_size=partition_size)
+
+    def estimate_view_cost(self, cube_name, view_name, private=False, **kwargs):
+        """ Estimate the size of a cube view without executing it. See estimate_mdx_cost
+
+        :param cube_name: cube name
+        :param view_name: view name
+        :param private: True (private) or False (public)
+        :return: instance of TM1py.Objects.QueryCostEstimate
+        """
+        from TM1py.Services.ViewService import ViewService
+        from TM1py.Objects.NativeView import NativeView
+        from TM1py.Utils.MDXBuilder import MDXQuery
+        view = ViewService(self._rest).get(cube_name=cube_name, view_name=view_name, private=private)
+        if isinstance(view, NativeView):
+            mdx = MDXQuery.from_native_view(view).to_mdx()
+        else:
+            mdx = view.MDX
+        return self.estimate_mdx_cost(mdx, **kwargs)
+
+    def _estimate_set_size(self, mdx_set, hierarchies):
+        """ Number of tuples in a set
+
+        :return: number of tuples, Boolean: True if exact, False if upper bound
+        """
+        members = read_members_from_mdx_set(mdx_set)
+        if members is not None:
+            return len(members), True
+        if REGEX_MDX_TUPLE_SET.fullmatch(mdx_set.strip()):
+            return len(REGEX_MDX_TUPLE.findall(mdx_set)), True
+        subset = read_hierarchy_from_mdx_subset(mdx_set)
+        if subset:
+            dimension_name, hierarchy_name, subset_name = subset
+            if subset_name:
+                return self._metadata_cache.get_subset_size(dimension_name, hierarchy_name, subset_name), True
+            return self._metadata_cache.get_number_of_elements(dimension_name, hierarchy_name), True
+        size = 1
+        for dimension_name, hierarchy_name in hierarchies:
+            size *= self._metadata_cache.get_number_of_elements(dimension_name, hierarchy_name)
+        return size, False
+
     def execute_mdx_rows_and_values_string_set(self, mdx, exclude_empty_cells=True):
         """ Retrieve row element names and **string** cell values in a case and space insensitive set
 
@@ -795,6 +1155,41 @@ class CellService(ObjectService):
             result[element_tuple] = cells
         return result
 
+    @tidy_cellset
+    def extract_cellset_axes(self, cellset_id, member_properties=None, elem_properties=None, **kwargs):
+        """ Extract the axes of a cellset, without the cells
+
+        :param cellset_id: String; ID of existing cellset
+        :param member_properties: List of properties to be queried from the members. E.g. ['Name', 'UniqueName']
+        :param elem_properties: List of properties to be queried from the elements. E.g. ['UniqueName', 'Type']
+        :return: Raw format from TM1: Cube (with its dimensions) and Axes (with their hierarchies and tuples)
+        """
+        expand_elem_properties = ";$expand=Element($select={})".format(",".join(elem_properties)) \
+            if elem_properties \
+            else ""
+        request = "/api/v1/Cellsets('{}')?$expand=" \
+                  "Cube($select=Name;$expand=Dimensions($select=Name))," \
+                  "Axes($expand=Hierarchies($select=Name,UniqueName)," \
+                  "Tuples($expand=Members($select={}{})))".format(
+                      cellset_id, ",".join(member_properties or ["Name"]), expand_elem_properties)
+        response = self._rest.GET(request=request, **kwargs)
+        return response.json()
+
+    @tidy_cellset
+    def extract_cellset_cells_page(self, cellset_id, top, skip=0, cell_properties=None, **kwargs):
+        """ Extract a page of the cells of a cellset
+
+        :param cellset_id: String; ID of existing cellset
+        :param top: Integer, max number of cells
+        :param skip: Integer, number of cells to skip
+        :param cell_properties: List of properties to be queried from the cells. E.g. ['Value', 'RuleDerived', ...]
+        :return: list of cells (dict)
+        """
+        request = "/api/v1/Cellsets('{}')/Cells?$select={}&$top={}&$skip={}".format(
+            cellset_id, ",".join(cell_properties or ["Value"]), top, skip)
+        response = self._rest.GET(request=request, **kwargs)
+        return response.json()['value']
+
     @tidy_cellset
     def extract_cellset_composition(self, cellset_id, **kwargs):
         request = "/api/v1/Cellsets('{}')?$expand=Cube($select=Name),Axes($expand=Hierarchies($select=UniqueName))".format(
@@ -837,6 +1232,16 @@ class CellService(ObjectService):
         :return:
         """
         raw_csv = self.extract_cellset_csv(cellset_id=cellset_id, delete_cellset=True, **kwargs)
+        return self.build_dataframe_from_csv(raw_csv, **kwargs)
+
+    @staticmethod
+    def build_dataframe_from_csv(raw_csv, **kwargs):
+        """ Build pandas dataframe from the csv content of a cellset
+
+        :param raw_csv: String, as returned by extract_cellset_csv
+        :param kwargs: arguments of the pandas.read_csv method
+        :return: pandas DataFrame
+        """
         memory_file = StringIO(raw_csv)
         # make sure all element names are strings and values column is derived from data
         if 'dtype' not in kwargs:
@@ -844,40 +1249,20 @@ class CellService(ObjectService):
         return pd.read_csv(memory_file, sep=',', **kwargs)
 
     @tidy_cellset
-    def extract_cellset_power_bi(self, cellset_id, **kwargs):
+    def extract_cellset_power_bi(self, cellset_id, typed=False, **kwargs):
+        """ Build a pandas DataFrame for Power BI from a cellset: row headers and one column per column tuple
+
+        :param cellset_id: String; ID of existing cellset
+        :param typed: False: all columns are strings. True: categorical row headers and numeric value columns
+        :return: pandas DataFrame
+        """
         request = "/api/v1/Cellsets('{}')?$expand=" \
                   "Axes($filter=Ordinal eq 0 or Ordinal eq 1;$expand=Tuples(" \
                   "$expand=Members($select=Name)),Hierarchies($select=Name))," \
                   "Cells($select=Value)".format(cellset_id)
         response = self._rest.GET(request=request, data='', **kwargs)
         response_json = response.json()
-        rows = response_json["Axes"][1]["Tuples"]
-        column_headers = [tupl["Members"][0]["Name"] for tupl in response_json["Axes"][0]["Tuples"]]
-        row_headers = [hierarchy["Name"] for hierarchy in response_json["Axes"][1]["Hierarchies"]]
-        cell_values = [cell["Value"] for cell in response_json["Cells"]]
-
-        headers = row_headers + column_headers
-        body = []
-
-        number_rows = len(rows)
-        # avoid division by zero
-        if not number_rows:
-            return pd.DataFrame(body, columns=headers)
-        number_cells = len(cell_values)
-        number_columns = int(number_cells / number_rows)
-
-        cell_values_by_row = [cell_values[cell_counter:cell_counter + number_columns]
-                              for cell_counter
-                              in range(0, number_cells, number_columns)]
-        element_names_by_row = [tuple(member["Name"]
-                                      for member
-                                      in tupl["Members"])
-                                for tupl
-                                in rows]
-
-        for element_tuple, cells in zip(element_names_by_row, cell_values_by_row):
-            body.append(list(element_tuple) + cells)
-        return pd.DataFrame(body, columns=headers, dtype=str)
+        return build_power_bi_dataframe_from_cellset(response_json, typed=typed)
 
     def extract_cellset_dataframe_pivot(self, cellset_id, dropna=False, fill_value=False, **kwargs):
         """ Extract a pivot table (pandas dataframe) from a cellset in TM1
@@ -947,21 +1332,20 @@ class CellService(ObjectService):
         """ Execute MDX in order to create cellset at server. return the cellset-id
 
         :param mdx: MDX Query, as string
-        :return:
+        :return: instance of TM1py.Cellset. A str (the cellset-id) that extracts and memoizes results lazily
         """
         request = '/api/v1/ExecuteMDX'
         data = {
             'MDX': mdx
         }
         response = self._rest.POST(request=request, data=json.dumps(data, ensure_ascii=False), **kwargs)
-        cellset_id = response.json()['ID']
-        return cellset_id
+        return Cellset(response.json()['ID'], self)
 
     def create_cellset_from_view(self, cube_name, view_name, private):
         request = "/api/v1/Cubes('{cube_name}')/{views}('{view_name}')/tm1.Execute".format(
             cube_name=cube_name,
             views='PrivateViews' if private else 'Views', view_name=view_name)
-        return self._rest.POST(request=request, data='').json()['ID']
+        return Cellset(self._rest.POST(request=request, data='').json()['ID'], self)
 
     def delete_cellset(self, cellset_id):
         """ Delete a cellset
@@ -970,7 +1354,10 @@ class CellService(ObjectService):
         :return:
         """
         request = "/api/v1/Cellsets('{}')".format(cellset_id)
-        return self._rest.DELETE(request)
+        response = self._rest.DELETE(request)
+        if isinstance(cellset_id, Cellset):
+            cellset_id._closed = True
+        return response
 
     def deactivate_transactionlog(self, *args):
         """ Deacctivate Transactionlog for one or many cubes
@@ -994,6 +1381,51 @@ class CellService(ObjectService):
             updates[(cube_name, "Logging")] = "YES"
         return self.write_values(cube_name="}CubeProperties", cellset_as_dict=updates)
 
+    @contextmanager
+    def bulk_load(self, cubes, properties=None, load_cubes=False, unload_cubes=False):
+        """ Context manager for bulk loads. Applies }CubeProperties (by default: transaction logging off)
+        for the duration of the load and restores the previous values on exit, also when the load fails.
+
+        The properties are server side, so writes from other threads or connections
+        (e.g. write_stream, write_values_through_cellset called asynchronously) are affected as well.
+
+        Usage:
+        >>> with tm1.cubes.cells.bulk_load(['Sales', 'Inventory']):
+        >>>     tm1.cubes.cells.write_stream('Sales', 'sales.csv')
+
+        :param cubes: cube name or iterable of cube names
+        :param properties: dict of }CubeProperties values to apply during the load. Default: {'Logging': 'NO'}
+        :param load_cubes: Boolean. Load the cubes into memory before the load
+        :param unload_cubes: Boolean. Unload the cubes from memory after the load
+        :return: dict with the previous values: (cube name, property) -> value
+        """
+        from TM1py.Services.CubeService import CubeService
+        cube_service = CubeService(self._rest)
+        cubes = [cubes] if isinstance(cubes, str) else list(cubes)
+        properties = properties or {"Logging": "NO"}
+        dimensions = ["}Cubes", "}CubeProperties"]
+
+        element_tuples = [(cube_name, property_name) for cube_name in cubes for property_name in properties]
+        previous_values = OrderedDict(zip(
+            element_tuples,
+            self._execute_tuples_values("}CubeProperties", element_tuples, dimensions)))
+        try:
+            if load_cubes:
+                for cube_name in cubes:
+                    cube_service.load(cube_name)
+            self.write_values(
+                cube_name="}CubeProperties",
+                cellset_as_dict={(cube_name, property_name): properties[property_name]
+                                 for cube_name, property_name
+                                 in element_tuples},
+                dimensions=dimensions)
+            yield previous_values
+        finally:
+            self.write_values(cube_name="}CubeProperties", cellset_as_dict=previous_values, dimensions=dimensions)
+            if unload_cubes:
+                for cube_name in cubes:
+                    cube_service.unload(cube_name)
+
     def get_cellset_cells_count(self, mdx):
         """ Execute MDX in order to understand how many cells are in a cellset
 
@@ -28,7 +28,9 @@ class CubeService(ObjectService):
         :return: response
         """
         request = "/api/v1/Cubes"
-        return self._rest.POST(request, cube.body)
+        response = self._rest.POST(request, cube.body)
+        self._metadata_cache.invalidate(cube_name=cube.name)
+        return response
 
     def get(self, cube_name):
         """ get cube from TM1 Server
@@ -82,7 +84,9 @@ class CubeService(ObjectService):
         :return: response
         """
         request = "/api/v1/Cubes('{}')".format(cube.name)
-        return self._rest.PATCH(request, cube.body)
+        response = self._rest.PATCH(request, cube.body)
+        self._metadata_cache.invalidate(cube_name=cube.name)
+        return response
 
     def update_or_create(self, cube):
         """ update if exists else create
@@ -111,7 +115,9 @@ class CubeService(ObjectService):
         :return: response
         """
         request = "/api/v1/Cubes('{}')".format(cube_name)
-        return self._rest.DELETE(request)
+        response = self._rest.DELETE(request)
+        self._metadata_cache.invalidate(cube_name=cube_name)
+        return response
 
     def exists(self, cube_name):
         """ Check if a cube exists. Return boolean.
@@ -138,9 +144,7 @@ class CubeService(ObjectService):
         :param skip_sandbox_dimension:
         :return:  List : [dim1, dim2, dim3, etc.]
         """
-        request = "/api/v1/Cubes('{}')/Dimensions?$select=Name".format(cube_name)
-        response = self._rest.GET(request, '')
-        dimension_names = [element['Name'] for element in response.json()['value']]
+        dimension_names = self._metadata_cache.get_dimension_names(cube_name)
         if skip_sandbox_dimension and dimension_names[0] == CellService.SANDBOX_DIMENSION:
             return dimension_names[1:]
         return dimension_names
@@ -36,6 +36,7 @@ class DimensionService(ObjectService):
             # Create Dimension, Hierarchies, Elements, Edges.
             request = "/api/v1/Dimensions"
             response = self._rest.POST(request, dimension.body)
+            self._metadata_cache.invalidate(dimension_name=dimension.name)
             for hierarchy in dimension:
                 if len(hierarchy.element_attributes) > 0:
                     self.hierarchies.update(hierarchy)
@@ -46,15 +47,16 @@ class DimensionService(ObjectService):
             raise e
         return response
 
-    def get(self, dimension_name):
+    def get(self, dimension_name, compact=False):
         """ Get a Dimension
 
         :param dimension_name:
+        :param compact: load hierarchies as TM1py.CompactHierarchy. Recommended for very large dimensions
         :return:
         """
         request = "/api/v1/Dimensions('{}')?$expand=Hierarchies($expand=*)".format(dimension_name)
         response = self._rest.GET(request)
-        return Dimension.from_json(response.text)
+        return Dimension.from_json(response.text, compact=compact)
 
     def update(self, dimension):
         """ Update an existing dimension
@@ -74,6 +76,7 @@ class DimensionService(ObjectService):
                     self.hierarchies.update(hierarchy)
                 else:
                     self.hierarchies.create(hierarchy)
+        self._metadata_cache.invalidate(dimension_name=dimension.name)
 
     def update_or_create(self, dimension):
         """ update if exists else create
@@ -93,7 +96,9 @@ class DimensionService(ObjectService):
         :return:
         """
         request = '/api/v1/Dimensions(\'{}\')'.format(dimension_name)
-        return self._rest.DELETE(request)
+        response = self._rest.DELETE(request)
+        self._metadata_cache.invalidate(dimension_name=dimension_name)
+        return response
 
     def exists(self, dimension_name):
         """ Check if dimension exists
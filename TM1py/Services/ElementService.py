@@ -1,10 +1,15 @@
 # -*- coding: utf-8 -*-
+import collections
 import json
 
-from TM1py.Objects import ElementAttribute, Element
+import numpy as np
+import pandas as pd
+
+from TM1py.Objects import ElementAttribute, Element, ElementValidationIndex, HierarchyIndex
 from TM1py.Services.ObjectService import ObjectService
-from TM1py.Utils import CaseAndSpaceInsensitiveDict
+from TM1py.Utils import CaseAndSpaceInsensitiveDict, CaseAndSpaceInsensitiveSet
 from TM1py.Utils import build_element_unique_names
+from TM1py.Utils.MDXSetEvaluator import MDXSetEvaluator, UnsupportedMDXError
 
 
 class ElementService(ObjectService):
@@ -25,7 +30,9 @@ class ElementService(ObjectService):
         request = "/api/v1/Dimensions('{}')/Hierarchies('{}')/Elements".format(
             dimension_name,
             hierarchy_name)
-        return self._rest.POST(request, element.body)
+        response = self._rest.POST(request, element.body)
+        self._metadata_cache.invalidate(dimension_name=dimension_name)
+        return response
 
     def update(self, dimension_name, hierarchy_name, element):
         request = "/api/v1/Dimensions('{}')/Hierarchies('{}')/Elements('{}')".format(
@@ -34,6 +41,54 @@ class ElementService(ObjectService):
             element.name)
         return self._rest.PATCH(request, element.body)
 
+    def add_elements(self, dimension_name, hierarchy_name, elements):
+        """ Create multiple elements in one request
+
+        :param dimension_name:
+        :param hierarchy_name:
+        :param elements: iterable of TM1py.Element
+        :return:
+        """
+        request = "/api/v1/Dimensions('{}')/Hierarchies('{}')/Elements".format(
+            dimension_name,
+            hierarchy_name)
+        body = [element.body_as_dict for element in elements]
+        response = self._rest.POST(request, json.dumps(body, ensure_ascii=False))
+        self._metadata_cache.invalidate(dimension_name=dimension_name)
+        return response
+
+    def add_edges(self, dimension_name, hierarchy_name, edges):
+        """ Create multiple edges in one request
+
+        :param dimension_name:
+        :param hierarchy_name:
+        :param edges: dict, (parent, component) -> weight
+        :return:
+        """
+        request = "/api/v1/Dimensions('{}')/Hierarchies('{}')/Edges".format(
+            dimension_name,
+            hierarchy_name)
+        body = [{"ParentName": parent, "ComponentName": component, "Weight": float(weight)}
+                for (parent, component), weight
+                in edges.items()]
+        return self._rest.POST(request, json.dumps(body, ensure_ascii=False))
+
+    def update_edge(self, dimension_name, hierarchy_name, parent, component, weight):
+        request = "/api/v1/Dimensions('{}')/Hierarchies('{}')/Edges(ParentName='{}',ComponentName='{}')".format(
+            dimension_name,
+            hierarchy_name,
+            parent,
+            component)
+        return self._rest.PATCH(request, json.dumps({"Weight": float(weight)}))
+
+    def remove_edge(self, dimension_name, hierarchy_name, parent, component):
+        request = "/api/v1/Dimensions('{}')/Hierarchies('{}')/Edges(ParentName='{}',ComponentName='{}')".format(
+            dimension_name,
+            hierarchy_name,
+            parent,
+            component)
+        return self._rest.DELETE(request)
+
     def exists(self, dimension_name, hierarchy_name, element_name):
         request = "/api/v1/Dimensions('{}')/Hierarchies('{}')/Elements('{}')".format(
             dimension_name,
@@ -46,7 +101,9 @@ class ElementService(ObjectService):
             dimension_name,
             hierarchy_name,
             element_name)
-        return self._rest.DELETE(request)
+        response = self._rest.DELETE(request)
+        self._metadata_cache.invalidate(dimension_name=dimension_name)
+        return response
 
     def get_elements(self, dimension_name, hierarchy_name):
         request = "/api/v1/Dimensions('{}')/Hierarchies('{}')/Elements?$expand=*" \
@@ -213,6 +270,99 @@ class ElementService(ObjectService):
         element_attributes = [ElementAttribute.from_dict(ea) for ea in response.json()['value']]
         return element_attributes
 
+    def get_attributes_dataframe(self, dimension_name, hierarchy_name, attributes=None, skip_consolidations=False,
+                                 page_size=100000):
+        """ Get elements with their types and attribute values as pandas DataFrame.
+        Elements are retrieved in pages of `page_size` and written straight into typed columns:
+        float for numeric attributes, categorical for string and alias attributes.
+        Memory consumption is bound by the page size and the final columns, not by the size of the JSON.
+        Rows are ordered by element name.
+
+        :param dimension_name:
+        :param hierarchy_name:
+        :param attributes: Selection of attributes. Iterable. If None retrieve all.
+        :param skip_consolidations: Boolean flag to skip consolidations
+        :param page_size: number of elements to retrieve per request
+        :return: pandas DataFrame with columns: dimension name, 'Type', attributes
+        """
+        element_attributes = self.get_element_attributes(dimension_name, hierarchy_name)
+        if attributes is not None:
+            element_attributes_by_name = CaseAndSpaceInsensitiveDict(
+                {element_attribute.name: element_attribute for element_attribute in element_attributes})
+            try:
+                element_attributes = [element_attributes_by_name[attribute] for attribute in attributes]
+            except KeyError as e:
+                raise ValueError("Attribute: {} not found in Hierarchy: {}".format(e.args[0], hierarchy_name))
+
+        if skip_consolidations:
+            size = self.get_number_of_leaf_elements(dimension_name, hierarchy_name)
+        else:
+            size = self.get_number_of_elements(dimension_name, hierarchy_name)
+
+        property_names = [element_attribute.name.replace(" ", "") for element_attribute in element_attributes]
+        numeric = [element_attribute.attribute_type.upper() == 'NUMERIC' for element_attribute in element_attributes]
+        select = ",".join(["Name", "Type"] + ["Attributes/" + property_name for property_name in property_names])
+
+        # element names, element type codes and one column per attribute.
+        # String values are encoded as codes into a dict of categories. -1 is missing
+        names = np.empty(size, dtype=object)
+        type_codes = np.full(size, -1, dtype=np.int32)
+        type_categories = {}
+        columns = [np.full(size, np.nan) if is_numeric else np.full(size, -1, dtype=np.int32)
+                   for is_numeric
+                   in numeric]
+        categories = [None if is_numeric else {} for is_numeric in numeric]
+
+        row = 0
+        while True:
+            # pages need a stable order
+            request = "/api/v1/Dimensions('{}')/Hierarchies('{}')/Elements" \
+                      "?$select={}{}&$orderby=Name&$top={}&$skip={}".format(
+                dimension_name,
+                hierarchy_name,
+                select,
+                "&$filter=Type ne 3" if skip_consolidations else "",
+                page_size,
+                row)
+            elements = self._rest.GET(request).json()["value"]
+
+            if row + len(elements) > len(names):
+                # elements were added since the count
+                size = row + len(elements)
+                names = np.concatenate([names[:row], np.empty(len(elements), dtype=object)])
+                type_codes = np.concatenate([type_codes[:row], np.full(len(elements), -1, dtype=np.int32)])
+                columns = [np.concatenate([column[:row], np.full(len(elements), np.nan if is_numeric else -1,
+                                                                 dtype=column.dtype)])
+                           for column, is_numeric
+                           in zip(columns, numeric)]
+
+            for element in elements:
+                names[row] = element["Name"]
+                type_codes[row] = type_categories.setdefault(element["Type"], len(type_categories))
+                element_attribute_values = element.get("Attributes") or {}
+                for column, column_categories, property_name in zip(columns, categories, property_names):
+                    value = element_attribute_values.get(property_name)
+                    if value is None:
+                        continue
+                    if column_categories is None:
+                        column[row] = value
+                    else:
+                        column[row] = column_categories.setdefault(value, len(column_categories))
+                row += 1
+
+            if len(elements) < page_size:
+                break
+
+        data = collections.OrderedDict()
+        data[dimension_name] = names[:row]
+        data['Type'] = pd.Categorical.from_codes(type_codes[:row], list(type_categories))
+        for element_attribute, column, column_categories in zip(element_attributes, columns, categories):
+            if column_categories is None:
+                data[element_attribute.name] = column[:row]
+            else:
+                data[element_attribute.name] = pd.Categorical.from_codes(column[:row], list(column_categories))
+        return pd.DataFrame(data)
+
     def get_elements_filtered_by_attribute(self, dimension_name, hierarchy_name, attribute_name, attribute_value):
         """ Get all elements from a hierarchy with given attribute value
     
@@ -306,6 +456,96 @@ class ElementService(ObjectService):
         get_members(consolidation_tree)
         return members
 
+    def _get_hierarchy_structure(self, dimension_name, hierarchy_name):
+        request = "/api/v1/Dimensions('{}')/Hierarchies('{}')?$select=Name" \
+                  "&$expand=Elements($select=Name,Type),Edges($select=ParentName,ComponentName,Weight)" \
+            .format(dimension_name, hierarchy_name)
+        response = self._rest.GET(request)
+        return response.json()
+
+    def get_hierarchy_index(self, dimension_name, hierarchy_name):
+        """ Load the structure of a hierarchy once into a HierarchyIndex.
+        Descendants, leaves, ancestors, levels and rollup factors can then be queried locally
+
+        :param dimension_name: name of dimension
+        :param hierarchy_name: name of hierarchy
+        :return: instance of TM1py.HierarchyIndex
+        """
+        hierarchy_as_dict = self._get_hierarchy_structure(dimension_name, hierarchy_name)
+        return HierarchyIndex.from_dict(hierarchy_as_dict, dimension_name=dimension_name,
+                                        version=HierarchyIndex.fingerprint(hierarchy_as_dict))
+
+    def refresh_hierarchy_index(self, hierarchy_index):
+        """ Reload the structure of the hierarchy of a HierarchyIndex from the TM1 Server.
+        The TM1 Server exposes no change marker for hierarchies, so a refresh costs as much as
+        get_hierarchy_index. The passed index is kept when the structure is unchanged (see HierarchyIndex.fingerprint)
+
+        :param hierarchy_index: instance of TM1py.HierarchyIndex
+        :return: the passed index if still current, otherwise a new instance of TM1py.HierarchyIndex
+        """
+        hierarchy_as_dict = self._get_hierarchy_structure(
+            hierarchy_index.dimension_name, hierarchy_index.hierarchy_name)
+        version = HierarchyIndex.fingerprint(hierarchy_as_dict)
+        if version == hierarchy_index.version:
+            return hierarchy_index
+        return HierarchyIndex.from_dict(hierarchy_as_dict, dimension_name=hierarchy_index.dimension_name,
+                                        version=version)
+
+    def evaluate_set_mdx(self, mdx, hierarchy_index):
+        """ Get the element names of a set expression. Common set functions (TM1SubsetAll, TM1FilterByLevel,
+        Descendants, Children, ...) are evaluated locally against the HierarchyIndex.
+        Everything else is executed on the TM1 Server
+
+        :param mdx: set MDX on the indexed hierarchy, e.g. "{TM1FilterByLevel(TM1SubsetAll([Region]), 0)}"
+        :param hierarchy_index: instance of TM1py.HierarchyIndex (see get_hierarchy_index)
+        :return: list of element names
+        """
+        try:
+            return MDXSetEvaluator(hierarchy_index).evaluate(mdx)
+        except UnsupportedMDXError:
+            tuples = self.execute_set_mdx(mdx, member_properties=['Name'], parent_properties=None,
+                                          element_properties=None)
+            return [members[0]['Name'] for members in tuples]
+
+    def get_validation_index(self, dimension_names, include_aliases=True):
+        """ Load element names (and alias values) of the default hierarchies of dimensions once into an
+        ElementValidationIndex. Cells can then be validated locally before they are written
+
+        :param dimension_names: dimension names in the order of the element tuples, e.g. dimensions of a cube
+        :param include_aliases: Boolean. Accept alias values as element identifiers
+        :return: instance of TM1py.ElementValidationIndex
+        """
+        identifiers = [self._get_identifiers_set(dimension_name, include_aliases)
+                       for dimension_name
+                       in dimension_names]
+        versions = [ElementValidationIndex.fingerprint(dimension_identifiers) for dimension_identifiers in identifiers]
+        return ElementValidationIndex(dimension_names, identifiers, versions)
+
+    def refresh_validation_index(self, validation_index, include_aliases=True, dimension_names=None):
+        """ Reload the element names (and alias values) of dimensions of an ElementValidationIndex.
+        The TM1 Server exposes no change marker for dimensions, so every refreshed dimension is reloaded.
+        Pass dimension_names to reload only the dimensions that are known to have changed.
+        Identifiers are replaced where they changed (see ElementValidationIndex.fingerprint)
+
+        :param validation_index: instance of TM1py.ElementValidationIndex
+        :param include_aliases: Boolean. Accept alias values as element identifiers
+        :param dimension_names: iterable of dimension names to reload. Default: all dimensions of the index
+        :return: the passed index, updated in place
+        """
+        if dimension_names is None:
+            dimension_names = validation_index.dimension_names
+        for dimension_name in dimension_names:
+            identifiers = self._get_identifiers_set(dimension_name, include_aliases)
+            version = ElementValidationIndex.fingerprint(identifiers)
+            if version != validation_index.get_version(dimension_name):
+                validation_index.set_identifiers(dimension_name, identifiers, version)
+        return validation_index
+
+    def _get_identifiers_set(self, dimension_name, include_aliases):
+        if include_aliases and self.get_alias_element_attributes(dimension_name, dimension_name):
+            return self.get_all_element_identifiers(dimension_name, dimension_name)
+        return CaseAndSpaceInsensitiveSet(*self.get_element_names(dimension_name, dimension_name))
+
     def execute_set_mdx(self, mdx,
                         top_records=None,
                         member_properties=('Name', 'Weight'),
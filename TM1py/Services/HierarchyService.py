@@ -1,11 +1,17 @@
 # -*- coding: utf-8 -*-
+import collections
+import csv
+import io
 import json
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 
-from TM1py.Objects import Hierarchy
+from TM1py.Objects import Dimension, Element, Hierarchy, CompactHierarchy, HierarchyDiff, Process
 from TM1py.Services.ElementService import ElementService
 from TM1py.Services.ObjectService import ObjectService
 from TM1py.Services.SubsetService import SubsetService
-from TM1py.Utils.Utils import case_and_space_insensitive_equals
+from TM1py.Utils.Utils import case_and_space_insensitive_equals, lower_and_drop_spaces
 
 
 class HierarchyService(ObjectService):
@@ -17,6 +23,14 @@ class HierarchyService(ObjectService):
     # https://www.ibm.com/developerworks/community/forums/html/topic?id=75f2b99e-6961-4c71-9364-1d5e1e083eff
     EDGES_WORKAROUND_VERSIONS = ('11.0.002', '11.0.003', '11.1.000')
 
+    # update_incremental: number of removals from which on TI is used instead of one REST request per removal
+    INCREMENTAL_UPDATE_TI_THRESHOLD = 100
+    # update_incremental: max number of TI statements in one (temporary) process
+    INCREMENTAL_UPDATE_TI_CHUNK_SIZE = 10000
+
+    # bulk_load: number of elements and edges from which on the TI strategy is used
+    BULK_LOAD_TI_THRESHOLD = 50000
+
     def __init__(self, rest):
         super().__init__(rest)
         self.subsets = SubsetService(rest)
@@ -30,19 +44,23 @@ class HierarchyService(ObjectService):
         """
         request = '/api/v1/Dimensions(\'{}\')/Hierarchies'.format(hierarchy.dimension_name)
         response = self._rest.POST(request, hierarchy.body)
+        self._metadata_cache.invalidate(dimension_name=hierarchy.dimension_name)
         return response
 
-    def get(self, dimension_name, hierarchy_name):
+    def get(self, dimension_name, hierarchy_name, compact=False):
         """ get hierarchy
 
         :param dimension_name: name of the dimension
         :param hierarchy_name: name of the hierarchy
+        :param compact: return TM1py.CompactHierarchy instead of TM1py.Hierarchy. Recommended for very large dimensions
         :return:
         """
         request = "/api/v1/Dimensions('{}')/Hierarchies('{}')?$expand=" \
                   "Edges,Elements,ElementAttributes,Subsets,DefaultMember" \
             .format(dimension_name, hierarchy_name)
         response = self._rest.GET(request, '')
+        if compact:
+            return CompactHierarchy.from_dict(response.json())
         return Hierarchy.from_dict(response.json())
 
     def get_all_names(self, dimension_name):
@@ -85,15 +103,315 @@ class HierarchyService(ObjectService):
             process_service = ProcessService(self._rest)
             ti_function = "HierarchyElementComponentAdd('{}', '{}', '{}', '{}', {});"
             ti_statements = [ti_function.format(hierarchy.dimension_name, hierarchy.name,
-                                                edge[0],
-                                                edge[1],
-                                                hierarchy.edges[(edge[0], edge[1])])
-                             for edge
-                             in hierarchy.edges]
+                                                parent,
+                                                component,
+                                                weight)
+                             for (parent, component), weight
+                             in hierarchy.edges.items()]
             responses.append(process_service.execute_ti_code(lines_prolog=ti_statements))
 
+        self._metadata_cache.invalidate(dimension_name=hierarchy.dimension_name)
+        return responses
+
+    def get_structure(self, dimension_name, hierarchy_name):
+        """ Get elements, edges and element attributes of a hierarchy. No attribute values, no subsets.
+        Cheap enough to be used as base for update_incremental
+
+        :param dimension_name: name of the dimension
+        :param hierarchy_name: name of the hierarchy
+        :return: instance of TM1py.CompactHierarchy
+        """
+        request = "/api/v1/Dimensions('{}')/Hierarchies('{}')?$select=Name,UniqueName" \
+                  "&$expand=Elements($select=Name,Type),Edges($select=ParentName,ComponentName,Weight)," \
+                  "ElementAttributes($select=Name,Type)".format(dimension_name, hierarchy_name)
+        response = self._rest.GET(request)
+        hierarchy_as_dict = response.json()
+        hierarchy_as_dict['Subsets'] = []
+        hierarchy_as_dict['DefaultMember'] = None
+        return CompactHierarchy.from_dict(hierarchy_as_dict)
+
+    def get_diff(self, hierarchy, snapshot=None):
+        """ Compare a local hierarchy to its state on the TM1 Server (or to a cached snapshot of that state)
+
+        :param hierarchy: instance of TM1py.Hierarchy. Desired state
+        :param snapshot: instance of TM1py.Hierarchy. Known state on the server. Retrieved if not passed
+        :return: instance of TM1py.HierarchyDiff
+        """
+        if snapshot is None:
+            snapshot = self.get_structure(hierarchy.dimension_name, hierarchy.name)
+        return HierarchyDiff.from_hierarchies(base=snapshot, target=hierarchy)
+
+    def update_incremental(self, hierarchy, snapshot=None, use_ti=None):
+        """ update a hierarchy by sending only the differences to the TM1 Server,
+        instead of the full hierarchy like `update` does.
+
+        Added elements and edges are created in one request each. Removals and weight changes
+        are done per element / edge through REST or in batches through TI.
+
+        :param hierarchy: instance of TM1py.Hierarchy. Desired state
+        :param snapshot: instance of TM1py.Hierarchy. Known state on the server,
+        e.g. the hierarchy as retrieved or written last time. Retrieved from the server if not passed
+        :param use_ti: use TI for removals and weight changes. If None, TI is used
+        when number of operations exceeds INCREMENTAL_UPDATE_TI_THRESHOLD
+        :return: list of responses
+        """
+        diff = self.get_diff(hierarchy, snapshot)
+        dimension_name, hierarchy_name = diff.dimension_name, diff.hierarchy_name
+        responses = list()
+        if diff.is_empty():
+            return responses
+
+        if use_ti is None:
+            number_of_changes = len(diff.edges_to_remove) + len(diff.elements_to_remove) + len(diff.edges_to_update)
+            use_ti = number_of_changes > self.INCREMENTAL_UPDATE_TI_THRESHOLD
+
+        for element_attribute in diff.element_attributes_to_add:
+            responses.append(self.elements.create_element_attribute(
+                dimension_name=dimension_name,
+                hierarchy_name=hierarchy_name,
+                element_attribute=element_attribute))
+
+        # 1. Removals. Edges first, so consolidations can be turned into leaves
+        if use_ti:
+            ti_statements = [
+                "HierarchyElementComponentDelete('{}', '{}', '{}', '{}');".format(
+                    *self._escape_ti_strings(dimension_name, hierarchy_name, parent, component))
+                for parent, component
+                in diff.edges_to_remove]
+            ti_statements += [
+                "HierarchyElementDelete('{}', '{}', '{}');".format(
+                    *self._escape_ti_strings(dimension_name, hierarchy_name, element_name))
+                for element_name
+                in diff.elements_to_remove]
+            responses.extend(self._execute_ti_statements(ti_statements))
+        else:
+            for parent, component in diff.edges_to_remove:
+                responses.append(self.elements.remove_edge(dimension_name, hierarchy_name, parent, component))
+            for element_name in diff.elements_to_remove:
+                responses.append(self.elements.delete(dimension_name, hierarchy_name, element_name))
+
+        # 2. Type changes
+        for element_name, element_type in diff.elements_to_update.items():
+            responses.append(self.elements.update(
+                dimension_name, hierarchy_name, Element(name=element_name, element_type=element_type)))
+
+        # 3. Additions
+        if diff.elements_to_add:
+            responses.append(self.elements.add_elements(
+                dimension_name,
+                hierarchy_name,
+                [Element(name=element_name, element_type=element_type)
+                 for element_name, element_type
+                 in diff.elements_to_add.items()]))
+        # Workaround EDGES: edges can't be created through REST in certain versions
+        edges_workaround = self.version[0:8] in self.EDGES_WORKAROUND_VERSIONS
+        if diff.edges_to_add and not edges_workaround:
+            responses.append(self.elements.add_edges(dimension_name, hierarchy_name, diff.edges_to_add))
+
+        # 4. Weight changes. HierarchyElementComponentAdd updates the weight of existing edges
+        ti_edges = collections.OrderedDict()
+        if edges_workaround:
+            ti_edges.update(diff.edges_to_add)
+        if use_ti or edges_workaround:
+            ti_edges.update(diff.edges_to_update)
+        else:
+            for (parent, component), weight in diff.edges_to_update.items():
+                responses.append(self.elements.update_edge(dimension_name, hierarchy_name, parent, component, weight))
+        if ti_edges:
+            ti_statements = [
+                "HierarchyElementComponentAdd('{}', '{}', '{}', '{}', {});".format(
+                    *self._escape_ti_strings(dimension_name, hierarchy_name, parent, component), weight)
+                for (parent, component), weight
+                in ti_edges.items()]
+            responses.extend(self._execute_ti_statements(ti_statements))
+
+        for element_attribute in diff.element_attributes_to_remove:
+            responses.append(self.elements.delete_element_attribute(
+                dimension_name=dimension_name,
+                hierarchy_name=hierarchy_name,
+                element_attribute=element_attribute))
+
+        self._metadata_cache.invalidate(dimension_name=dimension_name)
         return responses
 
+    def bulk_load(self, hierarchy, strategy=None, chunk_size=10000, max_workers=4):
+        """ Write the elements and edges of a large hierarchy in bulk,
+        instead of sending one (potentially too large) body through `create` or `update`.
+        Dimension and hierarchy are created if they don't exist.
+        Only elements, edges and element attributes that don't exist yet on the TM1 Server are written.
+
+        Strategies:
+            'rest': elements, then edges, are posted in chunks of `chunk_size`. `max_workers` requests in parallel
+            'ti': elements and edges are written to a file, that is uploaded to the TM1 Server
+            and processed by one generated TI process
+
+        :param hierarchy: instance of TM1py.Hierarchy
+        :param strategy: 'rest' or 'ti'. If None, 'ti' is used when the number of elements and edges
+        to write exceeds BULK_LOAD_TI_THRESHOLD
+        :param chunk_size: number of elements (resp. edges) per request with strategy 'rest'
+        :param max_workers: number of parallel requests with strategy 'rest'
+        :return: dict with strategy, number of elements and edges written, seconds and throughput
+        """
+        start = time.perf_counter()
+        dimension_name, hierarchy_name = hierarchy.dimension_name, hierarchy.name
+        if self.exists(dimension_name, hierarchy_name):
+            diff = self.get_diff(hierarchy)
+        else:
+            empty_hierarchy = Hierarchy(name=hierarchy_name, dimension_name=dimension_name)
+            if self._exists("/api/v1/Dimensions('{}')".format(dimension_name)):
+                self.create(empty_hierarchy)
+            else:
+                dimension = Dimension(name=dimension_name, hierarchies=[empty_hierarchy])
+                self._rest.POST("/api/v1/Dimensions", dimension.body)
+            diff = HierarchyDiff.from_hierarchies(base=empty_hierarchy, target=hierarchy)
+
+        number_of_elements, number_of_edges = len(diff.elements_to_add), len(diff.edges_to_add)
+        if strategy is None:
+            strategy = 'ti' if number_of_elements + number_of_edges > self.BULK_LOAD_TI_THRESHOLD else 'rest'
+
+        for element_attribute in diff.element_attributes_to_add:
+            self.elements.create_element_attribute(
+                dimension_name=dimension_name,
+                hierarchy_name=hierarchy_name,
+                element_attribute=element_attribute)
+
+        if strategy == 'rest':
+            number_of_requests = self._bulk_load_rest(diff, chunk_size, max_workers)
+        elif strategy == 'ti':
+            number_of_requests = self._bulk_load_ti(diff)
+        else:
+            raise ValueError("Invalid strategy: '{}'. Must be 'rest' or 'ti'".format(strategy))
+        self._metadata_cache.invalidate(dimension_name=dimension_name)
+
+        seconds = time.perf_counter() - start
+        return {
+            'strategy': strategy,
+            'elements': number_of_elements,
+            'edges': number_of_edges,
+            'requests': number_of_requests,
+            'seconds': seconds,
+            'elements_per_second': number_of_elements / seconds if seconds else None,
+            'edges_per_second': number_of_edges / seconds if seconds else None}
+
+    def _bulk_load_rest(self, diff, chunk_size, max_workers):
+        """ post elements and edges in parallel chunks. Elements first, since edges refer to them
+
+        :return: number of requests
+        """
+        dimension_name, hierarchy_name = diff.dimension_name, diff.hierarchy_name
+        elements = [Element(name=element_name, element_type=element_type)
+                    for element_name, element_type
+                    in diff.elements_to_add.items()]
+        element_chunks = [elements[start:start + chunk_size] for start in range(0, len(elements), chunk_size)]
+        edges = list(diff.edges_to_add.items())
+        edge_chunks = [collections.OrderedDict(edges[start:start + chunk_size])
+                       for start
+                       in range(0, len(edges), chunk_size)]
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            # list(...) to raise exceptions from the worker threads
+            list(executor.map(
+                lambda chunk: self.elements.add_elements(dimension_name, hierarchy_name, chunk),
+                element_chunks))
+            # Workaround EDGES: Handle Issue, that Edges cant be created through REST in certain versions
+            if self.version[0:8] in self.EDGES_WORKAROUND_VERSIONS:
+                ti_statements = [
+                    "HierarchyElementComponentAdd('{}', '{}', '{}', '{}', {});".format(
+                        *self._escape_ti_strings(dimension_name, hierarchy_name, parent, component), weight)
+                    for (parent, component), weight
+                    in edges]
+                return len(element_chunks) + len(self._execute_ti_statements(ti_statements))
+            list(executor.map(
+                lambda chunk: self.elements.add_edges(dimension_name, hierarchy_name, chunk),
+                edge_chunks))
+        return len(element_chunks) + len(edge_chunks)
+
+    def _bulk_load_ti(self, diff):
+        """ write elements and edges to a file, upload it to the TM1 Server as blob
+        and process it with a generated TI process
+
+        Records of the file: kind ('E' for element, 'R' for edge), name, type (resp. component), weight
+
+        :return: number of requests
+        """
+        from TM1py.Services import ProcessService
+        process_service = ProcessService(self._rest)
+        dimension_name, hierarchy_name = self._escape_ti_strings(diff.dimension_name, diff.hierarchy_name)
+
+        file = io.StringIO()
+        writer = csv.writer(file, delimiter=',', quotechar='"', quoting=csv.QUOTE_ALL, lineterminator='\r\n')
+        type_codes = {1: 'N', 2: 'S', 3: 'C'}
+        writer.writerows(('E', element_name, type_codes[element_type], '')
+                         for element_name, element_type
+                         in diff.elements_to_add.items())
+        writer.writerows(('R', parent, component, weight)
+                         for (parent, component), weight
+                         in diff.edges_to_add.items())
+
+        name = 'TM1py' + str(uuid.uuid4())
+        requests = len(self._upload_blob(name, file.getvalue().encode('utf-8')))
+        process = Process(
+            name='}' + name,
+            datasource_type='ASCII',
+            datasource_ascii_delimiter_char=',',
+            datasource_ascii_quote_character='"',
+            datasource_ascii_header_records=0,
+            datasource_data_source_name_for_client=name + '.blb',
+            datasource_data_source_name_for_server=name + '.blb',
+            metadata_procedure="\r\n".join([
+                "IF(vKind @= 'E');",
+                "HierarchyElementInsert('{0}', '{1}', '', vName, vType);",
+                "ELSE;",
+                "HierarchyElementComponentAdd('{0}', '{1}', vName, vType, NUMBR(vWeight));",
+                "ENDIF;"]).format(dimension_name, hierarchy_name))
+        for variable in ('vKind', 'vName', 'vType', 'vWeight'):
+            process.add_variable(variable, 'String')
+        process_service.create(process)
+        requests += 1
+        try:
+            success, status, error_log_file = process_service.execute_with_return(process.name)
+            requests += 1
+        finally:
+            process_service.delete(process.name)
+            requests += 1
+            self._delete_blob(name)
+            requests += 1
+        if not success:
+            raise RuntimeError("Bulk load into '{}:{}' failed with status: '{}'. Error log file: '{}'".format(
+                diff.dimension_name, diff.hierarchy_name, status, error_log_file))
+        return requests
+
+    def _upload_blob(self, name, content):
+        """ create the blob document, then write its content
+
+        :return: list of responses
+        """
+        request = "/api/v1/Contents('Blobs')/Contents"
+        body = {
+            "@odata.type": "#ibm.tm1.api.v1.Document",
+            "ID": name + ".blb",
+            "Name": name}
+        responses = [self._rest.POST(request, json.dumps(body))]
+        request = "/api/v1/Contents('Blobs')/Contents('{}')/Content".format(name + ".blb")
+        responses.append(self._rest.PUT(request, content, headers={'Content-Type': 'application/octet-stream'}))
+        return responses
+
+    def _delete_blob(self, name):
+        request = "/api/v1/Contents('Blobs')/Contents('{}')".format(name + ".blb")
+        return self._rest.DELETE(request)
+
+    @staticmethod
+    def _escape_ti_strings(*strings):
+        return [string.replace("'", "''") for string in strings]
+
+    def _execute_ti_statements(self, ti_statements):
+        from TM1py.Services import ProcessService
+        process_service = ProcessService(self._rest)
+        chunk_size = self.INCREMENTAL_UPDATE_TI_CHUNK_SIZE
+        return [process_service.execute_ti_code(lines_prolog=ti_statements[start:start + chunk_size])
+                for start
+                in range(0, len(ti_statements), chunk_size)]
+
     def exists(self, dimension_name, hierarchy_name):
         """
 
@@ -106,7 +424,9 @@ class HierarchyService(ObjectService):
 
     def delete(self, dimension_name, hierarchy_name):
         request = '/api/v1/Dimensions(\'{}\')/Hierarchies(\'{}\')'.format(dimension_name, hierarchy_name)
-        return self._rest.DELETE(request)
+        response = self._rest.DELETE(request)
+        self._metadata_cache.invalidate(dimension_name=dimension_name)
+        return response
 
     def get_hierarchy_summary(self, dimension_name, hierarchy_name):
         hierarchy_properties = ("Elements", "Edges", "ElementAttributes", "Members", "Levels")
@@ -128,18 +448,21 @@ class HierarchyService(ObjectService):
         # get existing attributes first.
         element_attributes = self.elements.get_element_attributes(dimension_name=hierarchy.dimension_name,
                                                                   hierarchy_name=hierarchy.name)
-        element_attribute_names = [ea.name
+        element_attribute_names = {lower_and_drop_spaces(ea.name): ea.name
                                    for ea
-                                   in element_attributes]
+                                   in element_attributes}
+        hierarchy_attribute_names = {lower_and_drop_spaces(ea.name)
+                                     for ea
+                                     in hierarchy.element_attributes}
         # write ElementAttributes that don't already exist !
         for element_attribute in hierarchy.element_attributes:
-            if element_attribute not in element_attribute_names:
+            if lower_and_drop_spaces(element_attribute.name) not in element_attribute_names:
                 self.elements.create_element_attribute(dimension_name=hierarchy.dimension_name,
                                                        hierarchy_name=hierarchy.name,
                                                        element_attribute=element_attribute)
         # delete attributes that are determined to be removed
-        for element_attribute in element_attribute_names:
-            if element_attribute not in hierarchy.element_attributes:
+        for element_attribute_adjusted, element_attribute in element_attribute_names.items():
+            if element_attribute_adjusted not in hierarchy_attribute_names:
                 self.elements.delete_element_attribute(dimension_name=hierarchy.dimension_name,
                                                        hierarchy_name=hierarchy.name,
                                                        element_attribute=element_attribute)
@@ -179,8 +502,10 @@ class HierarchyService(ObjectService):
             cellset_as_dict=cells,
             dimensions=('}Dimensions', '}Hierarchies', '}HierarchyProperties'))
 
-        return ProcessService(self._rest).execute_ti_code(
+        response = ProcessService(self._rest).execute_ti_code(
             lines_prolog="RefreshMdxHierarchy('{}');".format(dimension_name))
+        self._metadata_cache.invalidate(dimension_name=dimension_name)
+        return response
 
     def remove_all_edges(self, dimension_name, hierarchy_name=None):
         if not hierarchy_name:
@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+
+import time
+
+from TM1py.Services.ObjectService import ObjectService
+from TM1py.Utils.Utils import CaseAndSpaceInsensitiveDict, CaseAndSpaceInsensitiveTuplesDict, \
+    case_and_space_insensitive_equals
+
+
+class MetadataCacheService(ObjectService):
+    """ Cache for metadata that is needed over and over to build requests:
+    cube -> dimension names, hierarchy -> number of elements, subset -> number of elements
+
+    The cache is shared by all services that use the same connection. The dimension names of all cubes are loaded
+    with one request when they are first needed or when they expired (ttl). Cubes that are missing in the loaded
+    names (e.g. created by another connection) are fetched individually.
+    Changes through CubeService, DimensionService, HierarchyService and ElementService (elements added or deleted)
+    invalidate the affected entries.
+    Changes through other connections or TI are only picked up after the ttl or an explicit invalidate.
+    Set sizes are fetched individually. They serve as estimates and expire with the ttl only
+    (or when the hierarchy is changed through HierarchyService or ElementService).
+    """
+
+    def __init__(self, rest, ttl=300):
+        """
+
+        :param rest: instance of RESTService
+        :param ttl: seconds after which the cached metadata is reloaded. 0 disables the cache
+        """
+        super().__init__(rest)
+        self.ttl = ttl
+        self._cubes = CaseAndSpaceInsensitiveDict()
+        self._cubes_loaded = None
+        # (dimension, hierarchy, subset, private) -> (number of elements, time loaded)
+        self._set_sizes = CaseAndSpaceInsensitiveTuplesDict()
+        # one cache per connection
+        rest._metadata_cache = self
+
+    @classmethod
+    def of(cls, rest):
+        """ Get the cache of a connection. Create it if it doesn't exist yet
+
+        :param rest: instance of RESTService
+        :return: instance of MetadataCacheService
+        """
+        cache = getattr(rest, '_metadata_cache', None)
+        if cache is None:
+            cache = cls(rest)
+        return cache
+
+    def get_dimension_names(self, cube_name):
+        """ Dimension names of a cube in their natural order (incl. sandbox dimension)
+
+        :param cube_name:
+        :return: list of dimension names
+        """
+        if not self.ttl:
+            return self._get_dimension_names_from_server(cube_name)
+        if not self._is_valid(self._cubes_loaded):
+            self.load_cubes()
+        if cube_name not in self._cubes:
+            self._cubes[cube_name] = self._get_dimension_names_from_server(cube_name)
+        return list(self._cubes[cube_name])
+
+    def get_number_of_elements(self, dimension_name, hierarchy_name=None):
+        """ Number of elements in a hierarchy
+
+        :param dimension_name:
+        :param hierarchy_name: Default: same as dimension name
+        :return: int
+        """
+        hierarchy_name = hierarchy_name or dimension_name
+        request = "/api/v1/Dimensions('{}')/Hierarchies('{}')/Elements?$count&$top=0".format(
+            dimension_name, hierarchy_name)
+        return self._get_set_size((dimension_name, hierarchy_name, '', ''), request)
+
+    def get_subset_size(self, dimension_name, hierarchy_name, subset_name, private=False):
+        """ Number of elements in a (static or dynamic) subset
+
+        :param dimension_name:
+        :param hierarchy_name: Default: same as dimension name
+        :param subset_name:
+        :param private: Boolean
+        :return: int
+        """
+        hierarchy_name = hierarchy_name or dimension_name
+        subsets = "PrivateSubsets" if private else "Subsets"
+        request = "/api/v1/Dimensions('{}')/Hierarchies('{}')/{}('{}')/Elements?$count&$top=0".format(
+            dimension_name, hierarchy_name, subsets, subset_name)
+        return self._get_set_size((dimension_name, hierarchy_name, subset_name, subsets), request)
+
+    def load_cubes(self):
+        """ (Re)load the dimension names of all cubes in one request
+
+        :return:
+        """
+        request = "/api/v1/Cubes?$select=Name&$expand=Dimensions($select=Name)"
+        response = self._rest.GET(request)
+        self._cubes = CaseAndSpaceInsensitiveDict(
+            (cube['Name'], [dimension['Name'] for dimension in cube['Dimensions']])
+            for cube
+            in response.json()['value'])
+        self._cubes_loaded = time.monotonic()
+
+    def invalidate(self, cube_name=None, dimension_name=None):
+        """ Remove entries from the cache. Without arguments the whole cache is cleared
+
+        :param cube_name: optional. Remove the dimension names of this cube
+        :param dimension_name: optional. Remove the set sizes of this dimension
+        :return:
+        """
+        if not cube_name and not dimension_name:
+            self._cubes_loaded = None
+            self._set_sizes.clear()
+            return
+        if cube_name:
+            self._cubes.pop(cube_name, None)
+        if dimension_name:
+            for key in [key for key in self._set_sizes if case_and_space_insensitive_equals(key[0], dimension_name)]:
+                del self._set_sizes[key]
+
+    def _is_valid(self, loaded):
+        return loaded is not None and time.monotonic() - loaded < self.ttl
+
+    def _get_set_size(self, key, request):
+        if self.ttl and key in self._set_sizes:
+            size, loaded = self._set_sizes[key]
+            if self._is_valid(loaded):
+                return size
+        response = self._rest.GET(request)
+        size = int(response.json()['@odata.count'])
+        if self.ttl:
+            self._set_sizes[key] = (size, time.monotonic())
+        return size
+
+    def _get_dimension_names_from_server(self, cube_name):
+        request = "/api/v1/Cubes('{}')/Dimensions?$select=Name".format(cube_name)
+        response = self._rest.GET(request)
+        return [dimension['Name'] for dimension in response.json()['value']]
@@ -0,0 +1,225 @@
+# -*- coding: utf-8 -*-
+
+import datetime
+import hashlib
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+from TM1py.Objects.ModelSnapshot import ModelSnapshot
+from TM1py.Services.ObjectService import ObjectService
+from TM1py.Utils.Utils import CaseAndSpaceInsensitiveDict
+
+
+class ModelSnapshotService(ObjectService):
+    """ Service to take (and refresh) snapshots of the metadata of a whole TM1 model
+
+    Objects are fetched concurrently. All threads share the connection of the service, so
+    `connection_pool_size` of the TM1Service should be at least `max_workers` (requests defaults to 10).
+    """
+
+    VIEWS_EXPAND = "tm1.NativeView/Rows/Subset($expand=Hierarchy($select=Name;" \
+                   "$expand=Dimension($select=Name)),Elements($select=Name);" \
+                   "$select=Expression,UniqueName,Name,Alias)," \
+                   "tm1.NativeView/Columns/Subset($expand=Hierarchy($select=Name;" \
+                   "$expand=Dimension($select=Name)),Elements($select=Name);" \
+                   "$select=Expression,UniqueName,Name,Alias)," \
+                   "tm1.NativeView/Titles/Subset($expand=Hierarchy($select=Name;" \
+                   "$expand=Dimension($select=Name)),Elements($select=Name);" \
+                   "$select=Expression,UniqueName,Name,Alias)," \
+                   "tm1.NativeView/Titles/Selected($select=Name)"
+
+    HIERARCHY_FINGERPRINT_EXPAND = "Elements($select=Name,Type),Edges($select=ParentName,ComponentName,Weight)," \
+                                   "ElementAttributes($select=Name,Type),DefaultMember($select=Name)," \
+                                   "Subsets($select=Name,Expression,Alias;$expand=Elements($select=Name))," \
+                                   "PrivateSubsets($select=Name,Expression,Alias;$expand=Elements($select=Name))"
+
+    PROCESSES_SELECT = "*,UIData,VariablesUIData," \
+                       "DataSource/dataSourceNameForServer," \
+                       "DataSource/dataSourceNameForClient," \
+                       "DataSource/asciiDecimalSeparator," \
+                       "DataSource/asciiDelimiterChar," \
+                       "DataSource/asciiDelimiterType," \
+                       "DataSource/asciiHeaderRecords," \
+                       "DataSource/asciiQuoteCharacter," \
+                       "DataSource/asciiThousandSeparator," \
+                       "DataSource/view," \
+                       "DataSource/query," \
+                       "DataSource/userName," \
+                       "DataSource/password," \
+                       "DataSource/usesUnicode," \
+                       "DataSource/subset"
+
+    def __init__(self, rest):
+        super().__init__(rest)
+
+    def build(self, max_workers=8, skip_control_objects=False):
+        """ Take a snapshot of cubes (incl. rules), views, dimensions, subsets, processes and chores
+
+        :param max_workers: number of concurrent requests
+        :param skip_control_objects: Boolean. Ignore objects whose name starts with '}'
+        :return: instance of TM1py.ModelSnapshot
+        """
+        return self.refresh(ModelSnapshot(), max_workers=max_workers, skip_control_objects=skip_control_objects)
+
+    def refresh(self, snapshot, max_workers=8, skip_control_objects=False):
+        """ Bring a snapshot up to date, fetching only objects that changed since it was taken.
+
+        Cubes (incl. rules) are refetched when their LastSchemaUpdate changed. Dimensions (incl. subsets) are
+        refetched when the fingerprint of any of their hierarchies changed: a hash of element names and types,
+        edges and weights, element attributes, default member and subset definitions (see
+        get_dimension_fingerprints). Views, processes and chores have no such marker and are always refetched.
+
+        :param snapshot: instance of TM1py.ModelSnapshot
+        :param max_workers: number of concurrent requests
+        :param skip_control_objects: Boolean. Ignore objects whose name starts with '}'
+        :return: new instance of TM1py.ModelSnapshot
+        """
+        cube_fingerprints = self.get_cube_fingerprints(skip_control_objects)
+        dimension_fingerprints = self.get_dimension_fingerprints(skip_control_objects, max_workers)
+        previous = {section: CaseAndSpaceInsensitiveDict(objects)
+                    for section, objects
+                    in snapshot.body_as_dict.items()
+                    if isinstance(objects, dict)}
+        previous_cube_fingerprints = CaseAndSpaceInsensitiveDict(previous['Fingerprints']['Cubes'])
+        previous_dimension_fingerprints = CaseAndSpaceInsensitiveDict(previous['Fingerprints']['Dimensions'])
+
+        cubes = CaseAndSpaceInsensitiveDict()
+        for cube_name, fingerprint in cube_fingerprints.items():
+            if previous_cube_fingerprints.get(cube_name) == fingerprint:
+                cubes[cube_name] = previous['Cubes'][cube_name]
+        dimensions = CaseAndSpaceInsensitiveDict()
+        subsets = CaseAndSpaceInsensitiveDict()
+        for dimension_name, fingerprint in dimension_fingerprints.items():
+            if previous_dimension_fingerprints.get(dimension_name) == fingerprint:
+                dimensions[dimension_name] = previous['Dimensions'][dimension_name]
+                subsets[dimension_name] = previous['Subsets'][dimension_name]
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            cube_futures = {cube_name: executor.submit(self._get_cube_as_dict, cube_name)
+                            for cube_name in cube_fingerprints
+                            if cube_name not in cubes}
+            view_futures = {cube_name: executor.submit(self._get_views_as_dict, cube_name)
+                            for cube_name in cube_fingerprints}
+            dimension_futures = {dimension_name: executor.submit(self._get_dimension_as_dict, dimension_name)
+                                 for dimension_name in dimension_fingerprints
+                                 if dimension_name not in dimensions}
+            subset_futures = {(dimension_name, hierarchy_name): executor.submit(
+                self._get_subsets_as_dict, dimension_name, hierarchy_name)
+                for dimension_name, fingerprint in dimension_fingerprints.items()
+                if dimension_name not in subsets
+                for hierarchy_name in fingerprint}
+            processes_future = executor.submit(self._get_processes_as_dict, skip_control_objects)
+            chores_future = executor.submit(self._get_chores_as_dict)
+
+            for cube_name, future in cube_futures.items():
+                cubes[cube_name] = future.result()
+            views = CaseAndSpaceInsensitiveDict()
+            for cube_name, future in view_futures.items():
+                views[cube_name] = future.result()
+            for dimension_name, future in dimension_futures.items():
+                dimensions[dimension_name] = future.result()
+            for (dimension_name, hierarchy_name), future in subset_futures.items():
+                if dimension_name not in subsets:
+                    subsets[dimension_name] = {}
+                subsets[dimension_name][hierarchy_name] = future.result()
+            processes = processes_future.result()
+            chores = chores_future.result()
+
+        return ModelSnapshot(
+            version=self.version,
+            created=datetime.datetime.now().isoformat(),
+            cubes=cubes,
+            views=views,
+            dimensions=dimensions,
+            subsets=subsets,
+            processes=processes,
+            chores=chores,
+            fingerprints={'Cubes': cube_fingerprints, 'Dimensions': dimension_fingerprints})
+
+    def get_cube_fingerprints(self, skip_control_objects=False):
+        """ Get LastSchemaUpdate of all cubes in one request
+
+        :param skip_control_objects: Boolean
+        :return: dict, cube name -> {'LastSchemaUpdate': ..}
+        """
+        request = "/api/v1/Cubes?$select=Name,LastSchemaUpdate"
+        response = self._rest.GET(request)
+        return CaseAndSpaceInsensitiveDict(
+            (cube['Name'], {'LastSchemaUpdate': cube['LastSchemaUpdate']})
+            for cube
+            in response.json()['value']
+            if not (skip_control_objects and cube['Name'].startswith('}')))
+
+    def get_dimension_fingerprints(self, skip_control_objects=False, max_workers=8):
+        """ Get a hash of the content of all hierarchies: element names and types, edges and weights,
+        element attributes, default member and subsets (expression, alias and static elements).
+        Downloads the hierarchies without element properties and attribute values (one request per dimension)
+
+        :param skip_control_objects: Boolean
+        :param max_workers: number of concurrent requests
+        :return: dict, dimension name -> hierarchy name -> hex digest
+        """
+        request = "/api/v1/Dimensions?$select=Name"
+        response = self._rest.GET(request)
+        dimension_names = [dimension['Name']
+                           for dimension
+                           in response.json()['value']
+                           if not (skip_control_objects and dimension['Name'].startswith('}'))]
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(self._get_dimension_fingerprint, dimension_name)
+                       for dimension_name in dimension_names]
+            return CaseAndSpaceInsensitiveDict(
+                (dimension_name, future.result())
+                for dimension_name, future
+                in zip(dimension_names, futures))
+
+    def _get_dimension_fingerprint(self, dimension_name):
+        request = "/api/v1/Dimensions('{}')/Hierarchies?$select=Name&$expand={}".format(
+            dimension_name, self.HIERARCHY_FINGERPRINT_EXPAND)
+        response = self._rest.GET(request)
+        return {hierarchy['Name']: hashlib.sha256(
+            json.dumps(hierarchy, sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()
+            for hierarchy
+            in response.json()['value']}
+
+    def _get_cube_as_dict(self, cube_name):
+        request = "/api/v1/Cubes('{}')?$expand=Dimensions($select=Name)".format(cube_name)
+        response = self._rest.GET(request)
+        return response.json()
+
+    def _get_views_as_dict(self, cube_name):
+        views = {}
+        for view_type in ('PrivateViews', 'Views'):
+            request = "/api/v1/Cubes('{}')/{}?$expand={}".format(cube_name, view_type, self.VIEWS_EXPAND)
+            response = self._rest.GET(request)
+            views[view_type] = response.json()['value']
+        return views
+
+    def _get_dimension_as_dict(self, dimension_name):
+        request = "/api/v1/Dimensions('{}')?$expand=Hierarchies($expand=*)".format(dimension_name)
+        response = self._rest.GET(request)
+        return response.json()
+
+    def _get_subsets_as_dict(self, dimension_name, hierarchy_name):
+        subsets = {}
+        for subset_type in ('PrivateSubsets', 'Subsets'):
+            request = "/api/v1/Dimensions('{}')/Hierarchies('{}')/{}?$expand=" \
+                      "Hierarchy($select=Dimension,Name),Elements($select=Name)&$select=*,Alias".format(
+                        dimension_name, hierarchy_name, subset_type)
+            response = self._rest.GET(request)
+            subsets[subset_type] = response.json()['value']
+        return subsets
+
+    def _get_processes_as_dict(self, skip_control_objects=False):
+        request = "/api/v1/Processes?$select={}".format(self.PROCESSES_SELECT)
+        response = self._rest.GET(request)
+        return {process['Name']: process
+                for process
+                in response.json()['value']
+                if not (skip_control_objects and process['Name'].startswith('}'))}
+
+    def _get_chores_as_dict(self):
+        request = "/api/v1/Chores?$expand=Tasks($expand=*,Process($select=Name),Chore($select=Name))"
+        response = self._rest.GET(request)
+        return {chore['Name']: chore for chore in response.json()['value']}
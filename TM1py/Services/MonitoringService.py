@@ -1,8 +1,33 @@
 # -*- coding: utf-8 -*-
 
+import collections
+import csv
+import datetime
+import re
+import threading
+
+import pandas as pd
+
 from TM1py.Objects.User import User
 from TM1py.Services.ObjectService import ObjectService
 
+REGEX_ISO_DURATION = re.compile(r'^P(?:(?P<days>\d+)D)?(?:T(?:(?P<hours>\d+)H)?(?:(?P<minutes>\d+)M)?'
+                                r'(?:(?P<seconds>[\d.]+)S)?)?$')
+
+
+def duration_in_seconds(duration):
+    """ Convert an ISO 8601 duration as used by the TM1 Server (e.g. 'P0DT00H01M05S') to seconds
+
+    :param duration: String
+    :return: float
+    """
+    match = REGEX_ISO_DURATION.match(duration or '')
+    if not match:
+        return 0.0
+    parts = match.groupdict(default='0')
+    return int(parts['days']) * 86400 + int(parts['hours']) * 3600 + int(parts['minutes']) * 60 + \
+        float(parts['seconds'])
+
 
 class MonitoringService(ObjectService):
     """ Service to Query and Cancel Threads in TM1
@@ -21,6 +46,18 @@ class MonitoringService(ObjectService):
         response = self._rest.GET(request)
         return response.json()['value']
 
+    def get_thread_sampler(self, interval=1, max_samples=100000, file_name=None, policy=None):
+        """ Create a ThreadSampler, that records the threads of the TM1 Server in the background
+
+        :param interval: seconds between two samples
+        :param max_samples: number of thread records kept in memory
+        :param file_name: optional csv file, to which all records are appended
+        :param policy: optional function(record) -> Boolean. Threads for which it returns True are cancelled.
+        Failed cancellations are recorded in errors, like failed samples
+        :return: instance of ThreadSampler
+        """
+        return ThreadSampler(self, interval=interval, max_samples=max_samples, file_name=file_name, policy=policy)
+
     def cancel_thread(self, thread_id):
         """ Kill a running thread
         
@@ -60,3 +97,163 @@ class MonitoringService(ObjectService):
         request = "/api/v1/Users('{}')/tm1.Disconnect".format(user_name)
         response = self._rest.POST(request)
         return response
+
+
+class ThreadSampler:
+    """ Poll the Threads of the TM1 Server at a fixed interval in a background thread (tm1top-style)
+    and keep a time series of State, Wait Time, Locks and Elapsed Time per thread.
+
+    Usage:
+    >>> with tm1.monitoring.get_thread_sampler(interval=1, policy=ThreadSampler.elapsed_time_policy(600)) as sampler:
+    >>>     time.sleep(300)
+    >>> sampler.longest_running()
+    """
+
+    FIELDS = ('ID', 'Name', 'Context', 'State', 'Function', 'ObjectType', 'ObjectName', 'RLocks', 'IXLocks',
+              'WLocks', 'ElapsedTime', 'WaitTime')
+    COLUMNS = ('Timestamp',) + FIELDS
+
+    def __init__(self, monitoring_service, interval=1, max_samples=100000, file_name=None, policy=None):
+        """
+
+        :param monitoring_service: instance of TM1py.MonitoringService
+        :param interval: seconds between two samples
+        :param max_samples: number of thread records kept in memory (ring buffer)
+        :param file_name: optional csv file, to which all records are appended
+        :param policy: optional function(record) -> Boolean. Threads for which it returns True are cancelled.
+        Failed cancellations are recorded in errors, like failed samples
+        """
+        self._monitoring_service = monitoring_service
+        self.interval = interval
+        self.policy = policy
+        self.file_name = file_name
+        self._records = collections.deque(maxlen=max_samples)
+        self._request = "/api/v1/Threads?$select={}".format(",".join(self.FIELDS))
+        self._stop_event = threading.Event()
+        self._thread = None
+        self.cancelled = []
+        self.errors = []
+
+    @staticmethod
+    def elapsed_time_policy(max_seconds, functions=None):
+        """ Policy that cancels threads running longer than `max_seconds`
+
+        :param max_seconds: Number
+        :param functions: optional iterable of function prefixes to restrict the policy to,
+        e.g. ['POST /api/v1/ExecuteMDX']
+        :return: function(record) -> Boolean
+        """
+        def policy(record):
+            if functions and not any(record['Function'].startswith(function) for function in functions):
+                return False
+            return record['ElapsedTime'] > max_seconds
+
+        return policy
+
+    def sample(self):
+        """ Take one sample of all threads (except the sampling request itself)
+
+        :return: list of records as tuples, ordered like COLUMNS
+        """
+        response = self._monitoring_service._rest.GET(self._request)
+        timestamp = datetime.datetime.now(datetime.timezone.utc)
+        records = []
+        for thread in response.json()['value']:
+            if thread['Function'].startswith('GET /api/v1/Threads'):
+                continue
+            records.append((
+                timestamp, thread['ID'], thread['Name'], thread['Context'], thread['State'], thread['Function'],
+                thread['ObjectType'], thread['ObjectName'], thread['RLocks'], thread['IXLocks'], thread['WLocks'],
+                duration_in_seconds(thread['ElapsedTime']), duration_in_seconds(thread['WaitTime'])))
+        self._records.extend(records)
+        if self.file_name:
+            self._write_records(records)
+        if self.policy:
+            self._apply_policy(records)
+        return records
+
+    def _write_records(self, records):
+        with open(self.file_name, 'a', newline='') as file:
+            writer = csv.writer(file)
+            if file.tell() == 0:
+                writer.writerow(self.COLUMNS)
+            writer.writerows(records)
+
+    def _apply_policy(self, records):
+        for record in records:
+            record_as_dict = dict(zip(self.COLUMNS, record))
+            if self.policy(record_as_dict):
+                try:
+                    self._monitoring_service.cancel_thread(record_as_dict['ID'])
+                except Exception as e:
+                    # e.g. the thread ended in the meantime. Check the other threads anyway
+                    self.errors.append((datetime.datetime.now(datetime.timezone.utc), e))
+                    continue
+                self.cancelled.append(record_as_dict)
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            started = datetime.datetime.now()
+            try:
+                self.sample()
+            except Exception as e:
+                # keep sampling. A stalled server is exactly when the history matters
+                self.errors.append((datetime.datetime.now(datetime.timezone.utc), e))
+            elapsed = (datetime.datetime.now() - started).total_seconds()
+            self._stop_event.wait(max(0.0, self.interval - elapsed))
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="TM1py-ThreadSampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exception_type, exception_value, traceback):
+        self.stop()
+
+    def __len__(self):
+        return len(self._records)
+
+    def to_dataframe(self):
+        """ All records in the buffer. ElapsedTime and WaitTime in seconds
+
+        :return: pandas.DataFrame
+        """
+        return pd.DataFrame(list(self._records), columns=self.COLUMNS)
+
+    def lock_wait_heatmap(self, frequency='10s', by='ObjectName'):
+        """ Estimated seconds threads spent in State 'Wait', per time bucket and object (or user, function, ..)
+
+        :param frequency: pandas offset alias for the time buckets, e.g. '10s', '1min'
+        :param by: column to break the wait time down by, e.g. 'ObjectName', 'Name', 'Function'
+        :return: pandas.DataFrame, index: time bucket, columns: values of `by`
+        """
+        records = self.to_dataframe()
+        waiting = records[records['State'] == 'Wait']
+        heatmap = waiting.groupby([pd.Grouper(key='Timestamp', freq=frequency), by]).size().unstack(fill_value=0)
+        return heatmap * self.interval
+
+    def longest_running(self, top=10):
+        """ Operations with the highest elapsed time observed
+
+        :param top: number of operations
+        :return: pandas.DataFrame
+        """
+        records = self.to_dataframe()
+        operations = records.groupby(['ID', 'Name', 'Function'], as_index=False).agg(
+            Start=('Timestamp', 'min'),
+            ObjectName=('ObjectName', 'last'),
+            ElapsedTime=('ElapsedTime', 'max'),
+            WaitTime=('WaitTime', 'max'))
+        return operations.nlargest(top, 'ElapsedTime').reset_index(drop=True)
@@ -46,3 +46,13 @@ class ObjectService:
     @property
     def version(self):
         return self._rest._version
+
+    @property
+    def _metadata_cache(self):
+        """ Metadata cache shared by all services of the connection
+
+        :return: instance of MetadataCacheService
+        """
+        # to avoid Circular dependency of modules
+        from TM1py.Services.MetadataCacheService import MetadataCacheService
+        return MetadataCacheService.of(self._rest)
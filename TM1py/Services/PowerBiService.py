@@ -1,9 +1,10 @@
-from collections import Iterable
+from collections.abc import Iterable
 
 import pandas as pd
 
 from TM1py.Services import CellService
 from TM1py.Services import ElementService
+from TM1py.Utils.Utils import build_power_bi_dataframe_from_cellset
 
 
 class PowerBiService:
@@ -16,18 +17,32 @@ class PowerBiService:
         self.cells = CellService(tm1_rest)
         self.elements = ElementService(tm1_rest)
 
-    def execute_mdx(self, mdx, **kwargs):
+    def execute_mdx(self, mdx, typed=False, **kwargs):
+        """
+
+        :param mdx: MDX Query, as string
+        :param typed: True: categorical row headers and numeric value columns. False: all columns are strings
+        :return: pandas DataFrame
+        """
         cellset_id = self.cells.create_cellset(mdx)
-        return self.cells.extract_cellset_power_bi(cellset_id, **kwargs)
+        return self.cells.extract_cellset_power_bi(cellset_id, typed=typed, **kwargs)
+
+    def execute_view(self, cube_name, view_name, private, typed=False, **kwargs):
+        """
 
-    def execute_view(self, cube_name, view_name, private, **kwargs):
+        :param cube_name: String, name of the cube
+        :param view_name: String, name of the view
+        :param private: True (private) or False (public)
+        :param typed: True: categorical row headers and numeric value columns. False: all columns are strings
+        :return: pandas DataFrame
+        """
         cellset_id = self.cells.create_cellset_from_view(cube_name, view_name, private)
-        return self.cells.extract_cellset_power_bi(cellset_id, **kwargs)
+        return self.cells.extract_cellset_power_bi(cellset_id, typed=typed, **kwargs)
 
     def get_member_properties(self, dimension_name, hierarchy_name, member_selection=None,
                               skip_consolidations=True, attributes=None, skip_parents=False,
-                              level_names=None):
-        """
+                              level_names=None, typed=False):
+        """ Element names, types, attributes and parents of members in one cellset on the attribute cube
 
         :param dimension_name: Name of the dimension
         :param hierarchy_name: Name of the hierarchy in the dimension
@@ -36,6 +51,8 @@ class PowerBiService:
         :param attributes: Selection of attributes. Iterable. If None retrieve all.
         :param level_names: List of labels for parent columns. If None use level names from TM1.
         :param skip_parents: Boolean Flag to skip parent columns.
+        :param typed: True: categorical name and type columns, numeric attributes as numbers.
+        False: all columns are strings
         :return: pandas DataFrame
         """
         if not member_selection:
@@ -52,35 +69,17 @@ class PowerBiService:
         if not self.elements.attribute_cube_exists(dimension_name):
             raise RuntimeError(self.elements.ELEMENT_ATTRIBUTES_PREFIX + dimension_name + " cube must exist")
 
-        members = [tupl[0] for tupl in self.elements.execute_set_mdx(
-            mdx=member_selection,
-            element_properties=None,
-            member_properties=("Name", "UniqueName"),
-            parent_properties=None)]
-
-        element_types = self.elements.get_element_types(
-            dimension_name=dimension_name,
-            hierarchy_name=hierarchy_name,
-            skip_consolidations=skip_consolidations)
-
-        df = pd.DataFrame(
-            data=[(member["Name"], element_types[member["Name"]])
-                  for member
-                  in members
-                  if member["Name"] in element_types],
-            dtype=str,
-            columns=[dimension_name, 'Type'])
-
         calculated_members_definition = list()
         calculated_members_selection = list()
         if not skip_parents:
-            levels = self.elements.get_levels_count(dimension_name, hierarchy_name)
+            # one request for the number of levels and their names
+            tm1_level_names = self.elements.get_level_names(dimension_name, hierarchy_name)
 
             # potential custom parent names
             if not level_names:
-                level_names = self.elements.get_level_names(dimension_name, hierarchy_name)
+                level_names = tm1_level_names
 
-            for parent in range(1, levels, 1):
+            for parent in range(1, len(tm1_level_names), 1):
                 calculated_members_definition.append(
                     f"""
                     MEMBER [{self.elements.ELEMENT_ATTRIBUTES_PREFIX + dimension_name}].[{level_names[parent]}] 
@@ -100,15 +99,12 @@ class PowerBiService:
 
         if calculated_members_selection:
             column_selection = column_selection + " + {" + ",".join(calculated_members_selection) + "}"
-        member_selection = ",".join(
-            member["UniqueName"]
-            for member
-            in members)
 
         mdx_with_block = ""
         if calculated_members_definition:
             mdx_with_block = "WITH " + " ".join(calculated_members_definition)
 
+        # members are selected on rows directly: names and element types come back with the tuples of the cellset
         mdx = f"""
         {mdx_with_block}
         SELECT
@@ -117,6 +113,21 @@ class PowerBiService:
         FROM [{self.elements.ELEMENT_ATTRIBUTES_PREFIX + dimension_name}]  
         """
 
-        df_data = self.execute_mdx(mdx, element_unique_names=False)
-
-        return pd.merge(df, df_data, on=dimension_name)
+        raw_cellset = self.cells.execute_mdx_raw(
+            mdx=mdx,
+            cell_properties=["Value"],
+            elem_properties=["Type"],
+            member_properties=["Name"],
+            skip_contexts=True)
+        return self._build_member_properties_dataframe(raw_cellset, dimension_name, skip_consolidations, typed)
+
+    @staticmethod
+    def _build_member_properties_dataframe(raw_cellset, dimension_name, skip_consolidations, typed):
+        df = build_power_bi_dataframe_from_cellset(raw_cellset, row_headers=[dimension_name], typed=typed)
+        axes = raw_cellset["Axes"]
+        row_tuples = axes[1]["Tuples"] if len(axes) > 1 else []
+        element_types = [tupl["Members"][0]["Element"]["Type"] for tupl in row_tuples]
+        df.insert(1, "Type", pd.Series(element_types, dtype="category" if typed else str))
+        if skip_consolidations:
+            df = df[df["Type"] != "Consolidated"].reset_index(drop=True)
+        return df
@@ -39,7 +39,7 @@ def httpmethod(func):
             odata_escape_single_quotes_in_object_names=odata_escape_single_quotes_in_object_names,
             encoding=encoding)
         # Do Request
-        response = func(self, request, data)
+        response = func(self, request, data, **kwargs)
         # Verify
         self.verify_response(response=response)
         # response encoding
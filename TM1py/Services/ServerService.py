@@ -1,11 +1,18 @@
 # -*- coding: utf-8 -*-
 
+import datetime
 import functools
 import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 
+import numpy as np
+import pandas as pd
 import pytz
 
 from TM1py.Services.ObjectService import ObjectService
+from TM1py.Utils.Utils import require_parquet_engine, read_checkpoint, write_checkpoint
 
 
 def odata_track_changes_header(func):
@@ -45,14 +52,35 @@ class ServerService(ObjectService):
             request += "?$filter={}".format(filter)
         response = self._rest.GET(request=request)
         # Read the next delta-request-url from the response
-        self.tlog_last_delta_request = response.text[response.text.rfind("TransactionLogEntries/!delta('"):-2]
+        self.tlog_last_delta_request = self._extract_delta_request(response, "TransactionLogEntries")
 
     @odata_track_changes_header
     def execute_transaction_log_delta_request(self):
         response = self._rest.GET(request="/api/v1/" + self.tlog_last_delta_request)
-        self.tlog_last_delta_request = response.text[response.text.rfind("TransactionLogEntries/!delta('"):-2]
+        self.tlog_last_delta_request = self._extract_delta_request(response, "TransactionLogEntries")
         return response.json()['value']
 
+    def tail_transaction_log(self, filter=None, checkpoint_file=None, poll_interval=1, max_poll_interval=60,
+                             backoff_factor=2, idle_timeout=None, parquet_directory=None, parquet_batch_size=10000):
+        """ Follow the transaction log. Generator that yields new transaction log entries as they are written
+
+        :param filter: OData filter on the TransactionLogEntries, e.g. "Cube eq 'Sales'"
+        :param checkpoint_file: file to store the delta request in. When it exists, tailing resumes from there.
+        :param poll_interval: seconds to wait after a poll that returned entries. Must be positive without idle_timeout
+        :param max_poll_interval: upper bound for the wait when the log is idle
+        :param backoff_factor: factor by which the wait grows with every idle poll
+        :param idle_timeout: stop after that many seconds without new entries. Default: follow forever
+        :param parquet_directory: if given, entries are also written to Parquet files in this directory.
+        Requires pyarrow or fastparquet (pip install TM1py[parquet])
+        :param parquet_batch_size: max number of entries per Parquet file
+        :return: generator of dicts
+        """
+        self._check_poll_interval(poll_interval, idle_timeout)
+        if parquet_directory:
+            require_parquet_engine()
+        return self._tail_log("TransactionLogEntries", filter, checkpoint_file, poll_interval, max_poll_interval,
+                              backoff_factor, idle_timeout, parquet_directory, parquet_batch_size)
+
     @odata_track_changes_header
     def initialize_message_log_delta_requests(self, filter=None):
         request = "/api/v1/MessageLogEntries"
@@ -60,14 +88,112 @@ class ServerService(ObjectService):
             request += "?$filter={}".format(filter)
         response = self._rest.GET(request=request)
         # Read the next delta-request-url from the response
-        self.mlog_last_delta_request = response.text[response.text.rfind("MessageLogEntries/!delta('"):-2]
+        self.mlog_last_delta_request = self._extract_delta_request(response, "MessageLogEntries")
 
     @odata_track_changes_header
     def execute_message_log_delta_request(self):
         response = self._rest.GET(request="/api/v1/" + self.mlog_last_delta_request)
-        self.mlog_last_delta_request = response.text[response.text.rfind("MessageLogEntries/!delta('"):-2]
+        self.mlog_last_delta_request = self._extract_delta_request(response, "MessageLogEntries")
         return response.json()['value']
 
+    def tail_message_log(self, filter=None, checkpoint_file=None, poll_interval=1, max_poll_interval=60,
+                         backoff_factor=2, idle_timeout=None, parquet_directory=None, parquet_batch_size=10000):
+        """ Follow the message log. Generator that yields new message log entries as they are written
+
+        :param filter: OData filter on the MessageLogEntries, e.g. "Logger eq 'TM1.Process'"
+        :param checkpoint_file: file to store the delta request in. When it exists, tailing resumes from there.
+        :param poll_interval: seconds to wait after a poll that returned entries. Must be positive without idle_timeout
+        :param max_poll_interval: upper bound for the wait when the log is idle
+        :param backoff_factor: factor by which the wait grows with every idle poll
+        :param idle_timeout: stop after that many seconds without new entries. Default: follow forever
+        :param parquet_directory: if given, entries are also written to Parquet files in this directory.
+        Requires pyarrow or fastparquet (pip install TM1py[parquet])
+        :param parquet_batch_size: max number of entries per Parquet file
+        :return: generator of dicts
+        """
+        self._check_poll_interval(poll_interval, idle_timeout)
+        if parquet_directory:
+            require_parquet_engine()
+        return self._tail_log("MessageLogEntries", filter, checkpoint_file, poll_interval, max_poll_interval,
+                              backoff_factor, idle_timeout, parquet_directory, parquet_batch_size)
+
+    @staticmethod
+    def _check_poll_interval(poll_interval, idle_timeout):
+        # without a wait and without a timeout an idle log would be polled in a busy loop forever
+        if poll_interval is None or poll_interval < 0:
+            raise ValueError("poll_interval must not be negative")
+        if not poll_interval and idle_timeout is None:
+            raise ValueError("poll_interval must be positive when no idle_timeout is given")
+
+    def _tail_log(self, entity, filter, checkpoint_file, poll_interval, max_poll_interval, backoff_factor,
+                  idle_timeout, parquet_directory, parquet_batch_size):
+        """ Follow a log through delta requests.
+
+        Entries are yielded once a poll returned, so memory is bounded by the size of a poll (plus one Parquet batch).
+        The checkpoint is written after all entries of a poll were yielded (and written to Parquet).
+        Entries that were yielded but not yet checkpointed are delivered again after a restart.
+        """
+        headers = {"Prefer": "odata.track-changes"}
+        delta_request = read_checkpoint(checkpoint_file)
+        if not delta_request:
+            # initial request only establishes the starting point. Existing entries are skipped
+            request = "/api/v1/{}".format(entity)
+            if filter:
+                request += "?$filter={}".format(filter)
+            response = self._rest.GET(request=request, headers=headers)
+            delta_request = self._extract_delta_request(response, entity)
+            write_checkpoint(checkpoint_file, delta_request)
+
+        batch = []
+        interval = poll_interval
+        last_activity = time.time()
+        try:
+            while True:
+                response = self._rest.GET(request="/api/v1/" + delta_request, headers=headers)
+                entries = response.json()['value']
+                delta_request = self._extract_delta_request(response, entity)
+                for entry in entries:
+                    yield entry
+
+                if parquet_directory:
+                    batch.extend(entries)
+                    if len(batch) >= parquet_batch_size or (batch and not entries):
+                        self._write_parquet(parquet_directory, entity, batch)
+                        batch = []
+                if not batch:
+                    write_checkpoint(checkpoint_file, delta_request)
+
+                if entries:
+                    interval = poll_interval
+                    last_activity = time.time()
+                else:
+                    if idle_timeout is not None and time.time() - last_activity >= idle_timeout:
+                        return
+                    interval = min(interval * backoff_factor, max_poll_interval)
+                time.sleep(interval)
+        finally:
+            if batch:
+                self._write_parquet(parquet_directory, entity, batch)
+
+    @staticmethod
+    def _extract_delta_request(response, entity):
+        """ Read the next delta request (e.g. "TransactionLogEntries/!delta('...')") from the @odata.deltaLink
+
+        :param response: response of a request with odata.track-changes header
+        :param entity: TransactionLogEntries or MessageLogEntries
+        :return: String
+        """
+        delta_link = response.json().get('@odata.deltaLink')
+        if delta_link is None:
+            return response.text[response.text.rfind(entity + "/!delta('"):-2]
+        return delta_link[delta_link.rfind(entity + "/!delta('"):]
+
+    @staticmethod
+    def _write_parquet(directory, entity, entries):
+        file_name = "{}_{}.parquet".format(entity, datetime.datetime.now(datetime.timezone.utc).strftime(
+            "%Y%m%d%H%M%S%f"))
+        pd.DataFrame(entries).to_parquet(os.path.join(directory, file_name), index=False)
+
     def get_message_log_entries(self, reverse=True, top=None):
         reverse = 'true' if reverse else 'false'
         request = '/api/v1/MessageLog(Reverse={})'.format(reverse)
@@ -96,12 +222,7 @@ class ServerService(ObjectService):
             if cube:
                 log_filters.append("Cube eq '{}'".format(cube))
             if since:
-                # If since doesn't have tz information, UTC is assumed
-                if not since.tzinfo:
-                    since = pytz.utc.localize(since)
-                # TM1 REST API expects %Y-%m-%dT%H:%M:%SZ Format with UTC time !
-                since_utc = since.astimezone(pytz.utc)
-                log_filters.append("TimeStamp ge {}".format(since_utc.strftime("%Y-%m-%dT%H:%M:%SZ")))
+                log_filters.append("TimeStamp ge {}".format(self._format_timestamp(since)))
             request += "&$filter={}".format(" and ".join(log_filters))
         # top limit
         if top:
@@ -109,6 +230,121 @@ class ServerService(ObjectService):
         response = self._rest.GET(request, '')
         return response.json()['value']
 
+    @staticmethod
+    def _to_utc(timestamp):
+        """ If timestamp doesn't have tz information, UTC is assumed
+        """
+        if not timestamp.tzinfo:
+            timestamp = pytz.utc.localize(timestamp)
+        return timestamp.astimezone(pytz.utc)
+
+    @classmethod
+    def _format_timestamp(cls, timestamp):
+        """ TM1 REST API expects %Y-%m-%dT%H:%M:%SZ Format with UTC time !
+        """
+        return cls._to_utc(timestamp).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+    def export_transaction_log(self, directory, since, until=None, window=datetime.timedelta(hours=1), user=None,
+                               cube=None, page_size=50000, max_workers=4):
+        """ Export the transaction log history to Parquet files, partitioned by cube:
+        <directory>/Cube=<cube name>/<window start>_<page>.parquet
+
+        The period is split into time windows that are read in parallel. Each window is paged through with
+        $top / $skip and every page is written right away, so memory stays bounded by max_workers * page_size,
+        regardless of the size of the history.
+
+        Columns: TimeStamp (UTC), User, Tuple (list of element names), OldValue, NewValue (numeric values),
+        OldStringValue, NewStringValue (string values), ChangeSetID, StatusMessage
+
+        Requires pyarrow or fastparquet (pip install TM1py[parquet])
+
+        :param directory: target directory. Can be read with pandas.read_parquet(directory)
+        :param since: datetime. If it doesn't have tz information, UTC is assumed.
+        :param until: datetime. Default: now
+        :param window: datetime.timedelta, length of a time window
+        :param user: optional user name filter
+        :param cube: optional cube name filter
+        :param page_size: max number of entries per request (and Parquet file)
+        :param max_workers: number of windows that are read concurrently
+        :return: dict with number of entries, windows and list of written files
+        """
+        require_parquet_engine()
+        until = self._to_utc(until) if until else datetime.datetime.now(tz=pytz.utc)
+        windows = []
+        window_start = self._to_utc(since)
+        while window_start < until:
+            windows.append((window_start, min(window_start + window, until)))
+            window_start += window
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(self._export_transaction_log_window, directory, window_start, window_end,
+                                       user, cube, page_size)
+                       for window_start, window_end
+                       in windows]
+            files = [file for future in futures for file in future.result()]
+
+        return {
+            'entries': sum(entries for _, entries in files),
+            'windows': len(windows),
+            'files': [file_name for file_name, _ in files]}
+
+    def _export_transaction_log_window(self, directory, window_start, window_end, user, cube, page_size):
+        log_filters = ["TimeStamp ge {}".format(self._format_timestamp(window_start)),
+                       "TimeStamp lt {}".format(self._format_timestamp(window_end))]
+        if user:
+            log_filters.append("User eq '{}'".format(user))
+        if cube:
+            log_filters.append("Cube eq '{}'".format(cube))
+        request = "/api/v1/TransactionLogEntries?$select=ChangeSetID,TimeStamp,User,Cube,Tuple,OldValue,NewValue," \
+                  "StatusMessage&$orderby=TimeStamp asc,ID asc&$filter={}&$top={}".format(
+                    " and ".join(log_filters), page_size)
+
+        files = []
+        page = 0
+        while True:
+            response = self._rest.GET(request + "&$skip={}".format(page * page_size))
+            entries = response.json()['value']
+            if not entries:
+                break
+            prefix = "{}_{:05d}".format(window_start.strftime("%Y%m%dT%H%M%S"), page)
+            files.extend(self._write_transaction_log_partitions(directory, prefix, entries))
+            if len(entries) < page_size:
+                break
+            page += 1
+        return files
+
+    @staticmethod
+    def _write_transaction_log_partitions(directory, prefix, entries):
+        """ Write entries to one Parquet file per cube
+
+        :return: list of (file name, number of entries)
+        """
+        old_values = np.array([entry['OldValue'] for entry in entries], dtype=object)
+        new_values = np.array([entry['NewValue'] for entry in entries], dtype=object)
+        old_is_string = np.array([isinstance(value, str) for value in old_values], dtype=bool)
+        new_is_string = np.array([isinstance(value, str) for value in new_values], dtype=bool)
+        df = pd.DataFrame({
+            'TimeStamp': pd.to_datetime([entry['TimeStamp'] for entry in entries], utc=True),
+            'User': pd.Categorical([entry['User'] for entry in entries]),
+            'Cube': [entry['Cube'] for entry in entries],
+            'Tuple': [entry['Tuple'] for entry in entries],
+            'OldValue': np.where(old_is_string, np.nan, old_values).astype(float),
+            'NewValue': np.where(new_is_string, np.nan, new_values).astype(float),
+            'OldStringValue': np.where(old_is_string, old_values, None),
+            'NewStringValue': np.where(new_is_string, new_values, None),
+            'ChangeSetID': [entry['ChangeSetID'] for entry in entries],
+            'StatusMessage': [entry['StatusMessage'] for entry in entries]})
+
+        files = []
+        for cube_name, cube_df in df.groupby('Cube', sort=False):
+            partition = os.path.join(directory, "Cube={}".format(cube_name))
+            os.makedirs(partition, exist_ok=True)
+            file_name = os.path.join(partition, prefix + ".parquet")
+            # cube is encoded in the partition path
+            cube_df.drop(columns='Cube').to_parquet(file_name, index=False)
+            files.append((file_name, len(cube_df)))
+        return files
+
     def get_last_process_message_from_messagelog(self, process_name):
         """ Get the latest messagelog entry for a process
 
@@ -9,12 +9,22 @@ class TM1Service:
     Can be saved and restored from File, to avoid multiple authentication with TM1.
     """
     def __init__(self, **kwargs):
+        """
+
+        :param kwargs: see RESTService.
+        Additionally metadata_cache_ttl: seconds after which cached metadata (e.g. dimensions of cubes) is reloaded.
+        0 disables the cache. Default: 300
+        """
         self._tm1_rest = RESTService(**kwargs)
 
+        # metadata cache, shared by all services
+        self.metadata = MetadataCacheService(self._tm1_rest, ttl=float(kwargs.get('metadata_cache_ttl', 300)))
+
         # instantiate all Services
         self.chores = ChoreService(self._tm1_rest)
         self.cubes = CubeService(self._tm1_rest)
         self.dimensions = DimensionService(self._tm1_rest)
+        self.model_snapshots = ModelSnapshotService(self._tm1_rest)
         self.monitoring = MonitoringService(self._tm1_rest)
         self.power_bi = PowerBiService(self._tm1_rest)
         self.processes = ProcessService(self._tm1_rest)
@@ -7,6 +7,8 @@ from TM1py.Services.CubeService import CubeService
 from TM1py.Services.DimensionService import DimensionService
 from TM1py.Services.ElementService import ElementService
 from TM1py.Services.HierarchyService import HierarchyService
+from TM1py.Services.MetadataCacheService import MetadataCacheService
+from TM1py.Services.ModelSnapshotService import ModelSnapshotService
 from TM1py.Services.MonitoringService import MonitoringService
 from TM1py.Services.PowerBiService import PowerBiService
 from TM1py.Services.ProcessService import ProcessService
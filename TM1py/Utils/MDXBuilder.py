@@ -0,0 +1,319 @@
+# -*- coding: utf-8 -*-
+
+import abc
+import copy
+import hashlib
+import re
+
+from TM1py.Utils.MDXUtils import curly_braces
+from TM1py.Utils.Utils import lower_and_drop_spaces
+
+# bracketed identifiers and quoted strings are kept apart when an expression is normalized
+REGEX_MDX_LITERALS = re.compile(r"(\[(?:[^\]]|\]\])*\]|\"(?:[^\"]|\"\")*\"|'(?:[^']|'')*')")
+
+
+def quote_identifier(name):
+    """ Put square brackets around an MDX identifier
+
+    :param name: e.g. dimension, hierarchy or element name
+    :return: String, e.g. [Region]
+    """
+    return "[" + name.replace("]", "]]") + "]"
+
+
+def build_member_unique_name(dimension_name, element_name, hierarchy_name=None):
+    """ Build the unique name of a member: [dimension].[element] or [dimension].[hierarchy].[element]
+
+    :return: String
+    """
+    if hierarchy_name:
+        return ".".join((quote_identifier(dimension_name), quote_identifier(hierarchy_name),
+                         quote_identifier(element_name)))
+    return quote_identifier(dimension_name) + "." + quote_identifier(element_name)
+
+
+def canonicalize_mdx(mdx):
+    """ Normalize MDX for comparison: identifiers and strings are case and space insensitive in TM1,
+    keywords and function names are case insensitive and whitespace outside of them is irrelevant
+
+    :param mdx: MDX expression or query
+    :return: String
+    """
+    parts = REGEX_MDX_LITERALS.split(mdx)
+    return "".join(
+        lower_and_drop_spaces(part) if position % 2 else "".join(part.split()).upper()
+        for position, part
+        in enumerate(parts))
+
+
+class MDXSet(abc.ABC):
+    """ Base class for the set of one hierarchy on an axis of an MDXQuery
+    """
+
+    def __init__(self, dimension_name, hierarchy_name=None):
+        self.dimension_name = dimension_name
+        self.hierarchy_name = hierarchy_name
+
+    @abc.abstractmethod
+    def to_mdx(self):
+        pass
+
+    def canonical(self):
+        return canonicalize_mdx(self.to_mdx())
+
+    @property
+    def splittable(self):
+        return False
+
+
+class MemberSet(MDXSet):
+    """ Explicit list of members: {[dim].[e1],[dim].[e2]}
+    """
+
+    def __init__(self, dimension_name, elements, hierarchy_name=None):
+        super().__init__(dimension_name, hierarchy_name)
+        self.elements = list(elements)
+
+    def to_mdx(self):
+        return "{" + ",".join(build_member_unique_name(self.dimension_name, element, self.hierarchy_name)
+                              for element
+                              in self.elements) + "}"
+
+    @property
+    def splittable(self):
+        return len(self.elements) > 1
+
+    def split(self, max_elements):
+        """ Split into sets of at most max_elements members. The order of the members is kept
+
+        :param max_elements: int
+        :return: list of MemberSet
+        """
+        return [MemberSet(self.dimension_name, self.elements[start:start + max_elements], self.hierarchy_name)
+                for start
+                in range(0, len(self.elements), max_elements)]
+
+
+class ExpressionSet(MDXSet):
+    """ Any MDX set expression on one hierarchy, e.g. TM1FilterByLevel(TM1SubsetAll([dim]), 0)
+    """
+
+    def __init__(self, dimension_name, expression, hierarchy_name=None):
+        super().__init__(dimension_name, hierarchy_name)
+        self.expression = expression
+
+    def to_mdx(self):
+        return curly_braces(self.expression)
+
+    @classmethod
+    def from_dimension_selection(cls, dimension_selection):
+        """ Alternative constructor
+
+        :param dimension_selection: instance of TM1py.Utils.MDXUtils.DimensionSelection
+        :return: instance of ExpressionSet
+        """
+        return cls(dimension_selection.dimension_name, dimension_selection.expression)
+
+    @classmethod
+    def all_members(cls, dimension_name, hierarchy_name=None):
+        hierarchy = quote_identifier(dimension_name)
+        if hierarchy_name:
+            hierarchy += "." + quote_identifier(hierarchy_name)
+        return cls(dimension_name, "TM1SubsetAll({})".format(hierarchy), hierarchy_name)
+
+    @classmethod
+    def from_subset(cls, dimension_name, subset_name, hierarchy_name=None):
+        hierarchy = quote_identifier(dimension_name)
+        if hierarchy_name:
+            hierarchy += "." + quote_identifier(hierarchy_name)
+        return cls(dimension_name, "TM1SubsetToSet({},\"{}\")".format(hierarchy, subset_name.replace('"', '""')),
+                   hierarchy_name)
+
+
+class CalculatedMember:
+    """ Calculated member, defined in the WITH clause of an MDXQuery
+    """
+
+    def __init__(self, dimension_name, name, expression, hierarchy_name=None):
+        self.dimension_name = dimension_name
+        self.hierarchy_name = hierarchy_name
+        self.name = name
+        self.expression = expression
+
+    @property
+    def unique_name(self):
+        return build_member_unique_name(self.dimension_name, self.name, self.hierarchy_name)
+
+    def to_mdx(self):
+        return "MEMBER {} AS {}".format(self.unique_name, self.expression)
+
+
+class MDXQuery:
+    """ Structured representation of an MDX query (WITH MEMBER, SELECT rows and columns, NON EMPTY, WHERE).
+
+    Renders MDX, produces a canonical fingerprint (equal for queries that only differ in case, spaces or the
+    order of the WHERE members) and splits queries into partitions for parallel execution.
+
+    >>> query = MDXQuery('Sales') \\
+    >>>     .add_rows(MemberSet('Region', ['North', 'South']), ExpressionSet.all_members('Product')) \\
+    >>>     .add_columns(MemberSet('Measure', ['Revenue'])) \\
+    >>>     .add_where('Year', '2020') \\
+    >>>     .set_non_empty(rows=True)
+    >>> query.to_mdx()
+    >>> query.fingerprint()
+    """
+
+    def __init__(self, cube_name):
+        self.cube_name = cube_name
+        self.rows = []
+        self.columns = []
+        self.where = []
+        self.calculated_members = []
+        self.non_empty_rows = False
+        self.non_empty_columns = False
+
+    def add_rows(self, *mdx_sets):
+        self.rows.extend(mdx_sets)
+        return self
+
+    def add_columns(self, *mdx_sets):
+        self.columns.extend(mdx_sets)
+        return self
+
+    def add_where(self, dimension_name, element_name, hierarchy_name=None):
+        self.where.append((dimension_name, hierarchy_name, element_name))
+        return self
+
+    def add_calculated_member(self, calculated_member):
+        self.calculated_members.append(calculated_member)
+        return self
+
+    def set_non_empty(self, rows=False, columns=False):
+        self.non_empty_rows = rows
+        self.non_empty_columns = columns
+        return self
+
+    @property
+    def dimension_names(self):
+        """ Dimension names per axis
+
+        :return: (row dimensions, column dimensions, title dimensions)
+        """
+        return ([mdx_set.dimension_name for mdx_set in self.rows],
+                [mdx_set.dimension_name for mdx_set in self.columns],
+                [dimension_name for dimension_name, _, _ in self.where])
+
+    @staticmethod
+    def _axis_to_mdx(mdx_sets, non_empty, axis_name):
+        return "{}{} ON {}".format(
+            "NON EMPTY " if non_empty else "",
+            " * ".join(mdx_set.to_mdx() for mdx_set in mdx_sets),
+            axis_name)
+
+    def to_mdx(self):
+        """ Render the query
+
+        :return: String, the MDX query
+        """
+        if not self.columns:
+            raise ValueError("MDX query on cube '{}' requires a set on columns".format(self.cube_name))
+        mdx = ""
+        if self.calculated_members:
+            mdx += "WITH " + " ".join(member.to_mdx() for member in self.calculated_members) + " "
+        axes = [self._axis_to_mdx(self.columns, self.non_empty_columns, "COLUMNS")]
+        if self.rows:
+            axes.append(self._axis_to_mdx(self.rows, self.non_empty_rows, "ROWS"))
+        mdx += "SELECT " + ", ".join(axes) + " FROM " + quote_identifier(self.cube_name)
+        if self.where:
+            mdx += " WHERE (" + ",".join(
+                build_member_unique_name(dimension_name, element_name, hierarchy_name)
+                for dimension_name, hierarchy_name, element_name
+                in self.where) + ")"
+        return mdx
+
+    def canonical(self):
+        """ Normalized form of the query. Case, spaces, the order of the WHERE members and
+        the order of the calculated members are irrelevant
+
+        :return: String
+        """
+        return "|".join((
+            "WITH:" + ";".join(sorted(canonicalize_mdx(member.to_mdx()) for member in self.calculated_members)),
+            "COLUMNS:" + ("NONEMPTY:" if self.non_empty_columns else "") + "*".join(
+                mdx_set.canonical() for mdx_set in self.columns),
+            "ROWS:" + ("NONEMPTY:" if self.non_empty_rows else "") + "*".join(
+                mdx_set.canonical() for mdx_set in self.rows),
+            "FROM:" + lower_and_drop_spaces(self.cube_name),
+            "WHERE:" + ",".join(sorted(
+                canonicalize_mdx(build_member_unique_name(dimension_name, element_name, hierarchy_name))
+                for dimension_name, hierarchy_name, element_name
+                in self.where))))
+
+    def fingerprint(self):
+        """ Hash of the canonical form. Equivalent queries have the same fingerprint.
+        Use as key to cache or deduplicate queries
+
+        :return: String, hex digest
+        """
+        return hashlib.sha256(self.canonical().encode("utf-8")).hexdigest()
+
+    def split_points(self):
+        """ Sets on rows or columns that can be partitioned (explicit member lists with more than one member)
+
+        :return: list of (axis, dimension name, number of members). Axis is 'ROWS' or 'COLUMNS'
+        """
+        return [(axis, mdx_set.dimension_name, len(mdx_set.elements))
+                for axis, mdx_sets in (("ROWS", self.rows), ("COLUMNS", self.columns))
+                for mdx_set in mdx_sets
+                if mdx_set.splittable]
+
+    def partition(self, dimension_name, max_elements):
+        """ Split the query into queries that each select at most max_elements members of one dimension.
+        Results of the partitions together are the result of the query.
+        When the dimension is the first on its axis, the partitions are in the order of the original axis
+
+        :param dimension_name: dimension of a MemberSet on rows or columns (see split_points)
+        :param max_elements: max number of members of the dimension per partition
+        :return: list of MDXQuery
+        """
+        for axis in ("rows", "columns"):
+            for position, mdx_set in enumerate(getattr(self, axis)):
+                if lower_and_drop_spaces(mdx_set.dimension_name) != lower_and_drop_spaces(dimension_name):
+                    continue
+                if not isinstance(mdx_set, MemberSet):
+                    raise ValueError("Set of dimension '{}' is not an explicit list of members".format(dimension_name))
+                partitions = []
+                for member_set in mdx_set.split(max_elements):
+                    query = copy.copy(self)
+                    query.rows, query.columns = list(self.rows), list(self.columns)
+                    query.where, query.calculated_members = list(self.where), list(self.calculated_members)
+                    getattr(query, axis)[position] = member_set
+                    partitions.append(query)
+                return partitions
+        raise ValueError("Dimension '{}' is not on rows or columns".format(dimension_name))
+
+    @classmethod
+    def from_native_view(cls, native_view):
+        """ Alternative constructor
+
+        :param native_view: instance of TM1py.NativeView
+        :return: instance of MDXQuery
+        """
+        query = cls(native_view.cube)
+        for axis_selections, add_sets in ((native_view.rows, query.add_rows),
+                                          (native_view.columns, query.add_columns)):
+            for axis_selection in axis_selections:
+                subset = axis_selection.subset
+                dimension_name = axis_selection.dimension_name
+                hierarchy_name = axis_selection.hierarchy_name
+                if lower_and_drop_spaces(hierarchy_name or dimension_name) == lower_and_drop_spaces(dimension_name):
+                    hierarchy_name = None
+                if subset.name:
+                    add_sets(ExpressionSet.from_subset(dimension_name, subset.name, hierarchy_name))
+                elif subset.expression is not None:
+                    add_sets(ExpressionSet(dimension_name, subset.expression, hierarchy_name))
+                else:
+                    add_sets(MemberSet(dimension_name, subset.elements, hierarchy_name))
+        for title_selection in native_view.titles:
+            query.add_where(title_selection.dimension_name, title_selection.selected)
+        return query.set_non_empty(rows=native_view.suppress_empty_rows, columns=native_view.suppress_empty_columns)
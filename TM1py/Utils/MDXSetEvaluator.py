@@ -0,0 +1,267 @@
+# -*- coding: utf-8 -*-
+
+import re
+
+from TM1py.Utils.Utils import lower_and_drop_spaces
+
+# bracketed identifiers ([a]]b] is 'a]b'), numbers, words and punctuation
+REGEX_SET_MDX_TOKENS = re.compile(r"\s*(?:(\[(?:[^\]]|\]\])*\])|(-?\d+(?:\.\d+)?)|(\w+)|([{}(),.*:]))")
+
+
+class UnsupportedMDXError(ValueError):
+    """ Raised when a set expression can not be evaluated locally and has to be executed on the server
+    """
+    pass
+
+
+class MDXSetEvaluator:
+    """ Evaluates a common subset of set MDX against a HierarchyIndex, without requests to the TM1 Server
+
+    Supported:
+        {member, set, ...}, [dim].[elem], [dim].[hier].[elem], member.Children
+        TM1SubsetAll(hierarchy), TM1FilterByLevel(set, level, ...), Descendants(member[, distance[, flag]]),
+        Union(set, set), Intersect(set, set), Except(set, set), Distinct(set), Head(set[, count]),
+        Tail(set[, count])
+
+    Anything else (as well as elements that are not in the index) raises UnsupportedMDXError.
+    Use ElementService.evaluate_set_mdx to fall back to the server in that case.
+    Results reflect the hierarchy as it was when the index was built. Elements added since raise
+    UnsupportedMDXError, but renames, moves and removals are not detected: refresh the index with
+    ElementService.refresh_hierarchy_index when the hierarchy may have changed.
+
+    >>> evaluator = MDXSetEvaluator(tm1.dimensions.hierarchies.elements.get_hierarchy_index('Region', 'Region'))
+    >>> evaluator.evaluate("{TM1FilterByLevel(Descendants([Region].[Europe]), 0)}")
+    """
+
+    DESCENDANTS_FLAGS = ('SELF', 'AFTER', 'BEFORE', 'SELF_AND_AFTER', 'SELF_AND_BEFORE', 'BEFORE_AND_AFTER',
+                         'SELF_BEFORE_AFTER', 'LEAVES')
+
+    def __init__(self, hierarchy_index):
+        """
+
+        :param hierarchy_index: instance of TM1py.HierarchyIndex
+        """
+        self._index = hierarchy_index
+        self._tokens = []
+        self._position = 0
+
+    def evaluate(self, mdx):
+        """ Evaluate a set expression
+
+        :param mdx: set MDX, e.g. "{TM1FilterByLevel(TM1SubsetAll([Region]), 0)}"
+        :return: list of element names
+        """
+        self._tokens = self._tokenize(mdx)
+        self._position = 0
+        element_names = self._parse_set()
+        if self._position != len(self._tokens):
+            raise UnsupportedMDXError("Unexpected token '{}' in: {}".format(self._peek(), mdx))
+        return element_names
+
+    @staticmethod
+    def _tokenize(mdx):
+        tokens = []
+        position = 0
+        mdx = mdx.strip()
+        while position < len(mdx):
+            match = REGEX_SET_MDX_TOKENS.match(mdx, position)
+            if not match:
+                raise UnsupportedMDXError("Can't tokenize MDX at position {}: {}".format(position, mdx))
+            tokens.append(next(group for group in match.groups() if group is not None))
+            position = match.end()
+        return tokens
+
+    def _peek(self, offset=0):
+        position = self._position + offset
+        return self._tokens[position] if position < len(self._tokens) else None
+
+    def _next(self):
+        token = self._peek()
+        if token is None:
+            raise UnsupportedMDXError("Unexpected end of MDX")
+        self._position += 1
+        return token
+
+    def _expect(self, expected):
+        token = self._next()
+        if token.upper() != expected:
+            raise UnsupportedMDXError("Expected '{}' but found '{}'".format(expected, token))
+
+    def _parse_set(self):
+        token = self._peek()
+        if token == '{':
+            self._next()
+            element_names = []
+            if self._peek() != '}':
+                element_names.extend(self._parse_set())
+                while self._peek() == ',':
+                    self._next()
+                    element_names.extend(self._parse_set())
+            self._expect('}')
+            return element_names
+        if token is not None and token.startswith('['):
+            return self._parse_member_set()
+        if token is not None and re.match(r'^[A-Za-z_]\w*$', token):
+            return self._parse_function()
+        raise UnsupportedMDXError("Unexpected token '{}'".format(token))
+
+    def _parse_path(self):
+        path = [self._unquote(self._next())]
+        while self._peek() == '.' and (self._peek(1) or '').startswith('['):
+            self._next()
+            path.append(self._unquote(self._next()))
+        return path
+
+    def _parse_member_set(self):
+        element_name = self._member_from_path(self._parse_path())
+        if self._peek() == '.':
+            self._next()
+            member_function = self._next().upper()
+            if member_function == 'CHILDREN':
+                return self._index.children(element_name)
+            raise UnsupportedMDXError("Member function '{}' is not supported".format(member_function))
+        return [element_name]
+
+    def _parse_member(self):
+        token = self._peek()
+        if token is None or not token.startswith('['):
+            raise UnsupportedMDXError("Expected member but found '{}'".format(token))
+        element_name = self._member_from_path(self._parse_path())
+        if self._peek() == '.':
+            raise UnsupportedMDXError("Member functions are not supported as member arguments")
+        return element_name
+
+    def _parse_number(self):
+        token = self._next()
+        try:
+            return int(token)
+        except ValueError:
+            raise UnsupportedMDXError("Expected integer but found '{}'".format(token))
+
+    def _parse_function(self):
+        function = self._next().upper()
+        self._expect('(')
+        if function == 'TM1SUBSETALL':
+            self._check_hierarchy(self._parse_path())
+            result = self._index.element_names
+        elif function == 'TM1FILTERBYLEVEL':
+            element_names = self._parse_set()
+            levels = set()
+            while self._peek() == ',':
+                self._next()
+                levels.add(self._parse_number())
+            result = [name for name in element_names if self._index.level(name) in levels]
+        elif function == 'DESCENDANTS':
+            result = self._parse_descendants()
+        elif function in ('UNION', 'INTERSECT', 'EXCEPT'):
+            first = self._parse_set()
+            self._expect(',')
+            second = self._parse_set()
+            if self._peek() == ',':
+                raise UnsupportedMDXError("{} with ALL flag is not supported".format(function))
+            result = self._combine(function, first, second)
+        elif function == 'DISTINCT':
+            result = self._distinct(self._parse_set())
+        elif function in ('HEAD', 'TAIL'):
+            element_names = self._parse_set()
+            count = 1
+            if self._peek() == ',':
+                self._next()
+                count = self._parse_number()
+            count = max(count, 0)
+            if function == 'HEAD':
+                result = element_names[:count]
+            else:
+                result = element_names[len(element_names) - count:] if count else []
+        else:
+            raise UnsupportedMDXError("Function '{}' is not supported".format(function))
+        self._expect(')')
+        return result
+
+    def _parse_descendants(self):
+        element_name = self._parse_member()
+        distance, flag = None, 'SELF_AND_AFTER'
+        if self._peek() == ',':
+            self._next()
+            distance = self._parse_number()
+            flag = 'SELF'
+            if self._peek() == ',':
+                self._next()
+                flag = self._next().upper()
+                if flag not in self.DESCENDANTS_FLAGS:
+                    raise UnsupportedMDXError("Descendants flag '{}' is not supported".format(flag))
+        if distance is None:
+            distance = 0
+
+        result = []
+        # depth first pre-order: the hierarchical order TM1 returns descendants in
+        stack = [(element_name, 0)]
+        while stack:
+            current, depth = stack.pop()
+            if self._include_descendant(current, depth, distance, flag):
+                result.append(current)
+            if flag in ('SELF', 'BEFORE', 'SELF_AND_BEFORE') and depth >= distance:
+                continue
+            if flag == 'LEAVES' and distance and depth >= distance:
+                continue
+            stack.extend((child, depth + 1) for child in reversed(self._index.children(current)))
+        return result
+
+    def _include_descendant(self, element_name, depth, distance, flag):
+        if flag == 'LEAVES':
+            return not self._index.children(element_name)
+        if flag == 'SELF':
+            return depth == distance
+        if flag == 'AFTER':
+            return depth > distance
+        if flag == 'BEFORE':
+            return depth < distance
+        if flag == 'SELF_AND_AFTER':
+            return depth >= distance
+        if flag == 'SELF_AND_BEFORE':
+            return depth <= distance
+        if flag == 'BEFORE_AND_AFTER':
+            return depth != distance
+        return True
+
+    @staticmethod
+    def _distinct(element_names):
+        seen = set()
+        result = []
+        for element_name in element_names:
+            adjusted_name = lower_and_drop_spaces(element_name)
+            if adjusted_name not in seen:
+                seen.add(adjusted_name)
+                result.append(element_name)
+        return result
+
+    def _combine(self, function, first, second):
+        second_names = {lower_and_drop_spaces(name) for name in second}
+        if function == 'UNION':
+            return self._distinct(first + second)
+        if function == 'INTERSECT':
+            return self._distinct([name for name in first if lower_and_drop_spaces(name) in second_names])
+        return self._distinct([name for name in first if lower_and_drop_spaces(name) not in second_names])
+
+    @staticmethod
+    def _unquote(token):
+        if not token.startswith('['):
+            raise UnsupportedMDXError("Expected [identifier] but found '{}'".format(token))
+        return token[1:-1].replace(']]', ']')
+
+    def _check_hierarchy(self, path):
+        dimension_name = path[0]
+        hierarchy_name = path[1] if len(path) > 1 else dimension_name
+        if len(path) > 2 \
+                or lower_and_drop_spaces(dimension_name) != lower_and_drop_spaces(self._index.dimension_name) \
+                or lower_and_drop_spaces(hierarchy_name) != lower_and_drop_spaces(self._index.hierarchy_name):
+            raise UnsupportedMDXError("Hierarchy '{}' is not the indexed hierarchy".format(".".join(path)))
+
+    def _member_from_path(self, path):
+        if len(path) not in (2, 3):
+            raise UnsupportedMDXError("Member must be [dimension].[element] or [dimension].[hierarchy].[element]")
+        self._check_hierarchy(path[:-1])
+        element_name = path[-1]
+        if not self._index.contains_element(element_name):
+            raise UnsupportedMDXError("Element '{}' is not in the index".format(element_name))
+        return self._index.element_name(self._index.element_id(element_name))
@@ -1,3 +1,65 @@
+import functools
+import re
+from collections import namedtuple
+
+MDX_IDENTIFIER = r"\[[^\]]*(?:\]\][^\]]*)*\]"
+MDX_PATH = r"{identifier}(?:\.{identifier})+".format(identifier=MDX_IDENTIFIER)
+MDX_TUPLE = r"\(\s*{path}(?:\s*,\s*{path})*\s*\)".format(path=MDX_PATH)
+REGEX_MDX_IDENTIFIER = re.compile(MDX_IDENTIFIER)
+REGEX_MDX_PATH = re.compile(MDX_PATH)
+REGEX_MDX_TUPLE = re.compile(MDX_TUPLE)
+MDX_STRING = r"(?:\"(?:[^\"]|\"\")*\"|'(?:[^']|'')*')"
+# set literals and subset functions, of which the size is known without executing the set
+REGEX_MDX_MEMBER_SET = re.compile(r"\{{\s*{path}(?:\s*,\s*{path})*\s*\}}".format(path=MDX_PATH))
+REGEX_MDX_TUPLE_SET = re.compile(r"\{{\s*{tuple}(?:\s*,\s*{tuple})*\s*\}}".format(tuple=MDX_TUPLE))
+REGEX_MDX_SUBSET_ALL = re.compile(
+    r"\{{?\s*TM1SUBSETALL\s*\(\s*(?P<hierarchy>{identifier}(?:\.{identifier})?)\s*\)\s*\}}?".format(
+        identifier=MDX_IDENTIFIER),
+    re.IGNORECASE)
+REGEX_MDX_SUBSET_TO_SET = re.compile(
+    r"\{{?\s*TM1SUBSETTOSET\s*\(\s*(?P<hierarchy>{identifier}(?:\.{identifier})?)\s*,\s*(?P<subset>{string})"
+    r"(?:\s*,\s*{string})?\s*\)\s*\}}?".format(identifier=MDX_IDENTIFIER, string=MDX_STRING),
+    re.IGNORECASE)
+# the large parts of a query are matched as one token each: flat sets of members or tuples (see _tokenize_mdx),
+# sets of tuples {([a].[x],[b].[y]), ...} and runs of members with the same prefix [d].[e1],[d].[e2], ...
+# further: comments, [identifiers], "strings", words (keywords, function names, numbers) and single characters
+REGEX_MDX_TOKENS = re.compile(
+    r"(?P<comment>//[^\n]*|--[^\n]*|/\*.*?\*/)"
+    r"|(?P<run>(?P<prefix>(?:{identifier}\.)+){identifier}(?P<more>(?:\s*,\s*(?P=prefix){identifier})*)(?!\s*\.))"
+    r"|(?P<identifier>{identifier})"
+    r"|(?P<string>{string})"
+    r"|(?P<word>\w+)"
+    r"|(?P<symbol>\S)".format(identifier=MDX_IDENTIFIER, string=MDX_STRING),
+    re.DOTALL)
+# queries of flat sets only (see _parse_flat_mdx): SELECT, the axes and FROM with an optional WHERE tuple
+REGEX_MDX_FLAT_SELECT = re.compile(r"\s*SELECT\b\s*", re.IGNORECASE)
+REGEX_MDX_FLAT_NON_EMPTY = re.compile(r"NON\s+EMPTY\b\s*", re.IGNORECASE)
+REGEX_MDX_FLAT_CROSS_JOIN = re.compile(r"\s*\*\s*")
+REGEX_MDX_FLAT_AXIS = re.compile(
+    r"\s*ON\s+(?P<axis>ROWS|COLUMNS|0|1)\b\s*(?:(?P<separator>,)|FROM\b)\s*", re.IGNORECASE)
+REGEX_MDX_FLAT_FROM = re.compile(
+    r"(?P<cube>{identifier})\s*(?:WHERE\s*(?P<where>\([^(){{}}\"']*\))\s*)?".format(identifier=MDX_IDENTIFIER),
+    re.IGNORECASE)
+
+# functions that take a hierarchy (not a member) as first argument
+MDX_HIERARCHY_FUNCTIONS = ('TM1SUBSETALL', 'TM1SUBSETTOSET')
+# properties that turn a path into a hierarchy: [dim].[hier].MEMBERS
+MDX_HIERARCHY_PROPERTIES = ('MEMBERS', 'ALLMEMBERS', 'DEFAULTMEMBER', 'LEVELS', 'LEVEL')
+# functions in which only the first argument determines the hierarchies of the set
+MDX_FIRST_ARGUMENT_SET_FUNCTIONS = (
+    'FILTER', 'ORDER', 'TOPCOUNT', 'BOTTOMCOUNT', 'TOPSUM', 'BOTTOMSUM', 'TOPPERCENT', 'BOTTOMPERCENT', 'HEAD',
+    'TAIL', 'SUBSET', 'TM1SORT', 'TM1SORTBYINDEX', 'TM1FILTERBYLEVEL', 'TM1FILTERBYPATTERN', 'GENERATE')
+MDX_AXES = {'COLUMNS': 0, 'ROWS': 1, '0': 0, '1': 1}
+# characters between the identifiers of a flat set: {[d].[e1], [d].[e2]} or {([d1].[e1], [d2].[e1]), ...}
+MDX_FLAT_SET_SEPARATORS = b" \t\r\n,.()"
+
+MDX_COMPOSITION_CACHE_SIZE = 1024
+
+MDXComposition = namedtuple('MDXComposition', [
+    'cube', 'rows', 'columns', 'titles', 'rows_span', 'columns_span', 'where_span', 'non_empty_rows',
+    'non_empty_columns', 'rows_sets', 'columns_sets'])
+
+
 class DimensionSelection:
     """ Instances of this class to be passed to construct_mdx function
 
@@ -196,3 +258,369 @@ def _find_case_and_space_insensitive_first_occurrence(text, pattern_start=None,
     selection = text_without_spaces[pos_start:pos_end + 1]
     text = text_without_spaces[pos_end + len(pattern_end):]
     return selection, text
+
+
+@functools.lru_cache(maxsize=MDX_COMPOSITION_CACHE_SIZE)
+def parse_mdx(mdx):
+    """ Parse an MDX query in a single pass. Results are cached by MDX string (parse_mdx.cache_clear() to reset).
+
+    Unlike read_dimension_composition_from_mdx the names are returned as they are in the MDX (with spaces),
+    the order of the axes is irrelevant and calculated members, functions, comments and strings are supported.
+
+    :param mdx: MDX query
+    :return: MDXComposition with
+        cube: name of the cube
+        rows, columns, titles: tuples of (dimension, hierarchy) in the order of the MDX
+        rows_span, columns_span, where_span: (start, end) of the sets in the MDX string or None. mdx[start:end]
+        non_empty_rows, non_empty_columns: boolean
+        rows_sets, columns_sets: the cross joined sets (set * set) of the axis as tuples of ((start, end), hierarchies)
+    """
+    composition = _parse_flat_mdx(mdx)
+    if composition:
+        return composition
+
+    tokens = _tokenize_mdx(mdx)
+
+    # skip WITH MEMBER / SET definitions
+    _, _, _, position = _read_mdx_segment(tokens, 0, ('SELECT',), collect=False)
+    if position >= len(tokens):
+        raise ValueError("Can't parse mdx. SELECT is missing: {}".format(mdx))
+    position += 1
+
+    axes = {}
+    while True:
+        non_empty = False
+        if _mdx_token_upper(tokens, position) == 'NON' and _mdx_token_upper(tokens, position + 1) == 'EMPTY':
+            non_empty = True
+            position += 2
+        hierarchies, span, sets, position = _read_mdx_segment(tokens, position, ('ON', 'DIMENSION', 'PROPERTIES'))
+        # DIMENSION PROPERTIES ... ON
+        _, _, _, position = _read_mdx_segment(tokens, position, ('ON',), collect=False)
+        axis, position = _read_mdx_axis(tokens, position + 1, mdx)
+        axes[axis] = (hierarchies, span, non_empty, sets)
+        if _mdx_token_upper(tokens, position) == ',':
+            position += 1
+        elif _mdx_token_upper(tokens, position) == 'FROM':
+            break
+        else:
+            raise ValueError("Can't parse mdx. Expected ',' or FROM after axis: {}".format(mdx))
+
+    position += 1
+    if position >= len(tokens) or tokens[position][0] != 'identifier':
+        raise ValueError("Can't parse mdx. Expected cube after FROM: {}".format(mdx))
+    cube = _unquote_mdx_identifier(tokens[position][1])
+    position += 1
+
+    titles, where_span = (), None
+    if _mdx_token_upper(tokens, position) == 'WHERE':
+        titles, where_span, _, position = _read_mdx_segment(tokens, position + 1, ('CELL',))
+
+    rows, rows_span, non_empty_rows, rows_sets = axes.get(1, ((), None, False, ()))
+    columns, columns_span, non_empty_columns, columns_sets = axes.get(0, ((), None, False, ()))
+    return MDXComposition(
+        cube=cube,
+        rows=rows,
+        columns=columns,
+        titles=titles,
+        rows_span=rows_span,
+        columns_span=columns_span,
+        where_span=where_span,
+        non_empty_rows=non_empty_rows,
+        non_empty_columns=non_empty_columns,
+        rows_sets=rows_sets,
+        columns_sets=columns_sets)
+
+
+def read_members_from_mdx_set(mdx_set):
+    """ Read the members of an explicit set, e.g. {[d].[e1], [d].[h].[e2]}
+
+    :param mdx_set: set MDX
+    :return: list of member unique names or None if the set is not an explicit list of members
+    """
+    mdx_set = mdx_set.strip()
+    if not REGEX_MDX_MEMBER_SET.fullmatch(mdx_set):
+        return None
+    return REGEX_MDX_PATH.findall(mdx_set)
+
+
+def read_hierarchy_from_mdx_subset(mdx_set):
+    """ Read hierarchy and subset from TM1SubsetAll([d].[h]) or TM1SubsetToSet([d].[h], "subset")
+
+    :param mdx_set: set MDX
+    :return: dimension, hierarchy, subset name (None for TM1SubsetAll) or None if the set is something else
+    """
+    mdx_set = mdx_set.strip()
+    match = REGEX_MDX_SUBSET_ALL.fullmatch(mdx_set) or REGEX_MDX_SUBSET_TO_SET.fullmatch(mdx_set)
+    if not match:
+        return None
+    path = _split_mdx_path(match.group('hierarchy'))
+    subset_name = match.groupdict().get('subset')
+    if subset_name:
+        quote = subset_name[0]
+        subset_name = subset_name[1:-1].replace(quote * 2, quote)
+    return path[0], path[-1], subset_name
+
+
+def _parse_flat_mdx(mdx):
+    """ Parse a query of which all sets are flat (see _find_end_of_flat_mdx_set), e.g.
+    SELECT NON EMPTY {[d1].[e1], [d1].[e2]} * {([d2].[e1], [d3].[e1])} ON ROWS, {[d4].[e1]} ON COLUMNS FROM [c]
+    WHERE ([d5].[e1]). Same result as parse_mdx, without tokenizing the query
+
+    :return: MDXComposition or None if the query is not of that form
+    """
+    match = REGEX_MDX_FLAT_SELECT.match(mdx)
+    if not match:
+        return None
+    position = match.end()
+
+    axes = {}
+    while True:
+        match = REGEX_MDX_FLAT_NON_EMPTY.match(mdx, position)
+        non_empty = match is not None
+        if non_empty:
+            position = match.end()
+        hierarchies = []
+        seen = set()
+        sets = []
+        sets_start = position
+        while True:
+            if not mdx.startswith('{', position):
+                return None
+            set_end = _find_end_of_flat_mdx_set(mdx, position)
+            if not set_end:
+                return None
+            set_first_hierarchy = len(hierarchies)
+            _collect_mdx_hierarchies(
+                _read_first_element_from_flat_mdx_set(mdx[position:set_end]), False, hierarchies, seen)
+            sets.append(((position, set_end), tuple(hierarchies[set_first_hierarchy:])))
+            position = set_end
+            match = REGEX_MDX_FLAT_CROSS_JOIN.match(mdx, position)
+            if not match:
+                break
+            position = match.end()
+        match = REGEX_MDX_FLAT_AXIS.match(mdx, position)
+        if not match:
+            return None
+        axes[MDX_AXES[match.group('axis').upper()]] = (
+            tuple(hierarchies), (sets_start, position), non_empty, tuple(sets))
+        position = match.end()
+        if not match.group('separator'):
+            break
+
+    match = REGEX_MDX_FLAT_FROM.fullmatch(mdx, position)
+    if not match:
+        return None
+    titles, where_span = (), None
+    if match.group('where'):
+        where = match.group('where')
+        if not _is_flat_mdx(where[1:-1].encode('utf-8')):
+            return None
+        hierarchies = []
+        _collect_mdx_hierarchies(_read_first_element_from_flat_mdx_set(where), False, hierarchies, set())
+        titles, where_span = tuple(hierarchies), match.span('where')
+
+    rows, rows_span, non_empty_rows, rows_sets = axes.get(1, ((), None, False, ()))
+    columns, columns_span, non_empty_columns, columns_sets = axes.get(0, ((), None, False, ()))
+    return MDXComposition(
+        cube=_unquote_mdx_identifier(match.group('cube')),
+        rows=rows,
+        columns=columns,
+        titles=titles,
+        rows_span=rows_span,
+        columns_span=columns_span,
+        where_span=where_span,
+        non_empty_rows=non_empty_rows,
+        non_empty_columns=non_empty_columns,
+        rows_sets=rows_sets,
+        columns_sets=columns_sets)
+
+
+def _collect_mdx_hierarchies(paths, is_hierarchy, hierarchies, seen):
+    """ Append the distinct (dimension, hierarchy) of member paths (or of hierarchy paths) to hierarchies
+    """
+    for path in paths:
+        dimension_name = path[0]
+        hierarchy_name = path[1] if len(path) > (1 if is_hierarchy else 2) else path[0]
+        key = (''.join(dimension_name.lower().split()), ''.join(hierarchy_name.lower().split()))
+        if key not in seen:
+            seen.add(key)
+            hierarchies.append((dimension_name, hierarchy_name))
+
+
+def _mdx_token_upper(tokens, position):
+    return tokens[position][1].upper() if position < len(tokens) else None
+
+
+def _unquote_mdx_identifier(identifier):
+    return identifier[1:-1].replace(']]', ']')
+
+
+def _tokenize_mdx(mdx):
+    """ Split an MDX query into tokens, without comments
+
+    :return: list of (kind, text, start, end, match)
+    """
+    tokens = []
+    position = 0
+    while True:
+        match = REGEX_MDX_TOKENS.search(mdx, position)
+        if not match:
+            return tokens
+        kind, start, end = match.lastgroup, match.start(), match.end()
+        if kind == 'symbol' and match.group() == '{':
+            set_end = _find_end_of_flat_mdx_set(mdx, start)
+            if set_end:
+                kind, end = 'set', set_end
+            else:
+                tuples = REGEX_MDX_TUPLE_SET.match(mdx, start)
+                if tuples:
+                    kind, end = 'tuples', tuples.end()
+        if kind != 'comment':
+            tokens.append((kind, mdx[start:end], start, end, match))
+        position = end
+
+
+def _find_end_of_flat_mdx_set(mdx, start):
+    """ End of a set of members or tuples without functions, strings and escaped brackets in names.
+    Large sets are recognized with string operations only, instead of matching each identifier with a regex
+
+    :param start: position of the opening curly brace
+    :return: position after the closing curly brace or None if the set is not flat
+    """
+    end = mdx.find('}', start)
+    if end < 0:
+        return None
+    if not _is_flat_mdx(mdx[start + 1:end].encode('utf-8')):
+        return None
+    return end + 1
+
+
+def _is_flat_mdx(content):
+    """ Whether content (utf-8 encoded) consists of identifiers and separators only
+
+    :param content: bytes, e.g. the content of a set or a tuple
+    """
+    identifiers = content.count(b'[')
+    if not identifiers or content.count(b']') != identifiers:
+        return False
+    # without separators flat content is [..][..]...[..]: any other character is outside of the identifiers
+    content = content.translate(None, MDX_FLAT_SET_SEPARATORS)
+    return content[:1] == b'[' and content[-1:] == b']' and content.count(b'][') == identifiers - 1
+
+
+def _read_first_element_from_flat_mdx_set(mdx_set):
+    """ Paths of the first member or tuple of a flat set (see _find_end_of_flat_mdx_set)
+
+    :return: list of paths. A path is a list of names
+    """
+    paths = [[]]
+    previous_end = mdx_set.index('[')
+    is_tuple_set = '(' in mdx_set[:previous_end]
+    for identifier in REGEX_MDX_IDENTIFIER.finditer(mdx_set, previous_end):
+        separator = mdx_set[previous_end:identifier.start()]
+        if ')' in separator or (',' in separator and not is_tuple_set):
+            break
+        if ',' in separator:
+            paths.append([])
+        paths[-1].append(_unquote_mdx_identifier(identifier.group()))
+        previous_end = identifier.end()
+    return paths
+
+
+def _read_mdx_axis(tokens, position, mdx):
+    axis_name = _mdx_token_upper(tokens, position)
+    if axis_name == 'AXIS' and _mdx_token_upper(tokens, position + 1) == '(' \
+            and _mdx_token_upper(tokens, position + 3) == ')':
+        axis_name = _mdx_token_upper(tokens, position + 2)
+        position += 3
+    if axis_name not in MDX_AXES:
+        raise ValueError("Can't parse mdx. Only COLUMNS and ROWS axes are supported: {}".format(mdx))
+    return MDX_AXES[axis_name], position + 1
+
+
+def _read_mdx_segment(tokens, position, stop_words, collect=True):
+    """ Read tokens up to the first of stop_words outside of brackets and collect the distinct hierarchies
+
+    :return: tuple of (dimension, hierarchy), (start, end) of the segment or None,
+    cross joined sets as tuple of ((start, end), hierarchies), position of the stop word
+    """
+    hierarchies = []
+    seen = set()
+    sets = []
+    # start, end and index of the first hierarchy of the current set in a cross join
+    set_start = set_end = None
+    set_first_hierarchy = 0
+    # one entry per open bracket: [function name, index of the current argument]
+    frames = []
+    start = end = None
+    previous_word = None
+    while position < len(tokens):
+        kind, text, token_start, token_end, match = tokens[position]
+        if not frames and kind == 'word' and text.upper() in stop_words:
+            break
+        if start is None:
+            start = token_start
+        end = token_end
+        position += 1
+
+        if not frames and text == '*':
+            if set_start is not None:
+                sets.append(((set_start, set_end), tuple(hierarchies[set_first_hierarchy:])))
+            set_start, set_first_hierarchy = None, len(hierarchies)
+            continue
+        if set_start is None:
+            set_start = token_start
+        set_end = token_end
+
+        if kind == 'symbol':
+            if text in '({':
+                frames.append([previous_word if text == '(' else None, 0])
+            elif text in ')}':
+                if frames:
+                    frames.pop()
+            elif text == ',' and frames:
+                frames[-1][1] += 1
+            previous_word = None
+            continue
+        if kind == 'word':
+            previous_word = text.upper()
+            continue
+        previous_word = None
+
+        if kind == 'set':
+            # all elements of a set have the same dimensionality: the first element stands for all
+            paths = _read_first_element_from_flat_mdx_set(text)
+        elif kind == 'tuples':
+            # all tuples of a set have the same dimensionality: the first tuple stands for all
+            first_tuple = REGEX_MDX_TUPLE.search(text).group()
+            paths = [_split_mdx_path(path.group()) for path in REGEX_MDX_PATH.finditer(first_tuple)]
+        elif kind == 'run':
+            # all members of a run have the same prefix: the first member stands for all
+            paths = [_split_mdx_path(REGEX_MDX_PATH.match(text).group())]
+            if frames and match.group('more'):
+                frames[-1][1] += 1
+        elif kind == 'identifier':
+            path = [_unquote_mdx_identifier(text)]
+            while _mdx_token_upper(tokens, position) == '.' \
+                    and position + 1 < len(tokens) and tokens[position + 1][0] == 'identifier':
+                path.append(_unquote_mdx_identifier(tokens[position + 1][1]))
+                end = set_end = tokens[position + 1][3]
+                position += 2
+            paths = [path]
+        else:
+            continue
+        if not collect or any(function in MDX_FIRST_ARGUMENT_SET_FUNCTIONS and argument > 0
+                              for function, argument in frames):
+            continue
+
+        is_hierarchy = (_mdx_token_upper(tokens, position) == '.'
+                        and _mdx_token_upper(tokens, position + 1) in MDX_HIERARCHY_PROPERTIES) \
+            or (frames and frames[-1][0] in MDX_HIERARCHY_FUNCTIONS and frames[-1][1] == 0)
+        _collect_mdx_hierarchies(paths, is_hierarchy, hierarchies, seen)
+    if set_start is not None:
+        sets.append(((set_start, set_end), tuple(hierarchies[set_first_hierarchy:])))
+    return tuple(hierarchies), (start, end) if start is not None else None, tuple(sets), position
+
+
+def _split_mdx_path(path):
+    return [_unquote_mdx_identifier(identifier) for identifier in REGEX_MDX_IDENTIFIER.findall(path)]
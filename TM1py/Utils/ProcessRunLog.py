@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+
+import re
+
+import numpy as np
+import pandas as pd
+
+REGEX_PROCESS_STARTED = re.compile(r'^Process "(?P<process>.+?)"\s*:?\s*executed by user', re.IGNORECASE)
+REGEX_PROCESS_FINISHED = re.compile(
+    r'^Process "(?P<process>.+?)"\s*:\s*(?P<message>(finished executing|execution was aborted).*)$',
+    re.IGNORECASE | re.DOTALL)
+REGEX_ELAPSED_TIME = re.compile(r'elapsed time (?P<seconds>[\d.]+) seconds', re.IGNORECASE)
+
+
+class ProcessRunLog:
+    """ Columnar store of TI process runs, built incrementally from TM1.Process message log entries
+
+    Start ('Process "x" executed by user "y"') and finish ('Process "x":  finished executing normally, ...')
+    messages are matched per thread. Only the english server messages are recognized.
+
+    Usage:
+    >>> runs = ProcessRunLog()
+    >>> for entry in tm1.server.tail_message_log(filter="Logger eq 'TM1.Process'", idle_timeout=600):
+    >>>     runs.add_entry(entry)
+    >>> runs.summary()
+    """
+
+    FAILURE_STATUSES = ('Aborted', 'HasMinorErrors', 'CompletedWithMessages')
+
+    def __init__(self):
+        self._process = []
+        self._thread = []
+        self._start = []
+        self._end = []
+        self._elapsed = []
+        self._status = []
+        # thread id -> stack of (process name, start timestamp). Processes called through ExecuteProcess nest
+        self._running = {}
+
+    def add_entries(self, entries):
+        """ Add message log entries (as returned from MessageLogEntries or ServerService.tail_message_log)
+
+        :param entries: iterable of dicts
+        :return:
+        """
+        for entry in entries:
+            self.add_entry(entry)
+
+    def add_entry(self, entry):
+        if entry.get('Logger') != 'TM1.Process':
+            return
+        message = entry['Message']
+        thread = entry['ThreadID']
+        started = REGEX_PROCESS_STARTED.match(message)
+        if started:
+            self._running.setdefault(thread, []).append((started.group('process'), entry['TimeStamp']))
+            return
+        finished = REGEX_PROCESS_FINISHED.match(message)
+        if not finished:
+            return
+        process = finished.group('process')
+        elapsed = REGEX_ELAPSED_TIME.search(finished.group('message'))
+        self._process.append(process)
+        self._thread.append(thread)
+        self._start.append(self._pop_start(thread, process))
+        self._end.append(entry['TimeStamp'])
+        self._elapsed.append(float(elapsed.group('seconds')) if elapsed else np.nan)
+        self._status.append(self._status_from_message(finished.group('message')))
+
+    def _pop_start(self, thread, process):
+        stack = self._running.get(thread, [])
+        for position in range(len(stack) - 1, -1, -1):
+            if stack[position][0].lower() == process.lower():
+                start = stack[position][1]
+                del stack[position:]
+                return start
+        return None
+
+    @staticmethod
+    def _status_from_message(message):
+        message = message.lower()
+        if 'finished executing normally' in message:
+            return 'CompletedSuccessfully'
+        if 'aborted' in message:
+            return 'Aborted'
+        if 'minor errors' in message:
+            return 'HasMinorErrors'
+        if 'processquit' in message or 'quit called' in message:
+            return 'QuitCalled'
+        return 'CompletedWithMessages'
+
+    def __len__(self):
+        return len(self._process)
+
+    @property
+    def runs(self):
+        """ All completed runs as DataFrame with columns
+        Process, ThreadID, Start, End, Duration (seconds), Status, Failed
+
+        :return: pandas.DataFrame
+        """
+        end = pd.to_datetime(pd.Series(self._end, dtype=object), utc=True)
+        duration = pd.Series(self._elapsed, dtype=float)
+        start = pd.to_datetime(pd.Series(self._start, dtype=object), utc=True)
+        # duration from the message is more precise. Fall back to the timestamps (and vice versa)
+        duration = duration.fillna((end - start).dt.total_seconds())
+        start = start.fillna(end - pd.to_timedelta(duration, unit='s'))
+        status = pd.Categorical(self._status)
+        return pd.DataFrame({
+            'Process': pd.Categorical(self._process),
+            'ThreadID': self._thread,
+            'Start': start,
+            'End': end,
+            'Duration': duration,
+            'Status': status,
+            'Failed': np.isin(np.asarray(self._status, dtype=object), self.FAILURE_STATUSES)})
+
+    def duration_percentiles(self, percentiles=(50, 90, 99)):
+        """ Duration percentiles per process
+
+        :param percentiles: iterable of percentiles between 0 and 100
+        :return: pandas.DataFrame, index: process, columns: percentiles
+        """
+        quantiles = [percentile / 100 for percentile in percentiles]
+        result = self.runs.groupby('Process', observed=True)['Duration'].quantile(quantiles).unstack()
+        result.columns = ['P{}'.format(percentile) for percentile in percentiles]
+        return result
+
+    def failure_rates(self):
+        """ Share of runs per process that did not complete successfully
+
+        :return: pandas.Series, index: process
+        """
+        return self.runs.groupby('Process', observed=True)['Failed'].mean().rename('FailureRate')
+
+    def concurrency(self, frequency='1min'):
+        """ Max number of processes running at the same time, per time bucket
+
+        :param frequency: pandas offset alias, e.g. '1s', '1min', '1h'
+        :return: pandas.Series, index: time bucket
+        """
+        # runs without start message and without elapsed time can not be placed on the time line
+        runs = self.runs.dropna(subset=['Start'])
+        # ends before starts at the same timestamp: a process that follows another does not overlap with it
+        events = pd.concat([
+            pd.Series(-1, index=runs['End']),
+            pd.Series(1, index=runs['Start'])]).sort_index(kind='mergesort')
+        return events.cumsum().resample(frequency).max().ffill().astype(int).rename('Concurrency')
+
+    def summary(self, percentiles=(50, 90, 99)):
+        """ Runs, failures, total and percentile durations per process, ordered by total duration.
+        The processes on top are the ones worth optimizing first.
+
+        :param percentiles: iterable of percentiles between 0 and 100
+        :return: pandas.DataFrame, index: process
+        """
+        grouped = self.runs.groupby('Process', observed=True)
+        summary = pd.DataFrame({
+            'Runs': grouped.size(),
+            'Failures': grouped['Failed'].sum(),
+            'FailureRate': grouped['Failed'].mean(),
+            'TotalDuration': grouped['Duration'].sum()})
+        summary = summary.join(self.duration_percentiles(percentiles))
+        return summary.sort_values('TotalDuration', ascending=False)
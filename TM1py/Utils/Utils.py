@@ -1,9 +1,14 @@
 import collections
+import collections.abc
+import importlib.util
+import itertools
 import json
+import os
 import re
 import sys
 import warnings
 
+import numpy as np
 import pandas as pd
 
 if sys.version[0] == '2':
@@ -158,26 +163,12 @@ def build_ui_arrays_from_cellset(raw_cellset_as_dict, value_precision):
     headers = header_map['headers']
     cardinality = header_map['cardinality']
 
-    if value_precision:
-        value_format_string = "{{0:.{}f}}".format(value_precision)
-
+    # values[z][y] is the row y of page z
+    values = _build_ui_values_from_cellset(raw_cellset_as_dict, cardinality, value_precision).tolist()
+    y_headers = [header['name'] for header in headers[1]]
     cells = {}
-    ordinal_cells = 0
-    for z in range(cardinality[2]):
-        z_header = headers[2][z]['name']
-        pages = {}
-        for y in range(cardinality[1]):
-            y_header = headers[1][y]['name']
-            row = []
-            for x in range(cardinality[0]):
-                raw_value = raw_cellset_as_dict['Cells'][ordinal_cells]['Value'] or 0
-                if value_precision:
-                    row.append(float(value_format_string.format(raw_value)))
-                else:
-                    row.append(raw_value)
-                ordinal_cells += 1
-            pages[y_header] = row
-        cells[z_header] = pages
+    for z_header, page in zip(headers[2], values):
+        cells[z_header['name']] = dict(zip(y_headers, page))
     return {'titles': titles, 'headers': headers, 'cells': cells}
 
 
@@ -209,29 +200,53 @@ def build_ui_dygraph_arrays_from_cellset(raw_cellset_as_dict, value_precision=No
     headers = header_map['headers']
     cardinality = header_map['cardinality']
 
-    if value_precision:
-        value_format_string = "{{0:.{}f}}".format(value_precision)
-
+    # values[z].T[x] are the values of column x on page z
+    values = _build_ui_values_from_cellset(raw_cellset_as_dict, cardinality, value_precision)
+    x_headers = [header['name'] for header in headers[0]]
     cells = {}
-    for z in range(cardinality[2]):
-        z_header = headers[2][z]['name']
-        page = []
-        for x in range(cardinality[0]):
-            x_header = headers[0][x]['name']
-            row = [x_header]
-            for y in range(cardinality[1]):
-                cell_addr = (x + cardinality[0] * y + cardinality[0] * cardinality[1] * z)
-                raw_value = raw_cellset_as_dict['Cells'][cell_addr]['Value'] or 0
-                if value_precision:
-                    row.append(float(value_format_string.format(raw_value)))
-                else:
-                    row.append(raw_value)
-            page.append(row)
-        cells[z_header] = page
+    for z_header, page in zip(headers[2], values):
+        cells[z_header['name']] = [[x_header] + column for x_header, column in zip(x_headers, page.T.tolist())]
 
     return {'titles': titles, 'headers': headers, 'cells': cells}
 
 
+def _build_ui_values_from_cellset(raw_cellset_as_dict, cardinality, value_precision=None):
+    """ Cell values as array of shape (pages, rows, columns). Empty cells are 0
+
+    :param raw_cellset_as_dict: raw data from TM1
+    :param cardinality: [columns, rows, pages]
+    :param value_precision: Integer (optional) specifying number of decimal places
+    :return: numpy array. float if value_precision is given, object (values as they are) otherwise
+    """
+    number_cells = cardinality[0] * cardinality[1] * cardinality[2]
+    values = [cell['Value'] or 0 for cell in raw_cellset_as_dict['Cells'][:number_cells]]
+    if value_precision:
+        values = _round_values(np.array(values, dtype=float), value_precision)
+    else:
+        values = np.array(values, dtype=object)
+    return values.reshape(cardinality[2], cardinality[1], cardinality[0])
+
+
+def _round_values(values, decimals):
+    """ Round an array of floats to a number of decimal places. Same result as float('{:.2f}'.format(value))
+
+    np.round scales by 10^decimals before it rounds, which can push values that are close to a tie
+    to the other side. Those few values are rounded through string formatting instead.
+
+    :param values: numpy array of floats
+    :param decimals: number of decimal places
+    :return: numpy array of floats
+    """
+    rounded = np.round(values, decimals)
+    scaled = np.abs(values * 10.0 ** decimals)
+    with np.errstate(invalid='ignore'):
+        close_to_tie = np.abs(scaled - np.floor(scaled) - 0.5) <= 2 * np.spacing(scaled)
+    value_format_string = "{{0:.{}f}}".format(decimals)
+    for position in np.flatnonzero(close_to_tie):
+        rounded.flat[position] = float(value_format_string.format(values.flat[position]))
+    return rounded
+
+
 def build_headers_from_cellset(raw_cellset_as_dict, force_header_dimensionality=1):
     """ Extract dimension headers from cellset into dictionary of titles (slicers) and headers (row,column,page)
     * Title dimensions are in a single list of dicts 
@@ -255,11 +270,9 @@ def build_headers_from_cellset(raw_cellset_as_dict, force_header_dimensionality=
     titles = []
     headers = []
     for axis in range(dimensionality):
-        members = []
-        for tindex in range(cardinality[axis]):
-            tuples_as_dict = raw_cellset_as_dict['Axes'][axis]['Tuples'][tindex]['Members']
-            name = ' / '.join(tuple(member['Name'] for member in tuples_as_dict))
-            members.append({'name': name, 'members': tuples_as_dict})
+        members = [{'name': ' / '.join([member['Name'] for member in tupl['Members']]), 'members': tupl['Members']}
+                   for tupl
+                   in raw_cellset_as_dict['Axes'][axis]['Tuples'][:cardinality[axis]]]
 
         if axis == dimensionality - 1 and cardinality[axis] == 1:
             titles = members
@@ -353,6 +366,46 @@ def build_element_unique_names(dimension_names, element_names, hierarchy_names=N
                 in zip(dimension_names, hierarchy_names, element_names))
 
 
+def build_slices_from_tuples(tuples):
+    """ Group element tuples into slices: cross joins of element sets, that cover exactly the given tuples.
+    E.g. [(a, x), (a, y), (b, x), (b, y), (c, x)] -> [[[a, b, c], [x]], [[a, b], [y]]]
+
+    Per level the dimension is picked, that leaves the fewest distinct remainders.
+    Remainders that share the same elements on that dimension are sliced recursively.
+
+    :param tuples: iterable of element tuples of the same length
+    :return: list of slices. A slice is a list (one entry per dimension) of lists of element names
+    """
+    tuples = list(collections.OrderedDict.fromkeys(tuple(element_tuple) for element_tuple in tuples))
+    if not tuples:
+        return []
+    return _build_slices_from_tuples(tuples)
+
+
+def _build_slices_from_tuples(tuples):
+    if len(tuples[0]) == 1:
+        return [[[element_tuple[0] for element_tuple in tuples]]]
+
+    best_position, best_groups = None, None
+    for position in range(len(tuples[0])):
+        groups = collections.OrderedDict()
+        for element_tuple in tuples:
+            remainder = element_tuple[:position] + element_tuple[position + 1:]
+            groups.setdefault(remainder, []).append(element_tuple[position])
+        if best_groups is None or len(groups) < len(best_groups):
+            best_position, best_groups = position, groups
+
+    remainders_by_elements = collections.OrderedDict()
+    for remainder, elements in best_groups.items():
+        remainders_by_elements.setdefault(tuple(sorted(elements)), []).append(remainder)
+
+    slices = []
+    for elements, remainders in remainders_by_elements.items():
+        for remainder_slice in _build_slices_from_tuples(remainders):
+            slices.append(remainder_slice[:best_position] + [list(elements)] + remainder_slice[best_position:])
+    return slices
+
+
 def build_pandas_dataframe_from_cellset(cellset, multiindex=True, sort_values=True):
     """
     
@@ -389,6 +442,47 @@ def build_pandas_dataframe_from_cellset(cellset, multiindex=True, sort_values=Tr
         raise ValueError(message)
 
 
+def build_power_bi_dataframe_from_cellset(raw_cellset_as_dict, row_headers=None, typed=True):
+    """ Build a pandas DataFrame from a raw cellset, in the layout Power BI consumes:
+    one column per hierarchy on rows, one column per tuple on columns.
+
+    :param raw_cellset_as_dict: raw cellset with the tuples of columns and rows and the cell values
+    :param row_headers: names of the row columns. Taken from the hierarchies on rows if None
+    :param typed: True: row columns are categorical, columns with numbers (and empty cells) are float and
+    columns with strings are left as strings. False: all columns are strings
+    :return: pandas DataFrame
+    """
+    axes = raw_cellset_as_dict["Axes"]
+    column_headers = [" / ".join(member["Name"] for member in tupl["Members"]) for tupl in axes[0]["Tuples"]]
+    row_tuples = axes[1]["Tuples"] if len(axes) > 1 else []
+    if row_headers is None:
+        row_headers = [hierarchy["Name"] for hierarchy in axes[1]["Hierarchies"]] if len(axes) > 1 else []
+    headers = list(row_headers) + column_headers
+    if not row_tuples:
+        return pd.DataFrame(columns=headers)
+
+    # columns are built straight from the axes and the flat value array, without row lists in between
+    values = np.array([cell["Value"] for cell in raw_cellset_as_dict["Cells"]], dtype=object).reshape(
+        len(row_tuples), len(column_headers))
+    columns = [pd.Series([tupl["Members"][position]["Name"] for tupl in row_tuples],
+                         dtype="category" if typed else str)
+               for position
+               in range(len(row_headers))]
+    for position in range(len(column_headers)):
+        column = values[:, position]
+        if not typed:
+            columns.append(pd.Series(column, dtype=str))
+            continue
+        column = pd.Series(column).infer_objects()
+        # only empty cells: infer_objects keeps them as object
+        if column.dtype == object and column.isna().all():
+            column = column.astype("float64")
+        columns.append(column)
+    df = pd.DataFrame(dict(enumerate(columns)))
+    df.columns = headers
+    return df
+
+
 def build_cellset_from_pandas_dataframe(df):
     """
     
@@ -397,11 +491,51 @@ def build_cellset_from_pandas_dataframe(df):
     """
     if isinstance(df.index, pd.MultiIndex):
         df.reset_index(inplace=True)
-    cellset = CaseAndSpaceInsensitiveTuplesDict()
     split = df.to_dict(orient='split')
-    for row in split['data']:
-        cellset[tuple(row[0:-1])] = row[-1]
-    return cellset
+    return CaseAndSpaceInsensitiveTuplesDict((tuple(row[0:-1]), row[-1]) for row in split['data'])
+
+
+PARQUET_ENGINES = ("pyarrow", "fastparquet")
+
+
+def require_parquet_engine():
+    """ Check that a Parquet engine for pandas is installed. Parquet support is an optional dependency:
+    pip install TM1py[parquet]
+
+    :return: name of the first installed engine
+    """
+    for engine in PARQUET_ENGINES:
+        if importlib.util.find_spec(engine) is not None:
+            return engine
+    raise ImportError("Writing Parquet files requires pyarrow or fastparquet. "
+                      "Install it with: pip install TM1py[parquet]")
+
+
+def read_checkpoint(checkpoint_file):
+    """ Read the content of a checkpoint file, e.g. a delta request or a number of processed rows
+
+    :param checkpoint_file: path of the file or None
+    :return: String or None if there is no checkpoint yet
+    """
+    if checkpoint_file and os.path.isfile(checkpoint_file):
+        with open(checkpoint_file, 'r') as file:
+            return file.read().strip()
+
+
+def write_checkpoint(checkpoint_file, checkpoint):
+    """ Replace the content of a checkpoint file. Does nothing if checkpoint_file is None
+
+    :param checkpoint_file: path of the file or None
+    :param checkpoint: String
+    :return:
+    """
+    if not checkpoint_file:
+        return
+    # write to temporary file first, so that a crash never leaves a truncated checkpoint
+    temporary_file = checkpoint_file + ".tmp"
+    with open(temporary_file, 'w') as file:
+        file.write(checkpoint)
+    os.replace(temporary_file, checkpoint_file)
 
 
 def load_bedrock_from_github(bedrock_process_name):
@@ -437,11 +571,11 @@ def lower_and_drop_spaces(item):
     return item.replace(" ", "").lower()
 
 
-class CaseAndSpaceInsensitiveDict(collections.MutableMapping):
+class CaseAndSpaceInsensitiveDict(collections.abc.MutableMapping):
     """A case-and-space-insensitive dict-like object with String keys.
 
     Implements all methods and operations of
-    ``collections.MutableMapping`` as well as dict's ``copy``. Also
+    ``collections.abc.MutableMapping`` as well as dict's ``copy``. Also
     provides ``adjusted_items``, ``adjusted_keys``.
 
     All keys are expected to be strings. The structure remembers the
@@ -455,50 +589,107 @@ class CaseAndSpaceInsensitiveDict(collections.MutableMapping):
         elements['travelexpenses'] == 100 # True
 
     Entries are ordered
+
+    Internally values are stored in a plain dict under the key as it was first set.
+    Lookups with that exact key are a single dict lookup. Only other spellings need to be adjusted:
+        _store: key -> value
+        _keys: adjusted key -> key in _store
+        _recased: key in _store -> last key set, if it differs in case or spaces
     """
 
     def __init__(self, data=None, **kwargs):
-        self._store = collections.OrderedDict()
-        if data is None:
-            data = {}
+        self._store = {}
+        self._keys = {}
+        self._recased = {}
         self.update(data, **kwargs)
 
+    def _adjust_key(self, key):
+        return lower_and_drop_spaces(key)
+
     def __setitem__(self, key, value):
-        # Use the adjusted cased key for lookups, but store the actual
-        # key alongside the value.
-        self._store[lower_and_drop_spaces(key)] = (key, value)
+        store = self._store
+        if key in store:
+            store[key] = value
+            if self._recased:
+                self._recased.pop(key, None)
+            return
+        adjusted_key = self._adjust_key(key)
+        stored_key = self._keys.get(adjusted_key)
+        if stored_key is None:
+            self._keys[adjusted_key] = key
+            store[key] = value
+        else:
+            # same key in different case: keep position, remember the case of the last key
+            store[stored_key] = value
+            self._recased[stored_key] = key
 
     def __getitem__(self, key):
-        return self._store[lower_and_drop_spaces(key)][1]
+        try:
+            return self._store[key]
+        except KeyError:
+            return self._store[self._keys[self._adjust_key(key)]]
 
     def __delitem__(self, key):
-        del self._store[lower_and_drop_spaces(key)]
+        stored_key = self._keys.pop(self._adjust_key(key))
+        del self._store[stored_key]
+        if self._recased:
+            self._recased.pop(stored_key, None)
+
+    def __contains__(self, key):
+        return key in self._store or self._adjust_key(key) in self._keys
 
     def __iter__(self):
-        return (casedkey for casedkey, mappedvalue in self._store.values())
+        recased = self._recased
+        if not recased:
+            return iter(self._store)
+        return (recased.get(key, key) for key in self._store)
 
     def __len__(self):
         return len(self._store)
 
+    def items(self):
+        return _CaseAndSpaceInsensitiveItemsView(self)
+
+    def values(self):
+        return _CaseAndSpaceInsensitiveValuesView(self)
+
+    def update(self, data=None, **kwargs):
+        """ Bulk insert. Same as MutableMapping.update, without the overhead of one __setitem__ call per item
+        """
+        if data is None:
+            items = ()
+        elif isinstance(data, collections.abc.Mapping):
+            items = data.items()
+        else:
+            items = data
+        store, keys, adjust_key = self._store, self._keys, self._adjust_key
+        for pairs in (items, kwargs.items()):
+            for key, value in pairs:
+                if key in store:
+                    store[key] = value
+                    if self._recased:
+                        self._recased.pop(key, None)
+                    continue
+                adjusted_key = adjust_key(key)
+                stored_key = keys.get(adjusted_key)
+                if stored_key is None:
+                    keys[adjusted_key] = key
+                    store[key] = value
+                else:
+                    store[stored_key] = value
+                    self._recased[stored_key] = key
+
     def adjusted_items(self):
         """Like iteritems(), but with all adjusted keys."""
-        return (
-            (adjusted_key, key_value[1])
-            for (adjusted_key, key_value)
-            in self._store.items()
-        )
+        return zip(self._keys, self._store.values())
 
     def adjusted_keys(self):
         """Like keys(), but with all adjusted keys."""
-        return (
-            adjusted_key
-            for (adjusted_key, key_value)
-            in self._store.items()
-        )
+        return iter(self._keys)
 
     def __eq__(self, other):
-        if isinstance(other, collections.Mapping):
-            other = CaseAndSpaceInsensitiveDict(other)
+        if isinstance(other, collections.abc.Mapping):
+            other = self.__class__(other)
         else:
             return NotImplemented
         # Compare insensitively
@@ -506,17 +697,21 @@ class CaseAndSpaceInsensitiveDict(collections.MutableMapping):
 
     # Copy is required
     def copy(self):
-        return CaseAndSpaceInsensitiveDict(self._store.values())
+        other = self.__class__()
+        other._store = dict(self._store)
+        other._keys = dict(self._keys)
+        other._recased = dict(self._recased)
+        return other
 
     def __repr__(self):
         return str(dict(self.items()))
 
 
-class CaseAndSpaceInsensitiveTuplesDict(collections.MutableMapping):
+class CaseAndSpaceInsensitiveTuplesDict(CaseAndSpaceInsensitiveDict):
     """A case-and-space-insensitive dict-like object with String-Tuples Keys.
 
     Implements all methods and operations of
-    ``collections.MutableMapping`` as well as dict's ``copy``. Also
+    ``collections.abc.MutableMapping`` as well as dict's ``copy``. Also
     provides ``adjusted_items``, ``adjusted_keys``.
 
     All keys are expected to be tuples of strings. The structure remembers the
@@ -533,62 +728,99 @@ class CaseAndSpaceInsensitiveTuplesDict(collections.MutableMapping):
     Entries are ordered
     """
 
+    # upper bound for the size of each memo. A memo is cleared when it is full
+    MEMO_SIZE = 65536
+
     def __init__(self, data=None, **kwargs):
-        self._store = collections.OrderedDict()
-        if data is None:
-            data = {}
-        self.update(data, **kwargs)
+        # memo of writes: item of a stored key -> adjusted item. Cellset coordinates share few distinct element names
+        self._adjusted_items = {}
+        # memo of lookups: key in a different case -> stored key. Cleared when a key is deleted
+        self._stored_keys = {}
+        super().__init__(data, **kwargs)
+
+    def _adjust_key(self, key):
+        adjusted_items = self._adjusted_items
+        try:
+            return tuple(map(adjusted_items.__getitem__, key))
+        except KeyError:
+            if len(adjusted_items) + len(key) > self.MEMO_SIZE:
+                adjusted_items.clear()
+            for item in key:
+                if item not in adjusted_items:
+                    adjusted_items[item] = item.replace(" ", "").lower()
+            return tuple(map(adjusted_items.__getitem__, key))
+
+    def _get_stored_key(self, key):
+        """ Stored key of a key in a different case. Raises KeyError if there is none
+        """
+        stored_keys = self._stored_keys
+        stored_key = stored_keys.get(key)
+        if stored_key is None:
+            stored_key = self._keys[tuple([item.replace(" ", "").lower() for item in key])]
+            if len(stored_keys) >= self.MEMO_SIZE:
+                stored_keys.clear()
+            stored_keys[key] = stored_key
+        return stored_key
 
     def __setitem__(self, key, value):
-        # Use the adjusted cased key for lookups, but store the actual
-        # key alongside the value.
-        self._store[tuple([lower_and_drop_spaces(item) for item in key])] = (key, value)
+        super().__setitem__(key if isinstance(key, tuple) else tuple(key), value)
+
+    def update(self, data=None, **kwargs):
+        if data is None:
+            items = ()
+        elif isinstance(data, collections.abc.Mapping):
+            items = data.items()
+        else:
+            items = data
+        super().update(
+            (key if isinstance(key, tuple) else tuple(key), value)
+            for key, value
+            in itertools.chain(items, kwargs.items()))
 
     def __getitem__(self, key):
-        return self._store[tuple([lower_and_drop_spaces(item) for item in key])][1]
+        store = self._store
+        try:
+            if key in store:
+                return store[key]
+            return store[self._get_stored_key(key)]
+        except TypeError:
+            return store[self._get_stored_key(tuple(key))]
 
     def __delitem__(self, key):
-        del self._store[tuple([lower_and_drop_spaces(item) for item in key])]
+        self._stored_keys.clear()
+        super().__delitem__(key)
 
-    def __iter__(self):
-        return (casedkey for casedkey, mappedvalue in self._store.values())
+    def __contains__(self, key):
+        try:
+            if key in self._store:
+                return True
+            self._get_stored_key(key)
+        except TypeError:
+            return tuple(key) in self
+        except KeyError:
+            return False
+        return True
 
-    def __len__(self):
-        return len(self._store)
+    def copy(self):
+        other = super().copy()
+        other._adjusted_items = dict(self._adjusted_items)
+        return other
 
-    def adjusted_items(self):
-        """Like iteritems(), but with all adjusted keys."""
-        return (
-            (adjusted_key, key_value[1])
-            for (adjusted_key, key_value)
-            in self._store.items()
-        )
 
-    def adjusted_keys(self):
-        """Like keys(), but with all adjusted keys."""
-        return (
-            adjusted_key
-            for (adjusted_key, key_value)
-            in self._store.items()
-        )
+class _CaseAndSpaceInsensitiveItemsView(collections.abc.ItemsView):
 
-    def __eq__(self, other):
-        if isinstance(other, collections.Mapping):
-            other = CaseAndSpaceInsensitiveTuplesDict(other)
-        else:
-            return NotImplemented
-        # Compare insensitively
-        return dict(self.adjusted_items()) == dict(other.adjusted_items())
+    def __iter__(self):
+        mapping = self._mapping
+        return zip(iter(mapping), mapping._store.values())
 
-    # Copy is required
-    def copy(self):
-        return CaseAndSpaceInsensitiveTuplesDict(self._store.values())
 
-    def __repr__(self):
-        return str(dict(self.items()))
+class _CaseAndSpaceInsensitiveValuesView(collections.abc.ValuesView):
+
+    def __iter__(self):
+        return iter(self._mapping._store.values())
 
 
-class CaseAndSpaceInsensitiveSet(collections.MutableSet):
+class CaseAndSpaceInsensitiveSet(collections.abc.MutableSet):
     def __init__(self, *values):
         self._store = {}
         for v in values:
@@ -622,7 +854,7 @@ class CaseAndSpaceInsensitiveSet(collections.MutableSet):
         return str(self._store)
 
     def __eq__(self, other):
-        if isinstance(other, collections.MutableSet):
+        if isinstance(other, collections.abc.MutableSet):
             other = CaseAndSpaceInsensitiveSet(*other)
         else:
             return NotImplemented
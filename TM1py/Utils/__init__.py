@@ -1,3 +1,6 @@
 from TM1py.Utils.Utils import *
 from TM1py.Utils.MDXUtils import *
+from TM1py.Utils.MDXBuilder import MDXQuery, MDXSet, MemberSet, ExpressionSet, CalculatedMember
+from TM1py.Utils.MDXSetEvaluator import MDXSetEvaluator, UnsupportedMDXError
 from TM1py.Utils.TIObfuscator import *
+from TM1py.Utils.ProcessRunLog import ProcessRunLog
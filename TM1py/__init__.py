@@ -27,6 +27,8 @@ from TM1py.Services.CellService import CellService
 from TM1py.Services.DimensionService import DimensionService
 from TM1py.Services.ElementService import ElementService
 from TM1py.Services.HierarchyService import HierarchyService
+from TM1py.Services.MetadataCacheService import MetadataCacheService
+from TM1py.Services.ModelSnapshotService import ModelSnapshotService
 from TM1py.Services.ServerService import ServerService
 from TM1py.Services.ProcessService import ProcessService
 from TM1py.Services.SubsetService import SubsetService
@@ -37,18 +39,25 @@ from TM1py.Services.ViewService import ViewService
 from TM1py.Objects.Annotation import Annotation
 from TM1py.Objects.Application import Application
 from TM1py.Objects.Axis import ViewAxisSelection, ViewTitleSelection
+from TM1py.Objects.Cellset import Cellset
 from TM1py.Objects.Chore import Chore
 from TM1py.Objects.ChoreFrequency import ChoreFrequency
 from TM1py.Objects.ChoreStartTime import ChoreStartTime
 from TM1py.Objects.ChoreTask import ChoreTask
+from TM1py.Objects.CompactHierarchy import CompactHierarchy
 from TM1py.Objects.Cube import Cube
 from TM1py.Objects.Dimension import Dimension
 from TM1py.Objects.Element import Element
 from TM1py.Objects.ElementAttribute import ElementAttribute
+from TM1py.Objects.ElementValidationIndex import ElementValidationIndex
 from TM1py.Objects.Hierarchy import Hierarchy
+from TM1py.Objects.HierarchyDiff import HierarchyDiff
+from TM1py.Objects.HierarchyIndex import HierarchyIndex
 from TM1py.Objects.MDXView import MDXView
+from TM1py.Objects.ModelSnapshot import ModelSnapshot
 from TM1py.Objects.NativeView import NativeView
 from TM1py.Objects.Process import Process
+from TM1py.Objects.QueryCostEstimate import QueryCostEstimate
 from TM1py.Objects.Rules import Rules
 from TM1py.Objects.Server import Server
 from TM1py.Objects.Subset import Subset, AnonymousSubset
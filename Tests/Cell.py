@@ -1,12 +1,16 @@
 import configparser
+import gc
+import os
 import random
+import tempfile
 import types
 import unittest
 from pathlib import Path
 
 import pandas as pd
 
-from TM1py.Objects import MDXView, Cube, Dimension, Element, Hierarchy, NativeView, AnonymousSubset, ElementAttribute
+from TM1py.Objects import MDXView, Cube, Dimension, Element, Hierarchy, NativeView, AnonymousSubset, ElementAttribute, \
+    QueryCostEstimate
 from TM1py.Services import TM1Service
 from TM1py.Utils import Utils
 
@@ -1490,6 +1494,33 @@ class TestDataMethods(unittest.TestCase):
         value = self.tm1.cubes.cells.get_value("}CubeProperties", "{},LOGGING".format(CUBE_NAME))
         self.assertEqual("YES", value.upper())
 
+    def test_bulk_load(self):
+        self.tm1.cubes.cells.activate_transactionlog(CUBE_NAME)
+        with self.tm1.cubes.cells.bulk_load(CUBE_NAME) as previous_values:
+            self.assertEqual(previous_values[(CUBE_NAME, "Logging")].upper(), "YES")
+            value = self.tm1.cubes.cells.get_value("}CubeProperties", "{},LOGGING".format(CUBE_NAME))
+            self.assertEqual("NO", value.upper())
+        value = self.tm1.cubes.cells.get_value("}CubeProperties", "{},LOGGING".format(CUBE_NAME))
+        self.assertEqual("YES", value.upper())
+
+    def test_bulk_load_restores_on_exception(self):
+        self.tm1.cubes.cells.activate_transactionlog(CUBE_NAME)
+        with self.assertRaises(RuntimeError):
+            with self.tm1.cubes.cells.bulk_load([CUBE_NAME], load_cubes=True):
+                raise RuntimeError("load failed")
+        value = self.tm1.cubes.cells.get_value("}CubeProperties", "{},LOGGING".format(CUBE_NAME))
+        self.assertEqual("YES", value.upper())
+
+    def test_bulk_load_with_generator(self):
+        self.tm1.cubes.cells.activate_transactionlog(CUBE_NAME)
+        cubes = (cube_name for cube_name in [CUBE_NAME])
+        with self.tm1.cubes.cells.bulk_load(cubes, load_cubes=True, unload_cubes=True) as previous_values:
+            self.assertEqual(list(previous_values), [(CUBE_NAME, "Logging")])
+            value = self.tm1.cubes.cells.get_value("}CubeProperties", "{},LOGGING".format(CUBE_NAME))
+            self.assertEqual("NO", value.upper())
+        value = self.tm1.cubes.cells.get_value("}CubeProperties", "{},LOGGING".format(CUBE_NAME))
+        self.assertEqual("YES", value.upper())
+
     def test_read_write_with_custom_encoding(self):
         coordinates = ("d1e1", "d2e2", "d3e3")
         self.tm1.cubes.cells.write_values(STRING_CUBE_NAME, {coordinates: LATIN_1_ENCODED_TEXT}, encoding="latin-1")
@@ -1540,6 +1571,188 @@ class TestDataMethods(unittest.TestCase):
         values = self.tm1.cubes.cells.execute_mdx_values(mdx=mdx, encoding="latin-1")
         self.assertNotEqual(LATIN_1_ENCODED_TEXT, next(values))
 
+    def test_get_values(self):
+        cells = {
+            ('Element 3', 'Element 1', 'Element 1'): 11,
+            ('Element 3', 'Element 1', 'Element 2'): 12,
+            ('Element 3', 'Element 2', 'Element 1'): 13}
+        self.tm1.cubes.cells.write_values(CUBE_NAME, cells)
+        element_tuples = list(cells) + [
+            ('element 3', 'element 1', 'element 1'),
+            ('Element 3', 'Element 2', 'Element 3')]
+        self.tm1.cubes.cells.write_value(None, CUBE_NAME, element_tuples[-1])
+
+        values = self.tm1.cubes.cells.get_values(CUBE_NAME, element_tuples, chunk_size=2)
+        self.assertEqual(values[:4], [11, 12, 13, 11])
+        self.assertIn(values[4], (0, None))
+
+        values = self.tm1.cubes.cells.get_values(CUBE_NAME, element_tuples, dimensions=DIMENSION_NAMES, as_numpy=True)
+        self.assertEqual(values.dtype, float)
+        self.assertEqual(list(values[:4]), [11, 12, 13, 11])
+
+    def test_estimate_mdx_cost(self):
+        rows = "{" + ",".join("[{}].[Element {}]".format(DIMENSION_NAMES[0], i) for i in range(1, 11)) + "}"
+        mdx = MDX_TEMPLATE_SHORT.format(
+            rows=rows + " * {TM1SubsetAll([" + DIMENSION_NAMES[1] + "])}",
+            columns="{[" + DIMENSION_NAMES[2] + "].[Element 1]}",
+            cube="[" + CUBE_NAME + "]")
+        estimate = self.tm1.cubes.cells.estimate_mdx_cost(mdx)
+        self.assertEqual(estimate.cells, 10000)
+        self.assertEqual(estimate.cells, self.tm1.cubes.cells.execute_mdx_cellcount(mdx))
+        self.assertTrue(estimate.exact)
+        self.assertEqual(estimate.strategy, QueryCostEstimate.SINGLE)
+
+        estimate = self.tm1.cubes.cells.estimate_mdx_cost(mdx, max_cells_per_request=3000)
+        self.assertEqual(estimate.strategy, QueryCostEstimate.PARTITIONED)
+        self.assertEqual(estimate.partition_dimension, DIMENSION_NAMES[0])
+        self.assertEqual((estimate.partition_size, estimate.requests), (3, 4))
+
+        # one member of the first set on rows has 1000 cells
+        estimate = self.tm1.cubes.cells.estimate_mdx_cost(mdx, max_cells_per_request=500)
+        self.assertEqual(estimate.strategy, QueryCostEstimate.PAGED)
+        self.assertEqual(estimate.requests, 20)
+
+    def test_estimate_view_cost(self):
+        estimate = self.tm1.cubes.cells.estimate_view_cost(CUBE_NAME, VIEW_NAME)
+        self.assertGreaterEqual(estimate.cells, self.tm1.cubes.cells.execute_view_cellcount(CUBE_NAME, VIEW_NAME))
+        self.assertFalse(estimate.exact)
+
+    def test_execute_mdx_values_smart(self):
+        rows = "{" + ",".join("[{}].[Element {}]".format(DIMENSION_NAMES[0], i) for i in range(1, 11)) + "}"
+        mdx = MDX_TEMPLATE_SHORT.format(
+            rows=rows + " * {TM1SubsetAll([" + DIMENSION_NAMES[1] + "])}",
+            columns="{[" + DIMENSION_NAMES[2] + "].[Element 1]}",
+            cube="[" + CUBE_NAME + "]")
+        values = list(self.tm1.cubes.cells.execute_mdx_values(mdx))
+        partitioned = list(self.tm1.cubes.cells.execute_mdx_values(mdx, smart=True, max_cells_per_request=3000))
+        self.assertEqual(values, partitioned)
+
+        mdx = MDX_TEMPLATE_SHORT.format(
+            rows="{TM1SubsetAll([" + DIMENSION_NAMES[0] + "])}",
+            columns="{[" + DIMENSION_NAMES[2] + "].[Element 1]}",
+            cube="[" + CUBE_NAME + "]")
+        values = list(self.tm1.cubes.cells.execute_mdx_values(mdx))
+        paged = list(self.tm1.cubes.cells.execute_mdx_values(mdx, smart=True, max_cells_per_request=300))
+        self.assertEqual(values, paged)
+
+    def test_create_cellset_extract_many_formats(self):
+        mdx = MDX_TEMPLATE_SHORT.format(
+            rows="{[" + DIMENSION_NAMES[0] + "].[Element 1], [" + DIMENSION_NAMES[0] + "].[Element 2]}",
+            columns="{[" + DIMENSION_NAMES[1] + "].[Element 1]} * {[" + DIMENSION_NAMES[2] + "].[Element 1]}",
+            cube="[" + CUBE_NAME + "]")
+        with self.tm1.cubes.cells.create_cellset(mdx) as cellset:
+            self.assertEqual(cellset.cellcount, 2)
+            cube, titles, rows, columns = cellset.composition
+            self.assertEqual(cube, CUBE_NAME)
+            self.assertEqual(len(rows), 1)
+            self.assertEqual(len(columns), 2)
+            self.assertEqual(cellset.values(), list(self.tm1.cubes.cells.execute_mdx_values(mdx)))
+            self.assertEqual(list(cellset.to_dict().values()), list(self.tm1.cubes.cells.execute_mdx(mdx).values()))
+            self.assertEqual(cellset.csv(), self.tm1.cubes.cells.execute_mdx_csv(mdx))
+            self.assertEqual(len(cellset.to_dataframe()), len(self.tm1.cubes.cells.execute_mdx_dataframe(mdx)))
+            self.assertEqual([value for page in cellset.pages(page_size=1) for value in page], cellset.values())
+        self.assertTrue(cellset.closed)
+        # memoized results remain available
+        self.assertEqual(cellset.cellcount, 2)
+        with self.assertRaises(ValueError):
+            list(cellset.pages())
+
+    def test_create_cellset_plain_str_copy_stays_valid(self):
+        mdx = MDX_TEMPLATE_SHORT.format(
+            rows="{[" + DIMENSION_NAMES[0] + "].[Element 1]}",
+            columns="{[" + DIMENSION_NAMES[1] + "].[Element 1]} * {[" + DIMENSION_NAMES[2] + "].[Element 1]}",
+            cube="[" + CUBE_NAME + "]")
+        cellset = self.tm1.cubes.cells.create_cellset(mdx)
+        cellset_id = str(cellset)
+        del cellset
+        gc.collect()
+        self.assertEqual(self.tm1.cubes.cells.extract_cellset_cellcount(cellset_id, delete_cellset=True), 1)
+
+    def test_write_values_only_changed(self):
+        cells = {
+            ('Element 1', 'Element 2', 'Element 3'): 1.5,
+            ('Element 1', 'Element 2', 'Element 4'): 2,
+            ('Element 1', 'Element 2', 'Element 5'): 3}
+        self.tm1.cubes.cells.write_values(CUBE_NAME, cells)
+
+        response = self.tm1.cubes.cells.write_values(CUBE_NAME, cells, only_changed=True)
+        self.assertIsNone(response)
+
+        cells[('Element 1', 'Element 2', 'Element 4')] = 20
+        cells[('Element 1', 'Element 2', 'Element 5')] = None
+        response = self.tm1.cubes.cells.write_values(CUBE_NAME, cells, only_changed=True)
+        self.assertTrue(response.ok)
+
+        mdx = "SELECT {{[{}].[Element 3],[{}].[Element 4],[{}].[Element 5]}} ON 0 FROM [{}] " \
+              "WHERE ([{}].[Element 1],[{}].[Element 2])".format(
+                DIMENSION_NAMES[2], DIMENSION_NAMES[2], DIMENSION_NAMES[2], CUBE_NAME,
+                DIMENSION_NAMES[0], DIMENSION_NAMES[1])
+        values = list(self.tm1.cubes.cells.execute_mdx_values(mdx))
+        self.assertEqual(values, [1.5, 20, None])
+
+    def test_write_values_only_changed_string_zero_into_empty_cell(self):
+        coordinates = ('d1e4', 'd2e1', 'd3e1')
+        try:
+            response = self.tm1.cubes.cells.write_values(STRING_CUBE_NAME, {coordinates: '0'}, only_changed=True)
+            self.assertTrue(response.ok)
+            self.assertEqual(self.tm1.cubes.cells.get_value(STRING_CUBE_NAME, ",".join(coordinates)), '0')
+        finally:
+            self.tm1.cubes.cells.write_values(STRING_CUBE_NAME, {coordinates: ''})
+
+    def test_write_values_only_changed_string_leading_zeros(self):
+        coordinates = ('d1e4', 'd2e2', 'd3e2')
+        try:
+            self.tm1.cubes.cells.write_values(STRING_CUBE_NAME, {coordinates: '123'})
+            response = self.tm1.cubes.cells.write_values(STRING_CUBE_NAME, {coordinates: '00123'}, only_changed=True)
+            self.assertTrue(response.ok)
+            self.assertEqual(self.tm1.cubes.cells.get_value(STRING_CUBE_NAME, ",".join(coordinates)), '00123')
+        finally:
+            self.tm1.cubes.cells.write_values(STRING_CUBE_NAME, {coordinates: ''})
+
+    def test_write_stream(self):
+        rows = [('Element 2', 'Element {}'.format(i), 'Element 7', i) for i in range(1, 26)]
+        statistics = self.tm1.cubes.cells.write_stream(CUBE_NAME, iter(rows), chunk_size=10, max_in_flight=2)
+        self.assertEqual(statistics['rows'], 25)
+        self.assertEqual(statistics['chunks'], 3)
+
+        with tempfile.TemporaryDirectory() as directory:
+            file_name = os.path.join(directory, 'cells.csv')
+            checkpoint_file = os.path.join(directory, 'cells.checkpoint')
+            with open(file_name, 'w') as file:
+                file.write("d1,d2,d3,value\n")
+                file.writelines("{},{},{},{}\n".format(*row[:-1], row[-1] * 2) for row in rows)
+            # pretend the first chunk was acknowledged in a previous run
+            with open(checkpoint_file, 'w') as file:
+                file.write("10")
+            statistics = self.tm1.cubes.cells.write_stream(
+                CUBE_NAME, file_name, chunk_size=10, checkpoint_file=checkpoint_file, skip_header=True)
+            self.assertEqual(statistics['rows'], 15)
+            self.assertFalse(os.path.isfile(checkpoint_file))
+
+        mdx = "SELECT {{[{}].[Element 1]:[{}].[Element 25]}} ON 0 FROM [{}] " \
+              "WHERE ([{}].[Element 2],[{}].[Element 7])".format(
+                DIMENSION_NAMES[1], DIMENSION_NAMES[1], CUBE_NAME, DIMENSION_NAMES[0], DIMENSION_NAMES[2])
+        values = list(self.tm1.cubes.cells.execute_mdx_values(mdx))
+        self.assertEqual(values, [i for i in range(1, 11)] + [i * 2 for i in range(11, 26)])
+
+    def test_execute_delta(self):
+        self.tm1.cubes.cells.activate_transactionlog(CUBE_NAME)
+        with tempfile.TemporaryDirectory() as directory:
+            checkpoint_file = os.path.join(directory, 'delta.checkpoint')
+            # first call only establishes the checkpoint
+            self.assertEqual(list(self.tm1.cubes.cells.execute_delta(CUBE_NAME, checkpoint_file)), [])
+
+            cells = {
+                ('Element 1', 'Element 4', 'Element 9'): 11,
+                ('Element 1', 'Element 5', 'Element 9'): 12,
+                ('Element 2', 'Element 4', 'Element 9'): 13}
+            self.tm1.cubes.cells.write_values(CUBE_NAME, cells)
+
+            delta = dict(self.tm1.cubes.cells.execute_delta(CUBE_NAME, checkpoint_file, dimensions=DIMENSION_NAMES))
+            self.assertEqual(delta, cells)
+            # nothing changed since
+            self.assertEqual(list(self.tm1.cubes.cells.execute_delta(CUBE_NAME, checkpoint_file)), [])
+
     # Delete Cube and Dimensions
     @classmethod
     def teardown_class(cls):
@@ -0,0 +1,29 @@
+import copy
+import pickle
+import unittest
+
+from TM1py.Objects import Cellset
+
+
+class TestCellset(unittest.TestCase):
+
+    def setUp(self):
+        self.cellset = Cellset('cellset-id', cell_service=None)
+
+    def test_copy_is_plain_str(self):
+        for cellset_id in (copy.copy(self.cellset), copy.deepcopy(self.cellset),
+                           pickle.loads(pickle.dumps(self.cellset))):
+            self.assertIs(type(cellset_id), str)
+            self.assertEqual(cellset_id, 'cellset-id')
+
+    def test_memoized_results_after_close(self):
+        self.cellset._cellcount = 3
+        self.cellset._closed = True
+        self.cellset.close()
+        self.assertEqual(self.cellset.cellcount, 3)
+        with self.assertRaises(ValueError):
+            self.cellset.values()
+
+
+if __name__ == '__main__':
+    unittest.main()
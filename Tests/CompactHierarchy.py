@@ -0,0 +1,121 @@
+import unittest
+
+from TM1py.Objects import CompactHierarchy, Dimension, Hierarchy
+
+DIMENSION_NAME = 'TM1py_Tests_CompactHierarchy'
+
+
+class TestCompactHierarchy(unittest.TestCase):
+
+    def setUp(self):
+        self.hierarchy = Hierarchy(name=DIMENSION_NAME, dimension_name=DIMENSION_NAME)
+        self.hierarchy.add_element('Total', 'Consolidated')
+        self.hierarchy.add_element('Region A', 'Consolidated')
+        self.hierarchy.add_element('a1', 'Numeric')
+        self.hierarchy.add_element('a2', 'Numeric')
+        self.hierarchy.add_element('b', 'Numeric')
+        self.hierarchy.add_edge('Total', 'Region A', 1)
+        self.hierarchy.add_edge('Total', 'b', 1)
+        self.hierarchy.add_edge('Region A', 'a1', 1)
+        self.hierarchy.add_edge('Region A', 'a2', 1)
+        self.hierarchy.add_element_attribute('Color', 'String')
+        self.compact = CompactHierarchy.from_hierarchy(self.hierarchy)
+
+    def test_body_equals_hierarchy_body(self):
+        self.assertEqual(self.compact.body_as_dict, self.hierarchy.body_as_dict)
+
+    def test_elements_view(self):
+        self.assertEqual(len(self.compact), 5)
+        self.assertEqual(list(self.compact.elements), ['Total', 'Region A', 'a1', 'a2', 'b'])
+        self.assertEqual(self.compact.elements['regiona'].name, 'Region A')
+        self.assertEqual(str(self.compact['TOTAL'].element_type), 'Consolidated')
+        self.assertIn('A 1', self.compact)
+
+    def test_edges_view(self):
+        self.assertEqual(len(self.compact.edges), 4)
+        self.assertEqual(self.compact.edges[('total', 'REGION A')], 1)
+        self.assertIn(('Region A', 'a2'), self.compact.edges)
+        self.assertNotIn(('b', 'a2'), self.compact.edges)
+
+    def test_update_element(self):
+        self.compact.update_element('b', 'String')
+        self.compact.update_element('a1', None)
+        self.assertEqual(str(self.compact.get_element_type('b')), 'String')
+        self.assertEqual(str(self.compact.get_element_type('a1')), 'Numeric')
+        with self.assertRaises(ValueError):
+            self.compact.update_element('not an element', None)
+
+    def test_inherited_methods(self):
+        self.compact.remove_edges([('Total', 'b'), ('Region A', 'a1')])
+        self.assertEqual(len(self.compact.edges), 2)
+        self.compact.add_element_attribute('Size', 'Numeric')
+        self.assertEqual([attribute.name for attribute in self.compact.element_attributes], ['Color', 'Size'])
+
+    def test_update_edge(self):
+        self.compact.update_edge('Total', 'b', -1)
+        self.assertEqual(self.compact.edges[('Total', 'b')], -1)
+        self.assertEqual(len(self.compact.edges), 4)
+
+    def test_remove_element(self):
+        self.compact.remove_element('Region A')
+        self.hierarchy.remove_element('Region A')
+        self.assertEqual(len(self.compact), 4)
+        self.assertEqual(len(self.compact.edges), 1)
+        self.assertEqual(self.compact.body_as_dict, self.hierarchy.body_as_dict)
+
+    def test_remove_edges_after_changes(self):
+        self.compact.remove_edges_related_to_element('a1')
+        self.compact.add_edge('b', 'a1', 2)
+        self.compact.remove_edge('Total', 'b')
+        self.compact.add_edge('Total', 'b', 3)
+        self.compact.remove_element('b')
+        self.assertEqual(sorted(self.compact.edges), [('Region A', 'a2'), ('Total', 'Region A')])
+        self.compact.remove_edges_related_to_element('Region A')
+        self.assertEqual(len(self.compact.edges), 0)
+
+    def test_add_element_and_edge(self):
+        self.compact.add_element('c', 'Numeric')
+        self.compact.add_edge('Total', 'c', 1)
+        self.assertEqual(self.compact.to_index().leaves('Total'), ['b', 'c', 'a1', 'a2'])
+        with self.assertRaises(Exception):
+            self.compact.add_element('C', 'Numeric')
+
+    def test_from_dict(self):
+        hierarchy_as_dict = {
+            'Name': DIMENSION_NAME,
+            'UniqueName': '[{0}].[{0}]'.format(DIMENSION_NAME),
+            'Structure': 0,
+            'DefaultMember': {'Name': 'Total'},
+            'Subsets': [],
+            'ElementAttributes': [{'Name': 'Color', 'Type': 'String'}, {'Name': 'Size', 'Type': 'Numeric'}],
+            'Elements': [
+                {'Name': 'Total', 'UniqueName': '[{0}].[Total]'.format(DIMENSION_NAME), 'Type': 'Consolidated',
+                 'Index': 1, 'Attributes': {'Color': None, 'Size': None}},
+                {'Name': 'a1', 'UniqueName': '[{0}].[a1]'.format(DIMENSION_NAME), 'Type': 'Numeric',
+                 'Index': 2, 'Attributes': {'Color': 'Red', 'Size': 3}}],
+            'Edges': [{'ParentName': 'Total', 'ComponentName': 'a1', 'Weight': 1}]}
+        compact = CompactHierarchy.from_dict(hierarchy_as_dict)
+        self.assertEqual(compact.default_member, 'Total')
+        self.assertEqual(compact.get_attribute_value('a1', 'Color'), 'Red')
+        self.assertEqual(compact.get_attribute_column('Size'), [None, 3.0])
+        self.assertEqual(compact['a1'].element_attributes, {'Color': 'Red', 'Size': 3.0})
+        self.assertEqual(compact.body_as_dict, Hierarchy.from_dict(hierarchy_as_dict).body_as_dict)
+
+    def test_dimension_from_dict_compact(self):
+        dimension = Dimension(DIMENSION_NAME, hierarchies=[self.hierarchy])
+        dimension_as_dict = dimension.body_as_dict
+        dimension_as_dict['Hierarchies'] = [{
+            **hierarchy,
+            'UniqueName': '[{0}].[{0}]'.format(DIMENSION_NAME),
+            'ElementAttributes': [],
+            'Subsets': [],
+            'DefaultMember': None}
+            for hierarchy
+            in dimension_as_dict['Hierarchies']]
+        compact_dimension = Dimension.from_dict(dimension_as_dict, compact=True)
+        self.assertIsInstance(compact_dimension.default_hierarchy, CompactHierarchy)
+        self.assertEqual(compact_dimension.body_as_dict, dimension.body_as_dict)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -286,6 +286,29 @@ class TestElementMethods(unittest.TestCase):
 
         self.assertEqual(number_of_elements, 2)
 
+    def test_get_attributes_dataframe(self):
+        df = self.tm1.dimensions.hierarchies.elements.get_attributes_dataframe(
+            DIMENSION_NAME, HIERARCHY_NAME, page_size=2)
+        self.assertEqual(len(df), 7)
+        self.assertEqual(list(df.columns), [DIMENSION_NAME, 'Type', 'Previous Year', 'Next Year', 'Financial Year'])
+        self.assertEqual(str(df['Previous Year'].dtype), 'category')
+        row = df[df[DIMENSION_NAME] == '1990'].iloc[0]
+        self.assertEqual(row['Type'], 'Numeric')
+        self.assertEqual(row['Previous Year'], '1989')
+        self.assertEqual(row['Financial Year'], '1989/90')
+
+    def test_get_attributes_dataframe_skip_consolidations(self):
+        df = self.tm1.dimensions.hierarchies.elements.get_attributes_dataframe(
+            DIMENSION_NAME, HIERARCHY_NAME, attributes=['financialyear'], skip_consolidations=True)
+        self.assertEqual(len(df), 5)
+        self.assertEqual(list(df.columns), [DIMENSION_NAME, 'Type', 'Financial Year'])
+        self.assertEqual(set(df['Type']), {'Numeric'})
+
+    def test_get_attributes_dataframe_unknown_attribute(self):
+        with self.assertRaises(ValueError):
+            self.tm1.dimensions.hierarchies.elements.get_attributes_dataframe(
+                DIMENSION_NAME, HIERARCHY_NAME, attributes=['Not An Attribute'])
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,120 @@
+import configparser
+from pathlib import Path
+import unittest
+
+from TM1py.Objects import Dimension, Element, ElementAttribute, ElementValidationIndex, Hierarchy
+from TM1py.Services import TM1Service
+from TM1py.Utils import CaseAndSpaceInsensitiveSet
+
+config = configparser.ConfigParser()
+config.read(Path(__file__).parent.joinpath('config.ini'))
+
+PREFIX = 'TM1py_Tests_ElementValidationIndex_'
+DIMENSION_NAMES = [PREFIX + 'Region', PREFIX + 'Measure']
+
+
+class TestElementValidationIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.index = ElementValidationIndex(
+            dimension_names=['Region', 'Measure'],
+            identifiers=[CaseAndSpaceInsensitiveSet('North', 'South', 'N'), CaseAndSpaceInsensitiveSet('Revenue')])
+
+    def test_validate_dict(self):
+        cells = {
+            ('north', 'Revenue'): 1,
+            ('N', 'Revenue'): 2,
+            ('West', 'Revenue'): 3,
+            ('West', 'Cost'): 4,
+            ('South',): 5}
+        valid, invalid = self.index.validate(cells)
+        self.assertEqual(dict(valid), {('north', 'Revenue'): 1, ('N', 'Revenue'): 2})
+        self.assertEqual(list(invalid), [('West', 'Revenue'), ('West', 'Cost'), ('South',)])
+        self.assertIn("'West'", invalid[('West', 'Revenue')])
+        self.assertIn("'Cost'", invalid[('West', 'Cost')])
+        self.assertIn("Expected 2 elements", invalid[('South',)])
+
+    def test_validate_tuples(self):
+        valid, invalid = self.index.validate([('South', 'Revenue'), ('East', 'Revenue')])
+        self.assertEqual(valid, [('South', 'Revenue')])
+        self.assertEqual(list(invalid), [('East', 'Revenue')])
+
+    def test_set_identifiers(self):
+        self.assertFalse(self.index.contains('Region', 'East'))
+        identifiers = CaseAndSpaceInsensitiveSet('East')
+        version = ElementValidationIndex.fingerprint(identifiers)
+        self.index.set_identifiers('region', identifiers, version=version)
+        self.assertTrue(self.index.contains('Region', 'east'))
+        self.assertEqual(self.index.versions, [version, None])
+        self.assertEqual(self.index.get_version('REGION'), version)
+
+    def test_fingerprint(self):
+        version = ElementValidationIndex.fingerprint(CaseAndSpaceInsensitiveSet('North', 'South', 'N'))
+        self.assertEqual(ElementValidationIndex.fingerprint(CaseAndSpaceInsensitiveSet('south', 'N', 'North')), version)
+        self.assertNotEqual(ElementValidationIndex.fingerprint(CaseAndSpaceInsensitiveSet('North', 'South', 'NN')),
+                            version)
+
+
+class TestElementValidationIndexFromServer(unittest.TestCase):
+    tm1 = None
+
+    @classmethod
+    def setup_class(cls):
+        cls.tm1 = TM1Service(**config['tm1srv01'])
+        for dimension_name in DIMENSION_NAMES:
+            if cls.tm1.dimensions.exists(dimension_name):
+                cls.tm1.dimensions.delete(dimension_name)
+        region = Hierarchy(DIMENSION_NAMES[0], DIMENSION_NAMES[0], element_attributes=[
+            ElementAttribute('Code', 'Alias')])
+        region.add_element('North', 'Numeric')
+        region.add_element('South', 'Numeric')
+        measure = Hierarchy(DIMENSION_NAMES[1], DIMENSION_NAMES[1])
+        measure.add_element('Revenue', 'Numeric')
+        cls.tm1.dimensions.create(Dimension(DIMENSION_NAMES[0], [region]))
+        cls.tm1.dimensions.create(Dimension(DIMENSION_NAMES[1], [measure]))
+        cls.tm1.cubes.cells.write_values(
+            '}ElementAttributes_' + DIMENSION_NAMES[0],
+            {('North', 'Code'): 'N', ('South', 'Code'): 'S'})
+
+    @classmethod
+    def teardown_class(cls):
+        for dimension_name in DIMENSION_NAMES:
+            cls.tm1.dimensions.delete(dimension_name)
+        cls.tm1.logout()
+
+    def test_get_validation_index(self):
+        index = self.tm1.dimensions.hierarchies.elements.get_validation_index(DIMENSION_NAMES)
+        valid, invalid = index.validate([('North', 'Revenue'), ('S', 'Revenue'), ('East', 'Revenue')])
+        self.assertEqual(valid, [('North', 'Revenue'), ('S', 'Revenue')])
+        self.assertEqual(list(invalid), [('East', 'Revenue')])
+
+        index = self.tm1.dimensions.hierarchies.elements.get_validation_index(DIMENSION_NAMES, include_aliases=False)
+        self.assertFalse(index.contains(DIMENSION_NAMES[0], 'S'))
+
+    def test_refresh_validation_index(self):
+        elements = self.tm1.dimensions.hierarchies.elements
+        index = elements.get_validation_index(DIMENSION_NAMES)
+        elements.add_elements(DIMENSION_NAMES[1], DIMENSION_NAMES[1], [Element('Cost', 'Numeric')])
+        self.assertFalse(index.contains(DIMENSION_NAMES[1], 'Cost'))
+
+        elements.refresh_validation_index(index, dimension_names=[DIMENSION_NAMES[0]])
+        self.assertFalse(index.contains(DIMENSION_NAMES[1], 'Cost'))
+
+        self.assertIs(elements.refresh_validation_index(index), index)
+        self.assertTrue(index.contains(DIMENSION_NAMES[1], 'Cost'))
+
+    def test_refresh_validation_index_alias_change(self):
+        elements = self.tm1.dimensions.hierarchies.elements
+        attribute_cube = '}ElementAttributes_' + DIMENSION_NAMES[0]
+        index = elements.get_validation_index(DIMENSION_NAMES)
+        self.tm1.cubes.cells.write_values(attribute_cube, {('North', 'Code'): 'NN'})
+        try:
+            elements.refresh_validation_index(index)
+            self.assertFalse(index.contains(DIMENSION_NAMES[0], 'N'))
+            self.assertTrue(index.contains(DIMENSION_NAMES[0], 'NN'))
+        finally:
+            self.tm1.cubes.cells.write_values(attribute_cube, {('North', 'Code'): 'N'})
+
+
+if __name__ == '__main__':
+    unittest.main()
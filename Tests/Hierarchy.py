@@ -366,6 +366,46 @@ class TestHierarchyMethods(unittest.TestCase):
         is_balanced = self.tm1.dimensions.hierarchies.is_balanced(DIMENSION_NAME, balanced_hierarchy_name)
         self.assertTrue(is_balanced)
 
+    def _bulk_load_and_check(self, strategy):
+        hierarchy = self.tm1.dimensions.hierarchies.get(DIMENSION_NAME, DIMENSION_NAME)
+        hierarchy.add_element('Total Quarters', 'Consolidated')
+        for quarter in range(1, 101):
+            hierarchy.add_element('Q{}'.format(quarter), 'Numeric')
+            hierarchy.add_edge('Total Quarters', 'Q{}'.format(quarter), 1)
+        hierarchy.add_edge('Total Years', 'No Year', 1)
+        hierarchy.add_element_attribute('Quarter Name', 'Alias')
+
+        report = self.tm1.dimensions.hierarchies.bulk_load(hierarchy, strategy=strategy, chunk_size=30)
+        self.assertEqual(report['strategy'], strategy)
+        self.assertEqual(report['elements'], 101)
+        self.assertEqual(report['edges'], 101)
+        self.assertGreater(report['elements_per_second'], 0)
+
+        diff = self.tm1.dimensions.hierarchies.get_diff(hierarchy)
+        self.assertTrue(diff.is_empty(), msg=repr(diff))
+
+    def test_bulk_load_rest(self):
+        self._bulk_load_and_check('rest')
+
+    def test_bulk_load_ti(self):
+        self._bulk_load_and_check('ti')
+
+    def test_bulk_load_new_dimension(self):
+        dimension_name = DIMENSION_PREFIX + "Bulk_Load"
+        hierarchy = Hierarchy(name=dimension_name, dimension_name=dimension_name)
+        hierarchy.add_element('Total', 'Consolidated')
+        hierarchy.add_element('a', 'Numeric')
+        hierarchy.add_edge('Total', 'a', 1)
+        try:
+            report = self.tm1.dimensions.hierarchies.bulk_load(hierarchy)
+            self.assertEqual(report['strategy'], 'rest')
+            self.assertEqual(
+                list(self.tm1.dimensions.hierarchies.elements.get_leaf_element_names(dimension_name, dimension_name)),
+                ['a'])
+        finally:
+            if self.tm1.dimensions.exists(dimension_name):
+                self.tm1.dimensions.delete(dimension_name)
+
 
 if __name__ == '__main__':
     unittest.main()
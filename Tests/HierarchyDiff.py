@@ -0,0 +1,143 @@
+import configparser
+from pathlib import Path
+import unittest
+
+from TM1py.Objects import CompactHierarchy, Dimension, ElementAttribute, Hierarchy, HierarchyDiff
+from TM1py.Services import TM1Service
+
+config = configparser.ConfigParser()
+config.read(Path(__file__).parent.joinpath('config.ini'))
+
+DIMENSION_NAME = 'TM1py_Tests_HierarchyDiff'
+
+
+def build_hierarchy():
+    hierarchy = Hierarchy(name=DIMENSION_NAME, dimension_name=DIMENSION_NAME)
+    hierarchy.add_element('Total', 'Consolidated')
+    hierarchy.add_element('Region A', 'Consolidated')
+    hierarchy.add_element('a1', 'Numeric')
+    hierarchy.add_element('a2', 'Numeric')
+    hierarchy.add_element('b', 'Numeric')
+    hierarchy.add_edge('Total', 'Region A', 1)
+    hierarchy.add_edge('Total', 'b', 1)
+    hierarchy.add_edge('Region A', 'a1', 1)
+    hierarchy.add_edge('Region A', 'a2', 1)
+    hierarchy.add_element_attribute('Color', 'String')
+    return hierarchy
+
+
+class TestHierarchyDiff(unittest.TestCase):
+
+    def setUp(self):
+        self.base = build_hierarchy()
+        self.target = build_hierarchy()
+
+    def test_no_changes(self):
+        diff = HierarchyDiff.from_hierarchies(self.base, self.target)
+        self.assertTrue(diff.is_empty())
+        self.assertEqual(len(diff), 0)
+
+    def test_case_and_space_insensitive(self):
+        target = Hierarchy(name=DIMENSION_NAME, dimension_name=DIMENSION_NAME)
+        for element in self.base:
+            target.add_element(element.name.upper().replace(' ', ''), str(element.element_type))
+        for (parent, component), weight in self.base.edges.items():
+            target.add_edge(parent.lower(), component.lower(), weight)
+        target.add_element_attribute('COLOR', 'String')
+        self.assertTrue(HierarchyDiff.from_hierarchies(self.base, target).is_empty())
+
+    def test_added_elements_and_edges(self):
+        self.target.add_element('c', 'Numeric')
+        self.target.add_edge('Total', 'c', 1)
+        diff = HierarchyDiff.from_hierarchies(self.base, self.target)
+        self.assertEqual(dict(diff.elements_to_add), {'c': 1})
+        self.assertEqual(dict(diff.edges_to_add), {('Total', 'c'): 1})
+        self.assertEqual(len(diff), 2)
+
+    def test_removed_element_drops_its_edges(self):
+        self.target.remove_element('a2')
+        self.target.remove_edge('Total', 'b')
+        diff = HierarchyDiff.from_hierarchies(self.base, self.target)
+        self.assertEqual(diff.elements_to_remove, ['a2'])
+        # ('Region A', 'a2') is removed with the element
+        self.assertEqual(diff.edges_to_remove, [('Total', 'b')])
+
+    def test_updated_type_and_weight(self):
+        self.target.update_element('b', 'String')
+        self.target.update_edge('Region A', 'a1', -1)
+        diff = HierarchyDiff.from_hierarchies(self.base, self.target)
+        self.assertEqual(dict(diff.elements_to_update), {'b': 2})
+        self.assertEqual(dict(diff.edges_to_update), {('Region A', 'a1'): -1})
+        self.assertFalse(diff.edges_to_add)
+
+    def test_element_attributes(self):
+        self.target.add_element_attribute('Size', 'Numeric')
+        self.target.element_attributes.remove('Color')
+        diff = HierarchyDiff.from_hierarchies(self.base, self.target)
+        self.assertEqual([attribute.name for attribute in diff.element_attributes_to_add], ['Size'])
+        self.assertIsInstance(diff.element_attributes_to_add[0], ElementAttribute)
+        self.assertEqual(diff.element_attributes_to_remove, ['Color'])
+
+    def test_compact_hierarchy(self):
+        base = CompactHierarchy.from_hierarchy(self.base)
+        self.target.add_element('c', 'Numeric')
+        self.target.remove_element('b')
+        diff = HierarchyDiff.from_hierarchies(base, self.target)
+        self.assertEqual(dict(diff.elements_to_add), {'c': 1})
+        self.assertEqual(diff.elements_to_remove, ['b'])
+        self.assertEqual(diff.edges_to_remove, [])
+
+
+class TestHierarchyDiffOnServer(unittest.TestCase):
+    tm1 = None
+
+    @classmethod
+    def setup_class(cls):
+        cls.tm1 = TM1Service(**config['tm1srv01'])
+
+    def setUp(self):
+        if self.tm1.dimensions.exists(DIMENSION_NAME):
+            self.tm1.dimensions.delete(DIMENSION_NAME)
+        dimension = Dimension(DIMENSION_NAME)
+        dimension.add_hierarchy(build_hierarchy())
+        self.tm1.dimensions.create(dimension)
+
+    @classmethod
+    def teardown_class(cls):
+        cls.tm1.dimensions.delete(DIMENSION_NAME)
+        cls.tm1.logout()
+
+    def _update_and_compare(self, hierarchy, use_ti):
+        self.tm1.dimensions.hierarchies.update_incremental(hierarchy, use_ti=use_ti)
+        diff = self.tm1.dimensions.hierarchies.get_diff(hierarchy)
+        self.assertTrue(diff.is_empty(), msg=repr(diff))
+
+    def test_update_incremental_rest(self):
+        hierarchy = self.tm1.dimensions.hierarchies.get(DIMENSION_NAME, DIMENSION_NAME)
+        hierarchy.add_element('c', 'Numeric')
+        hierarchy.add_edge('Total', 'c', 1)
+        hierarchy.remove_element('a2')
+        hierarchy.update_edge('Total', 'b', -1)
+        hierarchy.add_element_attribute('Size', 'Numeric')
+        self._update_and_compare(hierarchy, use_ti=False)
+
+    def test_update_incremental_ti(self):
+        hierarchy = self.tm1.dimensions.hierarchies.get(DIMENSION_NAME, DIMENSION_NAME)
+        hierarchy.remove_edge('Region A', 'a1')
+        hierarchy.add_edge('Total', 'a1', 2)
+        hierarchy.remove_element('b')
+        hierarchy.update_edge('Region A', 'a2', 3)
+        self._update_and_compare(hierarchy, use_ti=True)
+
+    def test_update_incremental_with_snapshot(self):
+        hierarchies = self.tm1.dimensions.hierarchies
+        snapshot = hierarchies.get_structure(DIMENSION_NAME, DIMENSION_NAME)
+        hierarchy = build_hierarchy()
+        hierarchy.add_element('d', 'String')
+        responses = hierarchies.update_incremental(hierarchy, snapshot=snapshot)
+        self.assertEqual(len(responses), 1)
+        self.assertTrue(self.tm1.dimensions.hierarchies.elements.exists(DIMENSION_NAME, DIMENSION_NAME, 'd'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,203 @@
+import configparser
+from pathlib import Path
+import unittest
+
+from TM1py.Objects import Dimension, Hierarchy, HierarchyIndex
+from TM1py.Services import TM1Service
+from TM1py.Utils import MDXSetEvaluator, UnsupportedMDXError
+
+config = configparser.ConfigParser()
+config.read(Path(__file__).parent.joinpath('config.ini'))
+
+DIMENSION_NAME = 'TM1py_Tests_HierarchyIndex'
+
+
+def build_hierarchy():
+    hierarchy = Hierarchy(name=DIMENSION_NAME, dimension_name=DIMENSION_NAME)
+    hierarchy.add_element('Total', 'Consolidated')
+    hierarchy.add_element('Region A', 'Consolidated')
+    hierarchy.add_element('a1', 'Numeric')
+    hierarchy.add_element('a2', 'Numeric')
+    hierarchy.add_element('b', 'Numeric')
+    hierarchy.add_element('Comment', 'String')
+    hierarchy.add_edge('Total', 'Region A', 1)
+    hierarchy.add_edge('Total', 'b', -1)
+    hierarchy.add_edge('Region A', 'a1', 2)
+    hierarchy.add_edge('Region A', 'a2', 1)
+    # second path from Total to a1
+    hierarchy.add_edge('Total', 'a1', 1)
+    return hierarchy
+
+
+class TestHierarchyIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.index = HierarchyIndex.from_hierarchy(build_hierarchy())
+
+    def test_children_and_parents(self):
+        self.assertEqual(self.index.children('Region A'), ['a1', 'a2'])
+        self.assertEqual(sorted(self.index.parents('a1')), ['Region A', 'Total'])
+        self.assertEqual(self.index.children('a1'), [])
+
+    def test_case_and_space_insensitive(self):
+        self.assertEqual(self.index.children('regiona'), ['a1', 'a2'])
+        self.assertIn('REGION a', self.index)
+        self.assertNotIn('Region B', self.index)
+
+    def test_descendants(self):
+        self.assertEqual(sorted(self.index.descendants('Total')), ['Region A', 'a1', 'a2', 'b'])
+        self.assertEqual(sorted(self.index.descendants('Total', leaves_only=True)), ['a1', 'a2', 'b'])
+        self.assertEqual(sorted(self.index.descendants('Total', max_depth=1)), ['Region A', 'a1', 'b'])
+
+    def test_leaves(self):
+        self.assertEqual(sorted(self.index.leaves('Total')), ['a1', 'a2', 'b'])
+        self.assertEqual(self.index.leaves('b'), ['b'])
+
+    def test_ancestors(self):
+        self.assertEqual(sorted(self.index.ancestors('a2')), ['Region A', 'Total'])
+        self.assertEqual(self.index.ancestors('Total'), [])
+
+    def test_level(self):
+        self.assertEqual(self.index.level('Total'), 2)
+        self.assertEqual(self.index.level('Region A'), 1)
+        self.assertEqual(self.index.level('a1'), 0)
+        self.assertEqual(sorted(self.index.elements_by_level(0)), ['Comment', 'a1', 'a2', 'b'])
+
+    def test_roots(self):
+        self.assertEqual(sorted(self.index.roots()), ['Comment', 'Total'])
+
+    def test_rollup_factors(self):
+        self.assertEqual(self.index.rollup_factors('Total'), {'a1': 3.0, 'a2': 1.0, 'b': -1.0})
+        self.assertEqual(self.index.rollup_factors('a2'), {'a2': 1.0})
+
+    def test_from_dict(self):
+        hierarchy = build_hierarchy()
+        hierarchy_as_dict = {
+            'Name': hierarchy.name,
+            'UniqueName': '[{}].[{}]'.format(hierarchy.dimension_name, hierarchy.name),
+            'Elements': [{'Name': element.name, 'Type': str(element.element_type)} for element in hierarchy],
+            'Edges': [{'ParentName': parent, 'ComponentName': component, 'Weight': weight}
+                      for (parent, component), weight
+                      in hierarchy.edges.items()]}
+        index = HierarchyIndex.from_dict(hierarchy_as_dict)
+        self.assertEqual(index.dimension_name, DIMENSION_NAME)
+        self.assertEqual(index.rollup_factors('Total'), self.index.rollup_factors('Total'))
+
+    def test_fingerprint(self):
+        hierarchy_as_dict = {
+            'Elements': [{'Name': 'Total', 'Type': 'Consolidated'}, {'Name': 'a', 'Type': 'Numeric'}],
+            'Edges': [{'ParentName': 'Total', 'ComponentName': 'a', 'Weight': 1}]}
+        version = HierarchyIndex.fingerprint(hierarchy_as_dict)
+        hierarchy_as_dict['Edges'][0]['Weight'] = 2
+        self.assertNotEqual(HierarchyIndex.fingerprint(hierarchy_as_dict), version)
+        hierarchy_as_dict['Edges'][0]['Weight'] = 1
+        self.assertEqual(HierarchyIndex.fingerprint(hierarchy_as_dict), version)
+        hierarchy_as_dict['Elements'][1]['Name'] = 'b'
+        self.assertNotEqual(HierarchyIndex.fingerprint(hierarchy_as_dict), version)
+
+    def test_unknown_element(self):
+        with self.assertRaises(ValueError):
+            self.index.descendants('Not There')
+
+
+class TestMDXSetEvaluator(unittest.TestCase):
+
+    def setUp(self):
+        self.evaluator = MDXSetEvaluator(HierarchyIndex.from_hierarchy(build_hierarchy()))
+
+    def evaluate(self, mdx):
+        return self.evaluator.evaluate(mdx.format(dim=DIMENSION_NAME))
+
+    def test_subset_all_and_filter_by_level(self):
+        self.assertEqual(self.evaluate("{{TM1SubsetAll([{dim}])}}"),
+                         ['Total', 'Region A', 'a1', 'a2', 'b', 'Comment'])
+        self.assertEqual(self.evaluate("{{TM1FilterByLevel(TM1SubsetAll([{dim}].[{dim}]), 0)}}"),
+                         ['a1', 'a2', 'b', 'Comment'])
+        self.assertEqual(self.evaluate("{{TM1FilterByLevel(TM1SubsetAll([{dim}]), 1, 2)}}"), ['Total', 'Region A'])
+
+    def test_members_and_children(self):
+        self.assertEqual(self.evaluate("{{[{dim}].[region a].Children, [{dim}].[{dim}].[b]}}"), ['a1', 'a2', 'b'])
+
+    def test_descendants(self):
+        self.assertEqual(self.evaluate("{{Descendants([{dim}].[Region A])}}"), ['Region A', 'a1', 'a2'])
+        self.assertEqual(self.evaluate("{{Descendants([{dim}].[Total], 1)}}"), ['Region A', 'b', 'a1'])
+        self.assertEqual(self.evaluate("{{Descendants([{dim}].[Total], 1, SELF_AND_BEFORE)}}"),
+                         ['Total', 'Region A', 'b', 'a1'])
+        self.assertEqual(self.evaluate("{{Descendants([{dim}].[Total], 1, AFTER)}}"), ['a1', 'a2'])
+
+    def test_set_functions(self):
+        self.assertEqual(self.evaluate("{{Except(TM1SubsetAll([{dim}]), {{[{dim}].[Comment], [{dim}].[Total]}})}}"),
+                         ['Region A', 'a1', 'a2', 'b'])
+        self.assertEqual(self.evaluate("{{Union({{[{dim}].[a1]}}, {{[{dim}].[A1], [{dim}].[a2]}})}}"), ['a1', 'a2'])
+        self.assertEqual(self.evaluate("{{Head(TM1SubsetAll([{dim}]), 2)}}"), ['Total', 'Region A'])
+        self.assertEqual(self.evaluate("{{Tail(TM1SubsetAll([{dim}]))}}"), ['Comment'])
+
+    def test_unsupported(self):
+        for mdx in ("{{TM1SubsetToSet([{dim}], 'Default')}}",
+                    "{{Filter(TM1SubsetAll([{dim}]), 1)}}",
+                    "{{[{dim}].[Not There]}}",
+                    "{{[Other].[a1]}}",
+                    "{{[{dim}].[a1]}} * {{[{dim}].[a2]}}"):
+            with self.assertRaises(UnsupportedMDXError):
+                self.evaluate(mdx)
+
+
+class TestHierarchyIndexFromServer(unittest.TestCase):
+    tm1 = None
+
+    @classmethod
+    def setup_class(cls):
+        cls.tm1 = TM1Service(**config['tm1srv01'])
+        dimension = Dimension(DIMENSION_NAME)
+        dimension.add_hierarchy(build_hierarchy())
+        if cls.tm1.dimensions.exists(DIMENSION_NAME):
+            cls.tm1.dimensions.delete(DIMENSION_NAME)
+        cls.tm1.dimensions.create(dimension)
+
+    @classmethod
+    def teardown_class(cls):
+        cls.tm1.dimensions.delete(DIMENSION_NAME)
+        cls.tm1.logout()
+
+    def test_get_hierarchy_index(self):
+        index = self.tm1.dimensions.hierarchies.elements.get_hierarchy_index(DIMENSION_NAME, DIMENSION_NAME)
+        self.assertEqual(sorted(index.leaves('Total')), ['a1', 'a2', 'b'])
+        self.assertEqual(len(index.version), 64)
+
+    def test_refresh_hierarchy_index(self):
+        elements = self.tm1.dimensions.hierarchies.elements
+        index = elements.get_hierarchy_index(DIMENSION_NAME, DIMENSION_NAME)
+        self.assertIs(elements.refresh_hierarchy_index(index), index)
+
+    def test_refresh_hierarchy_index_weight_change(self):
+        elements = self.tm1.dimensions.hierarchies.elements
+        index = elements.get_hierarchy_index(DIMENSION_NAME, DIMENSION_NAME)
+        hierarchy = self.tm1.dimensions.hierarchies.get(DIMENSION_NAME, DIMENSION_NAME)
+        hierarchy.update_edge('Region A', 'a1', 3)
+        self.tm1.dimensions.hierarchies.update(hierarchy)
+        try:
+            refreshed = elements.refresh_hierarchy_index(index)
+            self.assertIsNot(refreshed, index)
+            self.assertEqual(refreshed.rollup_factors('Region A'), {'a1': 3.0, 'a2': 1.0})
+        finally:
+            hierarchy.update_edge('Region A', 'a1', 2)
+            self.tm1.dimensions.hierarchies.update(hierarchy)
+
+    def test_evaluate_set_mdx(self):
+        elements = self.tm1.dimensions.hierarchies.elements
+        index = elements.get_hierarchy_index(DIMENSION_NAME, DIMENSION_NAME)
+        for mdx in ("{{TM1FilterByLevel(TM1SubsetAll([{dim}]), 0)}}",
+                    "{{Descendants([{dim}].[Region A])}}",
+                    "{{[{dim}].[Total].Children}}",
+                    "{{Head(Except(TM1SubsetAll([{dim}]), {{[{dim}].[Total]}}), 3)}}"):
+            mdx = mdx.format(dim=DIMENSION_NAME)
+            from_server = [members[0]['Name'] for members in elements.execute_set_mdx(mdx)]
+            self.assertEqual(elements.evaluate_set_mdx(mdx, index), from_server)
+
+        # unsupported: executed on the server
+        mdx = "{{TM1Sort(TM1SubsetAll([{dim}]), ASC)}}".format(dim=DIMENSION_NAME)
+        self.assertEqual(len(elements.evaluate_set_mdx(mdx, index)), 6)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+import configparser
+from pathlib import Path
+import unittest
+
+from TM1py.Objects import Cube, Dimension, Element, Hierarchy
+from TM1py.Services import TM1Service
+
+config = configparser.ConfigParser()
+config.read(Path(__file__).parent.joinpath('config.ini'))
+
+PREFIX = 'TM1py_Tests_MetadataCache_'
+CUBE_NAME = PREFIX + 'Cube'
+DIMENSION_NAMES = [PREFIX + 'Dimension1', PREFIX + 'Dimension2']
+
+
+class TestMetadataCacheMethods(unittest.TestCase):
+    tm1 = None
+
+    @classmethod
+    def setup_class(cls):
+        cls.tm1 = TM1Service(**config['tm1srv01'])
+        for dimension_name in DIMENSION_NAMES:
+            if cls.tm1.dimensions.exists(dimension_name):
+                cls.tm1.dimensions.delete(dimension_name)
+            hierarchy = Hierarchy(dimension_name, dimension_name)
+            hierarchy.add_element('Total', 'Consolidated')
+            hierarchy.add_element('a', 'Numeric')
+            hierarchy.add_edge('Total', 'a', 1)
+            cls.tm1.dimensions.create(Dimension(dimension_name, [hierarchy]))
+
+    def setUp(self):
+        if self.tm1.cubes.exists(CUBE_NAME):
+            self.tm1.cubes.delete(CUBE_NAME)
+        self.tm1.cubes.create(Cube(CUBE_NAME, DIMENSION_NAMES))
+
+    def tearDown(self):
+        if self.tm1.cubes.exists(CUBE_NAME):
+            self.tm1.cubes.delete(CUBE_NAME)
+
+    @classmethod
+    def teardown_class(cls):
+        for dimension_name in DIMENSION_NAMES:
+            cls.tm1.dimensions.delete(dimension_name)
+        cls.tm1.logout()
+
+    def test_get_dimension_names(self):
+        self.tm1.metadata.invalidate()
+        self.assertEqual(self.tm1.metadata.get_dimension_names(CUBE_NAME), DIMENSION_NAMES)
+        self.assertEqual(self.tm1.cubes.get_dimension_names(CUBE_NAME.upper()), DIMENSION_NAMES)
+        self.assertEqual(self.tm1.cubes.cells.get_dimension_names_for_writing(CUBE_NAME), DIMENSION_NAMES)
+
+    def test_get_number_of_elements(self):
+        self.assertEqual(self.tm1.metadata.get_number_of_elements(DIMENSION_NAMES[0]), 2)
+        elements = self.tm1.dimensions.hierarchies.elements
+        elements.add_elements(DIMENSION_NAMES[0], DIMENSION_NAMES[0], [Element('b', 'Numeric')])
+        try:
+            self.assertEqual(self.tm1.metadata.get_number_of_elements(DIMENSION_NAMES[0]), 3)
+        finally:
+            elements.delete(DIMENSION_NAMES[0], DIMENSION_NAMES[0], 'b')
+        self.assertEqual(self.tm1.metadata.get_number_of_elements(DIMENSION_NAMES[0]), 2)
+
+    def test_invalidate_on_hierarchy_change(self):
+        self.assertEqual(self.tm1.metadata.get_number_of_elements(DIMENSION_NAMES[1]), 2)
+        hierarchy = self.tm1.dimensions.hierarchies.get(DIMENSION_NAMES[1], DIMENSION_NAMES[1])
+        hierarchy.add_element('b', 'Numeric')
+        self.tm1.dimensions.hierarchies.update_incremental(hierarchy)
+        try:
+            self.assertEqual(self.tm1.metadata.get_number_of_elements(DIMENSION_NAMES[1]), 3)
+        finally:
+            self.tm1.dimensions.hierarchies.elements.delete(DIMENSION_NAMES[1], DIMENSION_NAMES[1], 'b')
+
+    def test_invalidate_on_cube_change(self):
+        self.assertEqual(self.tm1.metadata.get_dimension_names(CUBE_NAME), DIMENSION_NAMES)
+        self.tm1.cubes.delete(CUBE_NAME)
+        self.tm1.cubes.create(Cube(CUBE_NAME, list(reversed(DIMENSION_NAMES))))
+        self.assertEqual(self.tm1.metadata.get_dimension_names(CUBE_NAME), list(reversed(DIMENSION_NAMES)))
+
+    def test_write_and_read_with_cache(self):
+        self.tm1.cubes.cells.write_value(7, CUBE_NAME, ('a', 'a'))
+        self.assertEqual(self.tm1.cubes.cells.get_value(CUBE_NAME, 'a,a'), 7)
+
+
+if __name__ == '__main__':
+    unittest.main()
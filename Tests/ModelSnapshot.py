@@ -0,0 +1,135 @@
+import configparser
+import os
+from pathlib import Path
+import tempfile
+import unittest
+
+from TM1py.Objects import Dimension, Element, Hierarchy, ModelSnapshot, Subset
+from TM1py.Services import TM1Service
+
+config = configparser.ConfigParser()
+config.read(Path(__file__).parent.joinpath('config.ini'))
+
+DIMENSION_NAME = 'TM1py_Tests_ModelSnapshot'
+SUBSET_NAME = 'TM1py_Tests_ModelSnapshot'
+
+
+def build_snapshot():
+    return ModelSnapshot(
+        version='11.8.00000.1',
+        created='2020-01-01T00:00:00',
+        cubes={'Sales': {'Name': 'Sales', 'Dimensions': [{'Name': 'Region'}], 'Rules': "['Total']=N:1;",
+                         'LastSchemaUpdate': '2020-01-01T00:00:00Z'}},
+        views={'Sales': {
+            'PrivateViews': [],
+            'Views': [{'@odata.type': '#ibm.tm1.api.v1.MDXView', 'Name': 'Default',
+                       'MDX': 'SELECT {[Region].[Total]} ON 0 FROM [Sales]'}]}},
+        dimensions={'Region': {
+            'Name': 'Region',
+            'Hierarchies': [{
+                'Name': 'Region', 'UniqueName': '[Region].[Region]', 'Structure': 0, 'DefaultMember': None,
+                'Subsets': [], 'ElementAttributes': [],
+                'Elements': [
+                    {'Name': 'Total', 'UniqueName': '[Region].[Total]', 'Type': 'Consolidated', 'Index': 1,
+                     'Attributes': {}},
+                    {'Name': 'North', 'UniqueName': '[Region].[North]', 'Type': 'Numeric', 'Index': 2,
+                     'Attributes': {}}],
+                'Edges': [{'ParentName': 'Total', 'ComponentName': 'North', 'Weight': 1}]}]}},
+        subsets={'Region': {'Region': {
+            'PrivateSubsets': [],
+            'Subsets': [{'Name': 'All', 'UniqueName': '[Region].[All]', 'Expression': '{[Region].Members}',
+                         'Hierarchy': {'Name': 'Region', 'Dimension': {'Name': 'Region'}},
+                         'Elements': [], 'Alias': ''}]}}},
+        processes={},
+        chores={},
+        fingerprints={'Cubes': {'Sales': {'LastSchemaUpdate': '2020-01-01T00:00:00Z'}},
+                      'Dimensions': {'Region': {'Region': '0f' * 32}}})
+
+
+class TestModelSnapshot(unittest.TestCase):
+
+    def setUp(self):
+        self.snapshot = build_snapshot()
+
+    def test_accessors(self):
+        self.assertEqual(self.snapshot.cube_names, ['Sales'])
+        self.assertEqual(str(self.snapshot.get_cube('SALES').rules), "['Total']=N:1;")
+        private_views, public_views = self.snapshot.get_views('sales')
+        self.assertEqual(private_views, [])
+        self.assertEqual(public_views[0].name, 'Default')
+        dimension = self.snapshot.get_dimension('region')
+        self.assertIsInstance(dimension, Dimension)
+        self.assertEqual(len(dimension.default_hierarchy), 2)
+        subsets = self.snapshot.get_subsets('Region')
+        self.assertIsInstance(subsets[0], Subset)
+        self.assertEqual(subsets[0].expression, '{[Region].Members}')
+        self.assertEqual(self.snapshot.get_subsets('Region', private=True), [])
+        self.assertEqual(len(self.snapshot), 2)
+
+    def test_json_round_trip(self):
+        restored = ModelSnapshot.from_json(self.snapshot.body)
+        self.assertEqual(restored.body_as_dict, self.snapshot.body_as_dict)
+
+    def test_save_and_restore_from_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            file_name = os.path.join(directory, 'snapshot.json.gz')
+            self.snapshot.save_to_file(file_name)
+            restored = ModelSnapshot.restore_from_file(file_name)
+        self.assertEqual(restored.body_as_dict, self.snapshot.body_as_dict)
+        self.assertEqual(restored.get_dimension('Region').body_as_dict,
+                         self.snapshot.get_dimension('Region').body_as_dict)
+
+
+class TestModelSnapshotService(unittest.TestCase):
+    tm1 = None
+
+    @classmethod
+    def setup_class(cls):
+        cls.tm1 = TM1Service(**config['tm1srv01'])
+        if cls.tm1.dimensions.exists(DIMENSION_NAME):
+            cls.tm1.dimensions.delete(DIMENSION_NAME)
+        hierarchy = Hierarchy(DIMENSION_NAME, DIMENSION_NAME)
+        hierarchy.add_element('Total', 'Consolidated')
+        hierarchy.add_element('a', 'Numeric')
+        hierarchy.add_edge('Total', 'a', 1)
+        cls.tm1.dimensions.create(Dimension(DIMENSION_NAME, [hierarchy]))
+
+    @classmethod
+    def teardown_class(cls):
+        cls.tm1.dimensions.delete(DIMENSION_NAME)
+        cls.tm1.logout()
+
+    def test_build(self):
+        snapshot = self.tm1.model_snapshots.build(max_workers=4)
+        self.assertIn(DIMENSION_NAME, snapshot.dimension_names)
+        self.assertEqual(len(snapshot.get_dimension(DIMENSION_NAME).default_hierarchy), 2)
+        self.assertEqual(len(snapshot.cube_names), len(self.tm1.cubes.get_all_names()))
+        self.assertEqual(len(snapshot.process_names), len(self.tm1.processes.get_all_names()))
+
+    def test_refresh(self):
+        snapshot = self.tm1.model_snapshots.build(max_workers=4, skip_control_objects=True)
+        subset = Subset(SUBSET_NAME, DIMENSION_NAME, DIMENSION_NAME, elements=['a'])
+        self.tm1.dimensions.subsets.create(subset, private=False)
+        self.tm1.dimensions.hierarchies.elements.add_elements(DIMENSION_NAME, DIMENSION_NAME, [
+            Element('b', 'Numeric')])
+
+        refreshed = self.tm1.model_snapshots.refresh(snapshot, skip_control_objects=True)
+        self.assertEqual(len(refreshed.get_dimension(DIMENSION_NAME).default_hierarchy), 3)
+        self.assertEqual([subset.name for subset in refreshed.get_subsets(DIMENSION_NAME)], [SUBSET_NAME])
+        self.assertFalse(any(name.startswith('}') for name in refreshed.cube_names))
+
+    def test_refresh_detects_edits(self):
+        snapshot = self.tm1.model_snapshots.build(max_workers=4, skip_control_objects=True)
+        hierarchy = self.tm1.dimensions.hierarchies.get(DIMENSION_NAME, DIMENSION_NAME)
+        hierarchy.update_edge('Total', 'a', 2)
+        self.tm1.dimensions.hierarchies.update(hierarchy)
+        try:
+            refreshed = self.tm1.model_snapshots.refresh(snapshot, skip_control_objects=True)
+            self.assertEqual(refreshed.get_dimension(DIMENSION_NAME).default_hierarchy.edges[('Total', 'a')], 2)
+        finally:
+            hierarchy.update_edge('Total', 'a', 1)
+            self.tm1.dimensions.hierarchies.update(hierarchy)
+
+
+if __name__ == '__main__':
+    unittest.main()
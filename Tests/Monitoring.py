@@ -0,0 +1,82 @@
+import configparser
+import os
+from pathlib import Path
+import tempfile
+import unittest
+
+from TM1py.Objects import Process
+from TM1py.Services import TM1Service
+from TM1py.Services.MonitoringService import ThreadSampler, duration_in_seconds
+
+config = configparser.ConfigParser()
+config.read(Path(__file__).parent.joinpath('config.ini'))
+
+PROCESS_NAME = 'TM1py_Tests_Monitoring_Sleep'
+
+
+class TestDurationInSeconds(unittest.TestCase):
+
+    def test_duration_in_seconds(self):
+        self.assertEqual(duration_in_seconds('P0DT00H00M05S'), 5)
+        self.assertEqual(duration_in_seconds('P1DT02H03M04.5S'), 93784.5)
+        self.assertEqual(duration_in_seconds('PT10M'), 600)
+        self.assertEqual(duration_in_seconds(''), 0)
+
+    def test_elapsed_time_policy(self):
+        policy = ThreadSampler.elapsed_time_policy(60, functions=['POST /api/v1/ExecuteMDX'])
+        self.assertTrue(policy({'Function': 'POST /api/v1/ExecuteMDX', 'ElapsedTime': 61}))
+        self.assertFalse(policy({'Function': 'POST /api/v1/ExecuteMDX', 'ElapsedTime': 59}))
+        self.assertFalse(policy({'Function': 'GET /api/v1/Cubes', 'ElapsedTime': 61}))
+
+    def test_policy_continues_after_failed_cancel(self):
+        class MonitoringServiceStub:
+            def cancel_thread(self, thread_id):
+                if thread_id == 1:
+                    raise RuntimeError("Thread {} not found".format(thread_id))
+
+        sampler = ThreadSampler(MonitoringServiceStub(), policy=lambda record: True)
+        sampler._apply_policy([(None, 1) + (None,) * 11, (None, 2) + (None,) * 11])
+        self.assertEqual([record['ID'] for record in sampler.cancelled], [2])
+        self.assertEqual(len(sampler.errors), 1)
+
+
+class TestMonitoringMethods(unittest.TestCase):
+    tm1 = None
+
+    @classmethod
+    def setup_class(cls):
+        cls.tm1 = TM1Service(**config['tm1srv01'])
+        if cls.tm1.processes.exists(PROCESS_NAME):
+            cls.tm1.processes.delete(PROCESS_NAME)
+        cls.tm1.processes.create(Process(name=PROCESS_NAME, prolog_procedure="Sleep(3000);"))
+
+    @classmethod
+    def teardown_class(cls):
+        cls.tm1.processes.delete(PROCESS_NAME)
+        cls.tm1.logout()
+
+    def test_get_threads(self):
+        threads = self.tm1.monitoring.get_threads()
+        self.assertIsInstance(threads, list)
+        self.assertGreater(len(threads), 0)
+
+    def test_thread_sampler(self):
+        with tempfile.TemporaryDirectory() as directory:
+            file_name = os.path.join(directory, 'threads.csv')
+            # separate connection for the sampler, so the sampled process call is not serialized behind it
+            with TM1Service(**config['tm1srv01']) as tm1_sampler:
+                with tm1_sampler.monitoring.get_thread_sampler(interval=0.5, file_name=file_name) as sampler:
+                    self.tm1.processes.execute(PROCESS_NAME)
+            self.assertGreater(len(sampler), 0)
+            self.assertEqual(sampler.errors, [])
+            with open(file_name, 'r') as file:
+                self.assertEqual(len(file.readlines()), len(sampler) + 1)
+
+        longest_running = sampler.longest_running(top=1)
+        self.assertIn(PROCESS_NAME, longest_running['Function'].iloc[0] + longest_running['ObjectName'].iloc[0])
+        self.assertGreaterEqual(longest_running['ElapsedTime'].iloc[0], 1)
+        self.assertIsNotNone(sampler.lock_wait_heatmap(frequency='1s'))
+
+
+if __name__ == '__main__':
+    unittest.main()
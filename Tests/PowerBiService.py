@@ -8,6 +8,7 @@ from numpy import NaN
 from TM1py import MDXView
 from TM1py.Objects import Cube, Dimension, Element, Hierarchy, NativeView, AnonymousSubset, ElementAttribute
 from TM1py.Services import TM1Service
+from TM1py.Services.PowerBiService import PowerBiService
 
 # Hard coded stuff
 PREFIX = 'TM1py_Tests_PowerBiService_'
@@ -60,6 +61,16 @@ config = configparser.ConfigParser()
 config.read(os.path.join(os.path.abspath(os.path.dirname(__file__)), 'config.ini'))
 
 
+class TestBuildMemberPropertiesDataFrame(unittest.TestCase):
+
+    def test_build_member_properties_dataframe_without_rows_axis(self):
+        raw_cellset = {'Axes': [{'Tuples': [{'Members': [{'Name': 'Code'}]}]}], 'Cells': []}
+        df = PowerBiService._build_member_properties_dataframe(
+            raw_cellset, DIMENSION_NAME, skip_consolidations=True, typed=True)
+        self.assertEqual(list(df.columns), [DIMENSION_NAME, 'Type', 'Code'])
+        self.assertEqual(len(df), 0)
+
+
 class TestPowerBiService(unittest.TestCase):
     tm1 = None
 
@@ -206,6 +217,23 @@ class TestPowerBiService(unittest.TestCase):
             tuple(element1.values[0]),
             ("Element 1", "1.0", None))
 
+    def test_execute_mdx_typed(self):
+        mdx = MDX_TEMPLATE.format(
+            rows="{[" + DIMENSION_NAMES[0] + "].[Element1], [" + DIMENSION_NAMES[0] + "].[Element2]}",
+            columns="{[" + DIMENSION_NAMES[1] + "].[Element1], [" + DIMENSION_NAMES[1] + "].[Element2]}",
+            cube=CUBE_NAME,
+            where="[" + DIMENSION_NAMES[2] + "].[Element1]")
+        df = self.tm1.power_bi.execute_mdx(mdx, typed=True)
+
+        self.assertEqual(
+            tuple(df.columns),
+            (DIMENSION_NAMES[0], "Element 1", "Element 2"))
+        self.assertIsInstance(df[DIMENSION_NAMES[0]].dtype, pd.CategoricalDtype)
+        self.assertEqual(df["Element 1"].dtype, "float64")
+
+        element1 = df.loc[df[DIMENSION_NAMES[0]] == "Element 1"]
+        self.assertEqual(element1["Element 1"].values[0], 1)
+
     def test_get_member_properties_default(self):
         members = self.tm1.power_bi.get_member_properties(
             dimension_name=DIMENSION_NAME,
@@ -232,6 +260,23 @@ class TestPowerBiService(unittest.TestCase):
             tuple(year_1992.values[0]),
             ("1992", "Numeric", "1991", "", "1991/92", "Total Years", "All Consolidations"))
 
+    def test_get_member_properties_typed(self):
+        members = self.tm1.power_bi.get_member_properties(
+            dimension_name=DIMENSION_NAMES[0],
+            hierarchy_name=DIMENSION_NAMES[0],
+            member_selection=["Element 1", "Element 2"],
+            skip_consolidations=True,
+            attributes=["Attr1", "Attr2"],
+            skip_parents=True,
+            typed=True)
+
+        self.assertEqual(
+            tuple(members.columns),
+            (DIMENSION_NAMES[0], "Type", "Attr1", "Attr2"))
+        self.assertIsInstance(members["Type"].dtype, pd.CategoricalDtype)
+        self.assertEqual(list(members["Attr1"]), ["TM1py", "TM1py"])
+        self.assertEqual(list(members["Attr2"]), [2, 2])
+
     def test_get_member_properties_attributes(self):
         members = self.tm1.power_bi.get_member_properties(
             dimension_name=DIMENSION_NAME,
@@ -1,12 +1,15 @@
 import configparser
 import datetime
+import os
 from pathlib import Path
 import random
 import re
+import tempfile
 import time
 import unittest
 
 import dateutil
+import pandas as pd
 
 from TM1py.Exceptions import TM1pyException
 from TM1py.Objects import Cube, Dimension, Hierarchy, Process
@@ -204,6 +207,63 @@ class TestServerMethods(unittest.TestCase):
         for v1, v2, v3 in zip(random_values, reversed(values_from_top), reversed(values_from_since)):
             self.assertAlmostEqual(v1, v2, delta=0.000000001)
 
+    def test_tail_transaction_log(self):
+        self.tm1.processes.execute_ti_code(lines_prolog="CubeSetLogChanges('{}', {});".format(self.cube_name, 1))
+        with tempfile.TemporaryDirectory() as directory:
+            # establish starting point and resume from it through the checkpoint file
+            checkpoint_file = os.path.join(directory, 'tlog.checkpoint')
+            self.tm1.server.initialize_transaction_log_delta_requests(filter="Cube eq '{}'".format(self.cube_name))
+            with open(checkpoint_file, 'w') as file:
+                file.write(self.tm1.server.tlog_last_delta_request)
+
+            random_values = [random.uniform(-10, 10) for _ in range(3)]
+            for year, value in zip(('2000', '2001', '2002'), random_values):
+                self.tm1.cubes.cells.write_values(self.cube_name, {(year, 'Value'): value})
+
+            entries = list(self.tm1.server.tail_transaction_log(
+                checkpoint_file=checkpoint_file,
+                poll_interval=0.5,
+                max_poll_interval=2,
+                idle_timeout=10))
+            values = [entry['NewValue'] for entry in entries if entry['Cube'] == self.cube_name]
+            self.assertEqual(len(values), 3)
+            for written_value, logged_value in zip(random_values, values):
+                self.assertAlmostEqual(written_value, logged_value, delta=0.000000001)
+
+            with open(checkpoint_file, 'r') as file:
+                self.assertIn("TransactionLogEntries/!delta('", file.read())
+
+    def test_tail_transaction_log_without_poll_interval_and_idle_timeout(self):
+        with self.assertRaises(ValueError):
+            self.tm1.server.tail_transaction_log(poll_interval=0)
+        with self.assertRaises(ValueError):
+            self.tm1.server.tail_message_log(poll_interval=-1, idle_timeout=10)
+
+    def test_export_transaction_log(self):
+        self.tm1.processes.execute_ti_code(lines_prolog="CubeSetLogChanges('{}', {});".format(self.cube_name, 1))
+        since = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(minutes=1)
+        random_values = [random.uniform(-10, 10) for _ in range(3)]
+        for year, value in zip(('2000', '2001', '2002'), random_values):
+            self.tm1.cubes.cells.write_values(self.cube_name, {(year, 'Value'): value})
+        # Digest time in TM1
+        time.sleep(2)
+
+        with tempfile.TemporaryDirectory() as directory:
+            result = self.tm1.server.export_transaction_log(
+                directory,
+                since=since,
+                window=datetime.timedelta(seconds=20),
+                cube=self.cube_name,
+                page_size=2)
+            self.assertEqual(result['entries'], 3)
+            self.assertGreaterEqual(result['windows'], 3)
+            df = pd.read_parquet(os.path.join(directory, "Cube={}".format(self.cube_name)))
+
+        self.assertEqual(len(df), 3)
+        self.assertIsInstance(df['TimeStamp'].dtype, pd.DatetimeTZDtype)
+        for written_value, logged_value in zip(random_values, df.sort_values('TimeStamp')['NewValue']):
+            self.assertAlmostEqual(written_value, logged_value, delta=0.000000001)
+
     @unittest.skip("Doesn't work in TM1 11")
     def test_get_transaction_log_entries_from_today(self):
         # get datetime from today at 00:00:00
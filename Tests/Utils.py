@@ -1,19 +1,27 @@
 import configparser
+import importlib.util
+import itertools
 import json
+import os
 from pathlib import Path
+import random
+import tempfile
 import unittest
 import uuid
 
+import numpy as np
 import pandas as pd
 
-from TM1py import Subset
+from TM1py import NativeView, AnonymousSubset, Subset
 from TM1py.Objects import Process, Dimension, Hierarchy, Cube
 from TM1py.Services import TM1Service
 from TM1py.Utils import TIObfuscator
 from TM1py.Utils import Utils, MDXUtils
+from TM1py.Utils.MDXBuilder import MDXQuery, MDXSet, MemberSet, ExpressionSet, CalculatedMember
+from TM1py.Utils.ProcessRunLog import ProcessRunLog
 from TM1py.Utils.MDXUtils import DimensionSelection, read_dimension_composition_from_mdx, \
     read_dimension_composition_from_mdx_set_or_tuple, read_dimension_composition_from_mdx_set, \
-    read_dimension_composition_from_mdx_tuple, split_mdx, _find_case_and_space_insensitive_first_occurrence
+    read_dimension_composition_from_mdx_tuple, split_mdx, _find_case_and_space_insensitive_first_occurrence, parse_mdx
 from TM1py.Utils.Utils import dimension_hierarchy_element_tuple_from_unique_name
 
 config = configparser.ConfigParser()
@@ -730,6 +738,397 @@ class TestMDXUtils(unittest.TestCase):
         cls.tm1.logout()
 
 
+class TestParseMDX(unittest.TestCase):
+
+    def test_parse_mdx(self):
+        mdx = """
+        WITH MEMBER [Measure].[Margin] AS '[Measure].[Revenue] - [Measure].[Cost]'
+        SELECT
+        NON EMPTY {TM1SubsetAll([Region].[Alt])} * {[Product].[P1], [Product].[P2]} ON ROWS,
+        {FILTER({[Measure].Members}, [Version].[Actual] > 0)} DIMENSION PROPERTIES MEMBER_NAME ON COLUMNS
+        // comment [Comment].[Dimension]
+        FROM [Sales Cube]
+        WHERE ([Year].[2020], [Version].[Actual])
+        """
+        composition = parse_mdx(mdx)
+        self.assertEqual(composition.cube, "Sales Cube")
+        self.assertEqual(composition.rows, (("Region", "Alt"), ("Product", "Product")))
+        self.assertEqual(composition.columns, (("Measure", "Measure"),))
+        self.assertEqual(composition.titles, (("Year", "Year"), ("Version", "Version")))
+        self.assertTrue(composition.non_empty_rows)
+        self.assertFalse(composition.non_empty_columns)
+        self.assertEqual(
+            mdx[slice(*composition.rows_span)],
+            "{TM1SubsetAll([Region].[Alt])} * {[Product].[P1], [Product].[P2]}")
+        self.assertEqual(mdx[slice(*composition.columns_span)], "{FILTER({[Measure].Members}, [Version].[Actual] > 0)}")
+        self.assertEqual(mdx[slice(*composition.where_span)], "([Year].[2020], [Version].[Actual])")
+
+    def test_parse_mdx_tuples_and_axis_numbers(self):
+        mdx = "SELECT {([d1].[h1].[e1], [d2].[e2]), ([d1].[h1].[e3], [d2].[e4])} ON 1, " \
+              "{[d3].[h3].MEMBERS} ON AXIS(0) FROM [c]"
+        composition = parse_mdx(mdx)
+        self.assertEqual(composition.rows, (("d1", "h1"), ("d2", "d2")))
+        self.assertEqual(composition.columns, (("d3", "h3"),))
+        self.assertEqual(composition.titles, ())
+        self.assertIsNone(composition.where_span)
+
+    def test_parse_mdx_like_read_dimension_composition_from_mdx(self):
+        rows = " * ".join(
+            "{" + ",".join("[dim{}].[element{}]".format(dimension, element) for element in range(2000)) + "}"
+            for dimension in range(2))
+        columns = "{" + ",".join("([dim2].[e{0}],[dim3].[e{0}])".format(element) for element in range(2000)) + "}"
+        mdx = MDX_TEMPLATE.format(rows=rows, columns=columns, cube="[cube]", where="([dim4].[e1],[dim5].[e1])")
+
+        cube, row_dimensions, column_dimensions, title_dimensions = read_dimension_composition_from_mdx(mdx)
+        composition = parse_mdx(mdx)
+        self.assertEqual(composition.cube, cube)
+        self.assertEqual([dimension for dimension, _ in composition.rows], row_dimensions)
+        self.assertEqual([dimension for dimension, _ in composition.columns], column_dimensions)
+        self.assertEqual([dimension for dimension, _ in composition.titles], title_dimensions)
+        self.assertIs(parse_mdx(mdx), composition)
+
+    def test_parse_mdx_flat_sets(self):
+        mdx = "SELECT {([d1].[h1].[e}1], [d2].[e2]), ([d1].[h1].[e3], [d2].[e4])} * {[d3].[e]]1], [d3].[e2]} ON 1, " \
+              "{ [d4].[h4].[e 1] , [d4].[h4].[e2] } * {[d5].[e1]:[d5].[e9]} ON 0 FROM [c]"
+        composition = parse_mdx(mdx)
+        self.assertEqual(composition.rows, (("d1", "h1"), ("d2", "d2"), ("d3", "d3")))
+        self.assertEqual(composition.columns, (("d4", "h4"), ("d5", "d5")))
+        self.assertEqual(
+            [mdx[slice(*span)] for span, _ in composition.columns_sets],
+            ["{ [d4].[h4].[e 1] , [d4].[h4].[e2] }", "{[d5].[e1]:[d5].[e9]}"])
+
+    def test_parse_mdx_flat_query(self):
+        mdx = "select non empty {[A B].[x]} * {([a b].[y], [c].[h].[z])} on rows , {[c].[h].[q], [c].[h].[r]} " \
+              "on columns from [My Cube] where ( [t].[x] , [u].[u2].[y] )"
+        composition = parse_mdx(mdx)
+        self.assertEqual(composition.rows, (("A B", "A B"), ("c", "h")))
+        self.assertEqual(composition.titles, (("t", "t"), ("u", "u2")))
+        # the trailing comment makes parse_mdx tokenize the query
+        self.assertEqual(parse_mdx(mdx + " // comment"), composition)
+
+    def test_parse_mdx_invalid(self):
+        with self.assertRaises(ValueError):
+            parse_mdx("{[d].[e]}")
+        with self.assertRaises(ValueError):
+            parse_mdx("SELECT {[d].[e]} ON PAGES FROM [c]")
+
+
+class TestCaseAndSpaceInsensitiveDicts(unittest.TestCase):
+
+    def test_dict_lookup(self):
+        data = Utils.CaseAndSpaceInsensitiveDict({'Travel Expenses': 100, 'Revenue': 5})
+        self.assertEqual(data['Travel Expenses'], 100)
+        self.assertEqual(data['travelexpenses'], 100)
+        self.assertIn('REVENUE', data)
+        self.assertNotIn('Costs', data)
+        with self.assertRaises(KeyError):
+            _ = data['Costs']
+
+    def test_dict_remembers_case_of_last_key_and_keeps_order(self):
+        data = Utils.CaseAndSpaceInsensitiveDict()
+        data['Travel Expenses'] = 100
+        data['Revenue'] = 5
+        data['TRAVEL expenses'] = 200
+        self.assertEqual(list(data.items()), [('TRAVEL expenses', 200), ('Revenue', 5)])
+        self.assertEqual(data['Travel Expenses'], 200)
+        data['Travel Expenses'] = 300
+        self.assertEqual(list(data), ['Travel Expenses', 'Revenue'])
+        self.assertEqual(list(data.adjusted_keys()), ['travelexpenses', 'revenue'])
+
+    def test_dict_delete(self):
+        data = Utils.CaseAndSpaceInsensitiveDict({'Travel Expenses': 100, 'Revenue': 5})
+        data['travel expenses'] = 1
+        del data['TravelExpenses']
+        self.assertEqual(len(data), 1)
+        self.assertNotIn('Travel Expenses', data)
+        data['Travel Expenses'] = 2
+        self.assertEqual(list(data.items()), [('Revenue', 5), ('Travel Expenses', 2)])
+
+    def test_dict_equality_and_copy(self):
+        data = Utils.CaseAndSpaceInsensitiveDict({'Travel Expenses': 100})
+        self.assertEqual(data, {'travelexpenses': 100})
+        data_copy = data.copy()
+        data_copy['Revenue'] = 1
+        self.assertNotIn('Revenue', data)
+        self.assertEqual(data_copy['travel expenses'], 100)
+
+    def test_tuples_dict(self):
+        data = Utils.CaseAndSpaceInsensitiveTuplesDict()
+        data[('[Business Unit].[UK]', '[Scenario].[Worst Case]')] = 1000
+        data[['[Business Unit].[US]', '[Scenario].[Worst Case]']] = 500
+        self.assertEqual(data[('[BusinessUnit].[UK]', '[Scenario].[worstcase]')], 1000)
+        self.assertEqual(data[('[Business Unit].[UK]', '[Scenario].[Worst Case]')], 1000)
+        self.assertEqual(data[['[business unit].[us]', '[Scenario].[Worst Case]']], 500)
+        self.assertIn(('[BUSINESSUNIT].[UK]', '[Scenario].[Worst Case]'), data)
+        self.assertEqual(list(data.values()), [1000, 500])
+        self.assertEqual(
+            dict(data.adjusted_items()),
+            {('[businessunit].[uk]', '[scenario].[worstcase]'): 1000,
+             ('[businessunit].[us]', '[scenario].[worstcase]'): 500})
+
+    def test_tuples_dict_update_with_list_keys(self):
+        data = Utils.CaseAndSpaceInsensitiveTuplesDict([(['UK', 'Worst Case'], 1000)])
+        data.update([(['uk', 'worstcase'], 2000), (['US', 'Worst Case'], 500)])
+        self.assertEqual(list(data), [('uk', 'worstcase'), ('US', 'Worst Case')])
+        self.assertEqual(list(data.values()), [2000, 500])
+
+    def test_tuples_dict_lookup_after_delete(self):
+        data = Utils.CaseAndSpaceInsensitiveTuplesDict({('UK', 'Worst Case'): 1000})
+        self.assertEqual(data[('uk', 'worstcase')], 1000)
+        del data[('UK', 'Worst Case')]
+        self.assertNotIn(('uk', 'worstcase'), data)
+        data[('Uk', 'Worst case')] = 500
+        self.assertEqual(data[('uk', 'worstcase')], 500)
+
+
+class TestBuildUIArrays(unittest.TestCase):
+    raw_cellset = {
+        'Axes': [
+            {'Cardinality': 2, 'Tuples': [{'Members': [{'Name': 'Jan'}]}, {'Members': [{'Name': 'Feb'}]}]},
+            {'Cardinality': 2, 'Tuples': [{'Members': [{'Name': 'North'}, {'Name': 'Revenue'}]},
+                                          {'Members': [{'Name': 'South'}, {'Name': 'Revenue'}]}]},
+            {'Cardinality': 1, 'Tuples': [{'Members': [{'Name': '2020'}]}]}],
+        'Cells': [{'Value': 1.005}, {'Value': None}, {'Value': 3}, {'Value': -49.995}]}
+
+    def test_build_ui_arrays_from_cellset(self):
+        result = Utils.build_ui_arrays_from_cellset(self.raw_cellset, value_precision=2)
+        self.assertEqual(result['titles'], [{'name': '2020', 'members': [{'Name': '2020'}]}])
+        self.assertEqual([header['name'] for header in result['headers'][1]], ['North / Revenue', 'South / Revenue'])
+        self.assertEqual(result['cells'], {'Page': {'North / Revenue': [1.0, 0.0], 'South / Revenue': [3.0, -49.99]}})
+
+        result = Utils.build_ui_arrays_from_cellset(self.raw_cellset, value_precision=None)
+        self.assertEqual(result['cells'], {'Page': {'North / Revenue': [1.005, 0], 'South / Revenue': [3, -49.995]}})
+        self.assertIsInstance(result['cells']['Page']['South / Revenue'][0], int)
+
+    def test_build_ui_dygraph_arrays_from_cellset(self):
+        result = Utils.build_ui_dygraph_arrays_from_cellset(self.raw_cellset, value_precision=1)
+        self.assertEqual(result['cells'], {'Page': [['Jan', 1.0, 3.0], ['Feb', 0.0, -50.0]]})
+
+    def test_round_values_like_format(self):
+        values = np.array([-49.995, 2.675, 0.125, 1.005, 56294995342131.5, float('nan')])
+        rounded = Utils._round_values(values, 2)
+        self.assertEqual(rounded[:-1].tolist(), [float("{:.2f}".format(value)) for value in values[:-1]])
+        self.assertTrue(np.isnan(rounded[-1]))
+
+
+class TestBuildPowerBiDataFrame(unittest.TestCase):
+    raw_cellset = {
+        'Axes': [
+            {'Tuples': [{'Members': [{'Name': 'Revenue'}]}, {'Members': [{'Name': 'Comment'}]}]},
+            {'Hierarchies': [{'Name': 'Region'}, {'Name': 'Year'}],
+             'Tuples': [{'Members': [{'Name': 'North'}, {'Name': '2020'}]},
+                        {'Members': [{'Name': 'North'}, {'Name': '2021'}]},
+                        {'Members': [{'Name': 'South'}, {'Name': '2020'}]}]}],
+        'Cells': [{'Value': 1}, {'Value': 'a'}, {'Value': None}, {'Value': ''}, {'Value': 2.5}, {'Value': 'c'}]}
+
+    def test_build_power_bi_dataframe_typed(self):
+        df = Utils.build_power_bi_dataframe_from_cellset(self.raw_cellset)
+        self.assertEqual(list(df.columns), ['Region', 'Year', 'Revenue', 'Comment'])
+        self.assertIsInstance(df['Region'].dtype, pd.CategoricalDtype)
+        self.assertEqual(list(df['Region'].cat.categories), ['North', 'South'])
+        self.assertEqual(df['Revenue'].dtype, np.float64)
+        self.assertTrue(np.isnan(df['Revenue'][1]))
+        self.assertEqual(df['Revenue'][2], 2.5)
+        self.assertEqual(list(df['Comment']), ['a', '', 'c'])
+
+    def test_build_power_bi_dataframe_typed_empty_column(self):
+        raw_cellset = {'Axes': self.raw_cellset['Axes'], 'Cells': [{'Value': None}, {'Value': 'a'}] * 3}
+        df = Utils.build_power_bi_dataframe_from_cellset(raw_cellset)
+        self.assertEqual(df['Revenue'].dtype, np.float64)
+        self.assertTrue(df['Revenue'].isna().all())
+
+    def test_build_power_bi_dataframe_untyped(self):
+        df = Utils.build_power_bi_dataframe_from_cellset(self.raw_cellset, typed=False)
+        self.assertEqual(list(df.iloc[0]), ['North', '2020', '1', 'a'])
+        self.assertEqual(list(df.iloc[2]), ['South', '2020', '2.5', 'c'])
+
+    def test_build_power_bi_dataframe_row_headers_no_rows(self):
+        raw_cellset = {'Axes': [self.raw_cellset['Axes'][0], {'Tuples': []}], 'Cells': []}
+        df = Utils.build_power_bi_dataframe_from_cellset(raw_cellset, row_headers=['Region'])
+        self.assertEqual(list(df.columns), ['Region', 'Revenue', 'Comment'])
+        self.assertEqual(len(df), 0)
+
+
+class TestBuildSlicesFromTuples(unittest.TestCase):
+
+    def _assert_exact_cover(self, tuples, slices):
+        covered = [element_tuple for cube_slice in slices for element_tuple in itertools.product(*cube_slice)]
+        self.assertEqual(sorted(covered), sorted(set(tuples)))
+
+    def test_cross_join(self):
+        tuples = list(itertools.product(['a', 'b', 'c'], ['x', 'y'], ['1']))
+        slices = Utils.build_slices_from_tuples(tuples)
+        self.assertEqual(slices, [[['a', 'b', 'c'], ['x', 'y'], ['1']]])
+
+    def test_ragged(self):
+        tuples = [('a', 'x'), ('a', 'y'), ('b', 'x'), ('b', 'y'), ('c', 'x'), ('a', 'x')]
+        slices = Utils.build_slices_from_tuples(tuples)
+        self.assertEqual(len(slices), 2)
+        self._assert_exact_cover(tuples, slices)
+
+    def test_random(self):
+        random.seed(1)
+        tuples = [element_tuple
+                  for element_tuple in itertools.product('abcdef', 'uvwxyz', '123')
+                  if random.random() < 0.5]
+        slices = Utils.build_slices_from_tuples(tuples)
+        self.assertLess(len(slices), len(tuples))
+        self._assert_exact_cover(tuples, slices)
+
+    def test_empty(self):
+        self.assertEqual(Utils.build_slices_from_tuples([]), [])
+
+
+class TestMDXBuilder(unittest.TestCase):
+
+    @staticmethod
+    def _build_query(cube_name, regions, *where):
+        query = MDXQuery(cube_name) \
+            .add_rows(MemberSet('Region', regions), ExpressionSet.all_members('Product')) \
+            .add_columns(MemberSet('Measure', ['Revenue'])) \
+            .set_non_empty(rows=True)
+        for dimension_name, element_name in where:
+            query.add_where(dimension_name, element_name)
+        return query
+
+    def test_to_mdx(self):
+        query = self._build_query('Sales', ['North', 'South'], ('Year', '2020'))
+        query.add_calculated_member(CalculatedMember('Measure', 'Margin', '[Measure].[Revenue]-[Measure].[Cost]'))
+        self.assertEqual(
+            query.to_mdx(),
+            "WITH MEMBER [Measure].[Margin] AS [Measure].[Revenue]-[Measure].[Cost] "
+            "SELECT {[Measure].[Revenue]} ON COLUMNS, "
+            "NON EMPTY {[Region].[North],[Region].[South]} * {TM1SubsetAll([Product])} ON ROWS "
+            "FROM [Sales] WHERE ([Year].[2020])")
+
+    def test_to_mdx_requires_columns(self):
+        with self.assertRaises(ValueError):
+            MDXQuery('Sales').add_rows(MemberSet('Region', ['North'])).to_mdx()
+
+    def test_fingerprint(self):
+        query = self._build_query('Sales', ['North', 'South'], ('Year', '2020'), ('Version', 'Actual'))
+        equivalent = self._build_query('SALES', ['north', 'So uth'], ('version', 'Actual'), ('Year', '2020'))
+        different = self._build_query('Sales', ['South', 'North'], ('Year', '2020'), ('Version', 'Actual'))
+        self.assertEqual(query.fingerprint(), equivalent.fingerprint())
+        self.assertNotEqual(query.fingerprint(), different.fingerprint())
+
+    def test_partition(self):
+        query = self._build_query('Sales', ['North', 'South', 'East'], ('Year', '2020'))
+        self.assertEqual(query.split_points(), [('ROWS', 'Region', 3)])
+        partitions = query.partition('region', 2)
+        self.assertEqual([partition.rows[0].elements for partition in partitions], [['North', 'South'], ['East']])
+        self.assertEqual(query.rows[0].elements, ['North', 'South', 'East'])
+        self.assertIn("WHERE ([Year].[2020])", partitions[1].to_mdx())
+        with self.assertRaises(ValueError):
+            query.partition('Product', 2)
+
+    def test_partitions_are_independent(self):
+        query = MDXQuery('Sales').add_rows(MemberSet('Region', ['North', 'South'])).add_where('Year', '2020')
+        partitions = query.partition('Region', 1)
+        partitions[0].add_where('Version', 'Actual')
+        partitions[0].add_calculated_member(CalculatedMember('Measure', 'Margin', '1'))
+        self.assertEqual(query.where, partitions[1].where)
+        self.assertEqual(len(query.where), 1)
+        self.assertEqual(query.calculated_members, [])
+
+    def test_mdx_set_is_abstract(self):
+        with self.assertRaises(TypeError):
+            MDXSet('Region')
+
+    def test_from_dimension_selection(self):
+        mdx_set = ExpressionSet.from_dimension_selection(DimensionSelection('Region', elements=['North']))
+        self.assertEqual(mdx_set.to_mdx(), "{[Region].[North]}")
+
+    def test_from_native_view(self):
+        native_view = NativeView('Sales', 'View', suppress_empty_rows=True)
+        native_view.add_row('Region', AnonymousSubset('Region', elements=['North', 'South']))
+        native_view.add_column('Measure', Subset('Default', 'Measure', 'Measure'))
+        native_view.add_title('Year', '2020', AnonymousSubset('Year', expression='{[Year].[2020]}'))
+        query = MDXQuery.from_native_view(native_view)
+        self.assertEqual(query.dimension_names, (['Region'], ['Measure'], ['Year']))
+        self.assertEqual(
+            query.to_mdx(),
+            "SELECT {TM1SubsetToSet([Measure],\"Default\")} ON COLUMNS, "
+            "NON EMPTY {[Region].[North],[Region].[South]} ON ROWS FROM [Sales] WHERE ([Year].[2020])")
+
+
+class TestProcessRunLog(unittest.TestCase):
+
+    @staticmethod
+    def _entry(thread, timestamp, message, logger='TM1.Process'):
+        return {'ThreadID': thread, 'TimeStamp': timestamp, 'Logger': logger, 'Message': message}
+
+    def setUp(self):
+        self.runs = ProcessRunLog()
+        self.runs.add_entries([
+            self._entry(1, '2020-01-01T10:00:00Z', 'Process "Load": executed by user "Admin"'),
+            self._entry(2, '2020-01-01T10:00:30Z', 'Process "Export" executed by user "Admin"'),
+            # nested process on thread 1
+            self._entry(1, '2020-01-01T10:01:00Z', 'Process "Sub" executed by user "Admin"'),
+            self._entry(1, '2020-01-01T10:01:10Z', 'Process "Sub":  finished executing normally, '
+                                                   'elapsed time 10.00 seconds'),
+            self._entry(1, '2020-01-01T10:02:00Z', 'Process "Sub":  Data procedure line (4): ignored'),
+            self._entry(2, '2020-01-01T10:02:30Z', 'Process "Export":  Execution was aborted. '
+                                                   'Error file: <TM1ProcessError_Export.log>'),
+            self._entry(1, '2020-01-01T10:05:00Z', 'Process "Load":  finished executing normally, '
+                                                   'elapsed time 300.00 seconds'),
+            self._entry(3, '2020-01-01T10:06:00Z', 'Process "Load":  finished executing with minor errors'),
+            self._entry(3, '2020-01-01T10:06:00Z', 'Some other message', logger='TM1.Server')])
+
+    def test_runs(self):
+        runs = self.runs.runs
+        self.assertEqual(len(self.runs), 4)
+        self.assertEqual(list(runs['Process']), ['Sub', 'Export', 'Load', 'Load'])
+        self.assertEqual(list(runs['Duration'])[:3], [10.0, 120.0, 300.0])
+        self.assertEqual(list(runs['Status']), ['CompletedSuccessfully', 'Aborted', 'CompletedSuccessfully',
+                                                'HasMinorErrors'])
+        self.assertEqual(list(runs['Failed']), [False, True, False, True])
+
+    def test_failure_rates(self):
+        failure_rates = self.runs.failure_rates()
+        self.assertEqual(failure_rates['Load'], 0.5)
+        self.assertEqual(failure_rates['Export'], 1)
+        self.assertEqual(failure_rates['Sub'], 0)
+
+    def test_summary(self):
+        summary = self.runs.summary(percentiles=(50,))
+        self.assertEqual(list(summary.index), ['Load', 'Export', 'Sub'])
+        self.assertEqual(summary.loc['Load', 'Runs'], 2)
+        self.assertEqual(summary.loc['Export', 'P50'], 120.0)
+
+    def test_concurrency(self):
+        concurrency = self.runs.concurrency(frequency='1min')
+        self.assertEqual(concurrency.max(), 3)
+        self.assertEqual(concurrency.iloc[-1], 0)
+
+
+class TestRequireParquetEngine(unittest.TestCase):
+
+    def test_require_parquet_engine(self):
+        installed = [engine for engine in Utils.PARQUET_ENGINES if importlib.util.find_spec(engine) is not None]
+        if installed:
+            self.assertEqual(Utils.require_parquet_engine(), installed[0])
+        else:
+            with self.assertRaisesRegex(ImportError, r"TM1py\[parquet\]"):
+                Utils.require_parquet_engine()
+
+
+class TestCheckpoint(unittest.TestCase):
+
+    def test_read_and_write_checkpoint(self):
+        with tempfile.TemporaryDirectory() as directory:
+            checkpoint_file = os.path.join(directory, 'test.checkpoint')
+            self.assertIsNone(Utils.read_checkpoint(checkpoint_file))
+            Utils.write_checkpoint(checkpoint_file, "100")
+            Utils.write_checkpoint(checkpoint_file, "200")
+            self.assertEqual(Utils.read_checkpoint(checkpoint_file), "200")
+            self.assertEqual(os.listdir(directory), ['test.checkpoint'])
+
+    def test_without_checkpoint_file(self):
+        Utils.write_checkpoint(None, "100")
+        self.assertIsNone(Utils.read_checkpoint(None))
+
+
 class TestTIObfuscatorMethods(unittest.TestCase):
     tm1 = None
 
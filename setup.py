@@ -37,5 +37,7 @@ setup(
         'pandas',
         'pytz',
         'requests_negotiate_sspi;platform_system=="Windows"'],
+    extras_require={
+        'parquet': ['pyarrow']},
     python_requires='>=3.5',
 )